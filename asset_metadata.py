@@ -0,0 +1,206 @@
+import os
+import logging
+import typing
+
+import utils
+
+class Object_Metadata():
+    def __init__(
+        self,
+        filename : str = None,
+        defaultProperties : dict[str, str] = None,
+        properties : dict[str, str] = None,
+        shapes : list[list[tuple[float, ...]]] = None,
+        sprites : list[str] = None,
+        UVs : list[tuple[float, ...]] = None,
+        VertIndices : list[int] = None,
+        name : str = None,
+    ) -> None:
+        """The parts of a `wmwpy.classes.Object` that the analyses use, read straight from the `.hs` file, without loading sprites or images.
+        
+        It has the same attributes as a wmwpy Object, so it can be used in its place, e.g. in `Object_Analysis.get_object_record()`.
+        
+        Args:
+            filename (str, optional): Path of the object file in the game assets. Defaults to None.
+            defaultProperties (dict[str, str], optional): The properties in the object file. Defaults to None.
+            properties (dict[str, str], optional): The properties in the level. Defaults to None.
+            shapes (list[list[tuple[float, ...]]], optional): The points of every shape. Defaults to None.
+            sprites (list[str], optional): Sprite files that exist. Defaults to None.
+            UVs (list[tuple[float, ...]], optional): UVs. Defaults to None.
+            VertIndices (list[int], optional): Vertex indices. Defaults to None.
+            name (str, optional): Object name in the level. Defaults to None.
+        """
+        self.filename = filename
+        self.defaultProperties = defaultProperties if defaultProperties != None else {}
+        self.properties = properties if properties != None else {}
+        self.shapes = shapes if shapes != None else []
+        self.sprites = sprites if sprites != None else []
+        self.UVs = UVs if UVs != None else []
+        self.VertIndices = VertIndices if VertIndices != None else []
+        self.name = name
+    
+    @property
+    def type(self) -> str:
+        """The object type, from the `Type` property, like `wmwpy.classes.Object.type`.
+        """
+        return self.properties.get('Type', self.defaultProperties.get('Type', ''))
+
+class Metadata_Loader():
+    def __init__(
+        self,
+        gamepath : str,
+        assets : str = '/assets',
+    ) -> None:
+        """Reads levels and objects without wmwpy. Only the XML is parsed; sprites, atlases and images are never opened.
+        
+        Files are read the way wmwpy reads them, so the results are the same:
+        - Level objects without a `Filename` property are skipped, and so are objects whose file can't be loaded.
+        - Objects get their `Filename` from the path of their file.
+        - Only sprites whose file exists are counted.
+        
+        Args:
+            gamepath (str): Path to the game directory.
+            assets (str, optional): Assets folder relative to the game path. Defaults to '/assets'.
+        """
+        self.gamepath = gamepath
+        self.assets = assets
+        
+        # asset path -> whether it is a file, since the same sprites and objects are checked many times
+        self._files : dict[str, bool] = {}
+    
+    def get_file_path(self, path : str) -> str:
+        return utils.asset_path(self.gamepath, self.assets, path)
+    
+    def get_asset_path(self, path : str) -> str:
+        """Get the normalized path of a file in the assets, like wmwpy `File.path`, e.g. 'Objects//rock.hs' -> '/Objects/rock.hs'.
+        """
+        parts = [part for part in path.replace('\\', '/').split('/') if part not in ['', '.']]
+        return '/' + '/'.join(parts)
+    
+    def is_file(self, path : str) -> bool:
+        if path == None:
+            return False
+        
+        path = self.get_asset_path(path)
+        
+        exists = self._files.get(path)
+        if exists == None:
+            exists = os.path.isfile(self.get_file_path(path))
+            self._files[path] = exists
+        
+        return exists
+    
+    def parse(self, path : str):
+        """Parse an XML file in the assets with lxml, like wmwpy.
+        """
+        from lxml import etree
+        
+        return etree.parse(self.get_file_path(path)).getroot()
+    
+    def load_object(
+        self,
+        path : str,
+        properties : dict[str, str] = None,
+        name : str = None,
+    ) -> Object_Metadata:
+        """Load an object file.
+        
+        Args:
+            path (str): Path to the `.hs` file in the game assets.
+            properties (dict[str, str], optional): Properties of the object in a level. Defaults to the default properties, like a wmwpy Object outside a level.
+            name (str, optional): Object name in the level. Defaults to None.
+        
+        Raises:
+            FileNotFoundError: The object file does not exist.
+        
+        Returns:
+            Object_Metadata: The object.
+        """
+        if not self.is_file(path):
+            raise FileNotFoundError(f'object file {path} does not exist')
+        
+        path = self.get_asset_path(path)
+        
+        object = Object_Metadata(name = name)
+        
+        for element in self.parse(path):
+            if element.tag == 'Shapes':
+                for shape in element:
+                    object.shapes.append([
+                        tuple(float(n) for n in point.get('pos').split())
+                        for point in shape
+                        if point.tag == 'Point'
+                    ])
+            elif element.tag == 'Sprites':
+                for sprite in element:
+                    if sprite.tag == 'Sprite':
+                        filename = sprite.attrib['filename']
+                        if self.is_file(filename):
+                            object.sprites.append(filename)
+            elif element.tag == 'UVs':
+                for uv in element:
+                    if uv.tag == 'UV':
+                        object.UVs.append(tuple(float(n) for n in uv.get('pos').split()))
+            elif element.tag == 'VertIndices':
+                for vert in element:
+                    if vert.tag == 'Vert':
+                        object.VertIndices.append(int(vert.get('index')))
+            elif element.tag == 'DefaultProperties':
+                for property in element:
+                    if property.tag == 'Property':
+                        object.defaultProperties[property.get('name')] = property.get('value')
+        
+        # like wmwpy, an object outside a level uses its default properties
+        object.properties = dict(properties) if properties else dict(object.defaultProperties)
+        object.properties['Filename'] = path
+        object.filename = path
+        
+        return object
+    
+    def load_level(
+        self,
+        path : str,
+        load_callback : typing.Callable[[int, str, int], typing.Any] = None,
+    ) -> list[Object_Metadata]:
+        """Load the objects in a level.
+        
+        Args:
+            path (str): Path to the level xml file in the game assets.
+            load_callback (Callable[[int, str, int], Any], optional): Called for every element in the level. Defaults to None.
+        
+        Returns:
+            list[Object_Metadata]: Objects, in the order of the level.
+        """
+        objects = []
+        
+        root = self.parse(path)
+        length = len(root)
+        
+        for index, element in enumerate(root):
+            if element.tag != 'Object':
+                continue
+            
+            name = element.get('name')
+            
+            if callable(load_callback):
+                load_callback(index, f'Object: {name}', length)
+            
+            properties = {}
+            for child in element:
+                if child.tag == 'Properties':
+                    for property in child:
+                        if property.tag == 'Property':
+                            properties[property.get('name')] = property.get('value')
+            
+            if 'Filename' not in properties:
+                continue
+            
+            try:
+                objects.append(self.load_object(properties['Filename'], properties, name))
+            except:
+                logging.exception(f'unable to load object {name} in {path}')
+        
+        if callable(load_callback):
+            load_callback(length, 'Done!', length)
+        
+        return objects
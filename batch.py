@@ -0,0 +1,286 @@
+import os
+import json
+import time
+import logging
+import threading
+import typing
+
+import utils
+from json_utils import dump_stream
+from store import Property_Store, Interner, bits_to_ids
+from cache import Analysis_Cache
+from property_names import Rule
+
+class Batch_Analysis():
+    def __init__(
+        self,
+        games : list[dict[str, str]],
+        output_dir : str = 'batch_output',
+        template : str | dict = '',
+        elements : bool = False,
+        analysis_callback : typing.Callable[[str], typing.Callable[[int, str, int], typing.Any]] = None,
+        workers : int = 1,
+        cache : str | Analysis_Cache = None,
+        property_rules : typing.Iterable[Rule] = None,
+        compact : bool = False,
+        loader : typing.Literal['metadata', 'wmwpy'] = 'metadata',
+        metrics : bool = False,
+        numeric_stats : bool = False,
+        cancel_event : threading.Event = None,
+    ) -> None:
+        """Analyze several games in one process, e.g. WMW, WMP and several versions of them, and compare them.
+        
+        Every game gets its own outputs in `output_dir`, named after the game. The object type analyses share their value and file interners, so values that are in several games are only stored once, and the games can be compared with bitset operations. The results are compared in `diff.json`.
+        
+        Args:
+            games (list[dict[str, str]]): Games, each with `gamepath` and optionally `name`, `assets` (default '/assets'), `game` (default 'WMW') and `template`.
+            output_dir (str, optional): Output folder. Defaults to 'batch_output'.
+            template (str | dict, optional): Object types template for games without their own. Defaults to ''.
+            elements (bool, optional): Also run the element analysis for every game. Defaults to False.
+            analysis_callback (Callable[[str], Callable[[int, str, int], Any]], optional): Called with the name of every game, and returns the progress callback for it. Defaults to None.
+            workers (int, optional): Worker processes for levels. Defaults to 1.
+            cache (str | Analysis_Cache, optional): Cache folder or cache, shared by every game. Defaults to None.
+            property_rules (Iterable[Rule], optional): Extra property name rules. Defaults to None.
+            compact (bool, optional): Write outputs without indentation. Defaults to False.
+            loader (Literal['metadata', 'wmwpy'], optional): How levels and objects are read. Defaults to 'metadata'.
+            metrics (bool, optional): Write metrics next to every output. Defaults to False.
+            numeric_stats (bool, optional): Add the statistics of numeric properties to the outputs. Defaults to False.
+            cancel_event (threading.Event, optional): Event to cancel the batch. Defaults to a new one.
+        
+        Example
+        ```python
+        >> batch = Batch_Analysis([
+        >>     {'name' : 'WMW-1.0', 'gamepath' : 'games/wmw-1.0'},
+        >>     {'name' : 'WMP', 'gamepath' : 'games/wmp', 'game' : 'WMP'},
+        >> ], template = 'object_type_lists/wmw-template.json')
+        >> batch.start()
+        ```
+        """
+        self.games = self.get_games(games)
+        self.output_dir = output_dir
+        self.template = template
+        self.elements = elements
+        self.analysis_callback = analysis_callback
+        self.workers = workers
+        self.property_rules = list(property_rules or [])
+        self.compact = compact
+        self.loader = loader
+        self.metrics = metrics
+        self.numeric_stats = numeric_stats
+        self.cancel_event = cancel_event if cancel_event != None else threading.Event()
+        
+        # one cache connection for every game
+        self.cache : Analysis_Cache = None
+        if isinstance(cache, Analysis_Cache):
+            self.cache = cache
+        elif cache not in ['', None]:
+            self.cache = Analysis_Cache(cache)
+        
+        self.value_ids = Interner()
+        self.file_ids = Interner()
+        
+        # game name -> object types
+        self.stores : dict[str, Property_Store] = {}
+        self.diff : dict = None
+    
+    def get_games(self, games : list[dict[str, str]]) -> list[dict[str, str]]:
+        """Fill in the defaults of the games, and give every game a unique name.
+        """
+        result = []
+        names = set()
+        
+        for game in games:
+            if game.get('gamepath') in ['', None]:
+                raise TypeError('every game must have a gamepath')
+            
+            game = {
+                'assets' : '/assets',
+                'game' : 'WMW',
+                **game,
+            }
+            
+            name = game.get('name') or f"{game['game']}-{os.path.basename(os.path.normpath(game['gamepath']))}"
+            unique_name = name
+            number = 2
+            while unique_name in names:
+                unique_name = f'{name}-{number}'
+                number += 1
+            
+            game['name'] = unique_name
+            names.add(unique_name)
+            result.append(game)
+        
+        return result
+    
+    @classmethod
+    def from_file(cls, path : str, **kwargs) -> 'Batch_Analysis':
+        """Load the list of games from a JSON file, which is either a list of games, or an object with a `games` list.
+        """
+        with open(path, 'r') as file:
+            config = json.load(file)
+        
+        if isinstance(config, dict):
+            config = config.get('games', [])
+        
+        return cls(config, **kwargs)
+    
+    def cancel(self):
+        self.cancel_event.set()
+    
+    def get_output_path(self, name : str, suffix : str = '.json') -> str:
+        return os.path.join(self.output_dir, name + suffix)
+    
+    def get_callback(self, name : str) -> typing.Callable[[int, str, int], typing.Any] | None:
+        if callable(self.analysis_callback):
+            return self.analysis_callback(name)
+        return None
+    
+    def start(self):
+        """Analyze every game, then write the comparison.
+        """
+        from object_types import Object_Analysis
+        from object_elements import Object_Element_Analysis
+        
+        start_time = time.time()
+        
+        os.makedirs(self.output_dir, exist_ok = True)
+        
+        self.stores = {}
+        
+        for game in self.games:
+            if self.cancel_event.is_set():
+                raise utils.Analysis_Cancelled('analysis cancelled')
+            
+            name = game['name']
+            logging.info(f"analyzing {name} ({game['gamepath']})")
+            
+            analysis = Object_Analysis(
+                game['gamepath'],
+                game['assets'],
+                game['game'],
+                game.get('template', self.template),
+                self.get_output_path(name),
+                analysis_callback = self.get_callback(name),
+                workers = self.workers,
+                cache = self.cache,
+                property_rules = self.property_rules,
+                compact = self.compact,
+                cancel_event = self.cancel_event,
+                metrics = self.metrics,
+                loader = self.loader,
+                value_ids = self.value_ids,
+                file_ids = self.file_ids,
+                numeric_stats = self.numeric_stats,
+            )
+            analysis.start()
+            
+            self.stores[name] = analysis.store
+            
+            if self.elements:
+                Object_Element_Analysis(
+                    game['gamepath'],
+                    game['assets'],
+                    game['game'],
+                    self.get_output_path(name, '.elements.json'),
+                    analysis_callback = self.get_callback(f'{name} elements'),
+                    cache = self.cache,
+                    compact = self.compact,
+                    cancel_event = self.cancel_event,
+                    metrics = self.metrics,
+                    loader = self.loader,
+                ).start()
+        
+        self.diff = compare_stores(self.stores)
+        self.export_diff()
+        
+        logging.info(f'value interner: {len(self.value_ids)} values, file interner: {len(self.file_ids)} files')
+        logging.info(f'Took: {time.time() - start_time} seconds')
+    
+    def export_diff(self, output : str = None):
+        if output in ['', None]:
+            output = self.get_output_path('diff')
+        
+        with open(output, 'w') as file:
+            dump_stream(self.diff, file, indent = None if self.compact else 2)
+
+def compare_stores(stores : dict[str, Property_Store]) -> dict:
+    """Compare the object types of several games.
+    
+    Only differences are kept: types that are missing in some games, properties that are missing in some games with the type, properties with different data types, and values that are not in every game with the property. Stores that share interners are compared with bitset operations on the value ids.
+    
+    Args:
+        stores (dict[str, Property_Store]): Game name -> object types.
+    
+    Returns:
+        dict: `{'games' : [...], 'types' : {type : {'games' : [...], 'properties' : {property : {'games', 'types', 'values'}}}}}`. `types` is the data type in every game if they differ, and `values` is, per game, the values that not every game with the property has.
+    """
+    names = list(stores)
+    if len(names) == 0:
+        return {'games' : [], 'types' : {}}
+    
+    # every store has to use the same value ids
+    value_ids = stores[names[0]].value_ids
+    stores = {
+        name : store if store.value_ids is value_ids else Property_Store.from_dict(store.to_dict(), value_ids)
+        for name, store in stores.items()
+    }
+    
+    diff = {
+        'games' : names,
+        'types' : {},
+    }
+    
+    types = {}
+    for store in stores.values():
+        for type in store:
+            types.setdefault(type, None)
+    
+    for type in types:
+        type_games = [name for name in names if type in stores[name]]
+        
+        property_names = {}
+        for name in type_games:
+            for property in stores[name].entries[type]:
+                property_names.setdefault(property, None)
+        
+        properties = {}
+        
+        for property in property_names:
+            entries = {
+                name : stores[name].entries[type][property]
+                for name in type_games
+                if property in stores[name].entries[type]
+            }
+            
+            result = {}
+            
+            data_types = {name : entry.type for name, entry in entries.items()}
+            if len(set(data_types.values())) > 1:
+                result['types'] = data_types
+            
+            bits = {name : entry.values.fold() for name, entry in entries.items()}
+            common = -1
+            for value_bits in bits.values():
+                common &= value_bits
+            
+            values = {}
+            for name, value_bits in bits.items():
+                only = value_bits & ~common
+                if only:
+                    values[name] = {value_ids.get(id) for id in bits_to_ids(only)}
+            if len(values) > 0:
+                result['values'] = values
+            
+            if len(entries) < len(type_games) or len(result) > 0:
+                properties[property] = {
+                    'games' : list(entries),
+                    **result,
+                }
+        
+        if len(type_games) < len(names) or len(properties) > 0:
+            diff['types'][type] = {
+                'games' : type_games,
+                'properties' : properties,
+            }
+    
+    return diff
@@ -0,0 +1,61 @@
+"""Micro-benchmark for building the merged property view of an object, comparing the old `deepcopy` merge with a plain dict merge.
+    
+    python benchmarks/analyze_object.py
+"""
+import copy
+import time
+import tracemalloc
+import argparse
+
+class Fake_Object():
+    def __init__(self, default_count : int = 30, override_count : int = 4) -> None:
+        self.defaultProperties = {f'Property{i}' : f'{i}.5 {i}' for i in range(default_count)}
+        self.defaultProperties['Type'] = 'rock'
+        self.properties = {f'Property{i}' : str(i) for i in range(override_count)}
+        self.properties['Filename'] = '/Objects/rock.hs'
+
+def deepcopy_merge(object : Fake_Object) -> dict[str, str]:
+    properties = copy.deepcopy(object.defaultProperties)
+    properties.update(copy.deepcopy(object.properties))
+    return properties
+
+def dict_merge(object : Fake_Object) -> dict[str, str]:
+    return {**object.defaultProperties, **object.properties}
+
+def measure(function, objects : list[Fake_Object]) -> dict[str, float]:
+    start = time.perf_counter()
+    for object in objects:
+        function(object)
+    seconds = time.perf_counter() - start
+    
+    # peak memory allocated while merging a single object
+    sample = objects[:1000]
+    peak = 0
+    
+    tracemalloc.start()
+    for object in sample:
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        function(object)
+        peak += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+    
+    return {
+        'us_per_object' : seconds / len(objects) * 1e6,
+        'peak_bytes_per_object' : peak / len(sample),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument('--objects', type = int, default = 20000, help = 'number of objects (default: 20000)')
+    parser.add_argument('--defaults', type = int, default = 30, help = 'default properties per object (default: 30)')
+    args = parser.parse_args()
+    
+    objects = [Fake_Object(args.defaults) for _ in range(args.objects)]
+    
+    for name, function in [('deepcopy', deepcopy_merge), ('dict merge', dict_merge)]:
+        result = measure(function, objects)
+        print(f"{name:>12}: {result['us_per_object']:8.2f} us/object, {result['peak_bytes_per_object']:8.0f} bytes/object peak")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark for the cold import time of the analysis modules, optionally compared with another git revision.
+    
+    python benchmarks/import_time.py --baseline HEAD~1
+"""
+import os
+import sys
+import json
+import tarfile
+import tempfile
+import subprocess
+import statistics
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ['object_types', 'object_elements']
+
+# run in a fresh interpreter, so nothing is imported yet
+SNIPPET = """
+import sys, time, json
+sys.path.insert(0, {path!r})
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{
+    'seconds' : seconds,
+    'modules' : [name for name in ['tkinter', 'wmwpy', 'numpy'] if name in sys.modules],
+}}))
+"""
+
+def measure(path : str, module : str, runs : int = 10) -> dict:
+    """Import a module in `runs` fresh processes.
+    
+    Returns:
+        dict: Median and minimum import time, the heavy modules that were imported, and the files the import created.
+    """
+    times = []
+    result = {}
+    
+    with tempfile.TemporaryDirectory() as cwd:
+        # the first import writes the bytecode cache, so it's not counted
+        for run in range(runs + 1):
+            output = subprocess.run(
+                [sys.executable, '-c', SNIPPET.format(path = path, module = module)],
+                cwd = cwd,
+                capture_output = True,
+                text = True,
+                check = True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            
+            if run > 0:
+                times.append(result['seconds'])
+        
+        created = sorted(os.listdir(cwd))
+    
+    return {
+        'median_ms' : statistics.median(times) * 1000,
+        'min_ms' : min(times) * 1000,
+        'modules' : result['modules'],
+        'created' : created,
+    }
+
+def export_revision(revision : str, path : str):
+    """Write the files of a git revision to a folder.
+    """
+    archive = os.path.join(path, 'tree.tar')
+    
+    subprocess.run(
+        ['git', 'archive', '--format=tar', '-o', archive, revision],
+        cwd = ROOT,
+        check = True,
+    )
+    with tarfile.open(archive) as tar:
+        tar.extractall(path)
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument('--runs', type = int, default = 10, help = 'imports per module (default: 10)')
+    parser.add_argument('--baseline', default = None, metavar = 'REVISION', help = 'git revision to compare with, e.g. HEAD~1')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as baseline_path:
+        trees = [('current', ROOT)]
+        
+        if args.baseline != None:
+            export_revision(args.baseline, baseline_path)
+            trees.insert(0, (args.baseline, baseline_path))
+        
+        for name, path in trees:
+            for module in MODULES:
+                result = measure(path, module, args.runs)
+                print(
+                    f"{name:>10} {module:>16}: {result['median_ms']:7.1f} ms median, {result['min_ms']:7.1f} ms min,",
+                    f"imports {result['modules'] or 'none'}, created {result['created'] or 'nothing'}",
+                )
+
+if __name__ == '__main__':
+    main()
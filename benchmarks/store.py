@@ -0,0 +1,116 @@
+"""Micro-benchmark for the memory and merge cost of the property observations, comparing nested dicts of sets with `Property_Store`.
+    
+    python benchmarks/store.py
+"""
+import os
+import sys
+import time
+import random
+import tracemalloc
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from store import Property_Store
+
+def make_observations(count : int, types : int, properties : int, files : int, values : int, seed : int = 0) -> list[tuple[str, str, str, str]]:
+    """Make `(type, property, value, file)` observations with lots of repeats, like levels that use the same objects over and over.
+    """
+    rng = random.Random(seed)
+    
+    return [
+        (
+            f'type{rng.randrange(types)}',
+            f'Property{rng.randrange(properties)}',
+            str(rng.randrange(values)),
+            f'/Objects/object{rng.randrange(files)}.hs',
+        )
+        for _ in range(count)
+    ]
+
+def build_dict(observations : list[tuple[str, str, str, str]]) -> dict:
+    object_types = {}
+    
+    for type, property, value, file in observations:
+        entry = object_types.setdefault(type, {}).setdefault(property, {
+            'type' : 'any',
+            'values' : set(),
+            'files' : set(),
+        })
+        # copies, like strings that are parsed from separate files
+        entry['values'].add(''.join(value))
+        entry['files'].add(''.join(file))
+    
+    return object_types
+
+def merge_dict(object_types : dict, other : dict):
+    for type, properties in other.items():
+        current = object_types.setdefault(type, {})
+        
+        for name, property in properties.items():
+            if name not in current:
+                current[name] = {
+                    'type' : property['type'],
+                    'values' : set(property['values']),
+                    'files' : set(property['files']),
+                }
+                continue
+            
+            current[name]['values'].update(property['values'])
+            current[name]['files'].update(property['files'])
+
+def build_store(observations : list[tuple[str, str, str, str]], shared : Property_Store = None) -> Property_Store:
+    if shared != None:
+        store = Property_Store(shared.value_ids, shared.file_ids)
+    else:
+        store = Property_Store()
+    
+    for type, property, value, file in observations:
+        store.add(store.setdefault(type, property), ''.join(value), ''.join(file))
+    
+    return store
+
+def measure(build, merge, observations : list[tuple[str, str, str, str]], share : bool = False) -> dict[str, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(observations)
+    build_time = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    if share:
+        other = build(observations[:len(observations) // 2], result)
+    else:
+        other = build(observations[:len(observations) // 2])
+    
+    start = time.perf_counter()
+    merge(result, other)
+    merge_time = time.perf_counter() - start
+    
+    return {
+        'build_seconds' : build_time,
+        'merge_seconds' : merge_time,
+        'memory_bytes' : memory,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument('--observations', type = int, default = 500000, help = 'number of observations (default: 500000)')
+    parser.add_argument('--types', type = int, default = 100, help = 'number of object types (default: 100)')
+    parser.add_argument('--properties', type = int, default = 40, help = 'properties per type (default: 40)')
+    parser.add_argument('--files', type = int, default = 2000, help = 'number of object files (default: 2000)')
+    parser.add_argument('--values', type = int, default = 500, help = 'distinct values per property (default: 500)')
+    args = parser.parse_args()
+    
+    observations = make_observations(args.observations, args.types, args.properties, args.files, args.values)
+    
+    for name, build, merge, share in [
+        ('dict of sets', build_dict, merge_dict, False),
+        ('store', build_store, Property_Store.merge, False),
+        ('shared store', build_store, Property_Store.merge, True),
+    ]:
+        result = measure(build, merge, observations, share)
+        print(f"{name:>12}: build {result['build_seconds']:6.2f} s, merge {result['merge_seconds']:6.3f} s, {result['memory_bytes'] / 1024 / 1024:8.1f} MiB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""Benchmark suite for the object analyses on a synthetic game, with the results saved as JSON for comparing across changes.
+    
+    python benchmarks/suite.py --output before.json
+    python benchmarks/suite.py --output after.json --compare before.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import tempfile
+import subprocess
+import statistics
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import synthetic
+
+def timed(timings : dict[str, float], name : str, function):
+    """Wrap a function so the time of every call is added to `timings[name]`.
+    """
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+    
+    return wrapper
+
+def run_types(gamepath : str, output : str, template : str = None) -> dict[str, float]:
+    """Run `Object_Analysis` once.
+    
+    Returns:
+        dict[str, float]: Seconds for every phase. `types_analyze` is `start()` without `get_data_types()` and `export_objects()`.
+    """
+    from object_types import Object_Analysis
+    
+    timings = {}
+    
+    start = time.perf_counter()
+    analysis = Object_Analysis(gamepath, template = template, output = output)
+    timings['types_load'] = time.perf_counter() - start
+    
+    # wrap the instance methods, so `start()` calls the timed versions
+    analysis.get_data_types = timed(timings, 'types_get_data_types', analysis.get_data_types)
+    analysis.export_objects = timed(timings, 'types_export_objects', analysis.export_objects)
+    
+    start = time.perf_counter()
+    analysis.start()
+    timings['types_start'] = time.perf_counter() - start
+    
+    timings['types_analyze'] = timings['types_start'] - timings['types_get_data_types'] - timings['types_export_objects']
+    
+    return timings
+
+def run_elements(gamepath : str, output : str) -> dict[str, float]:
+    """Run `Object_Element_Analysis` once.
+    
+    Returns:
+        dict[str, float]: Seconds for every phase.
+    """
+    from object_elements import Object_Element_Analysis
+    
+    timings = {}
+    
+    start = time.perf_counter()
+    analysis = Object_Element_Analysis(gamepath, output = output)
+    timings['elements_load'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    analysis.start()
+    timings['elements_start'] = time.perf_counter() - start
+    
+    return timings
+
+def get_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd = ROOT,
+            capture_output = True,
+            text = True,
+            check = True,
+        ).stdout.strip()
+    except:
+        return None
+
+def run_suite(gamepath : str, output_path : str, repeats : int = 3, template : str = None) -> dict[str, dict[str, float]]:
+    """Run both analyses `repeats` times.
+    
+    Returns:
+        dict[str, dict[str, float]]: Phase -> median and minimum seconds.
+    """
+    # import wmwpy first, so the first run doesn't count the imports
+    import wmwpy
+    
+    runs : dict[str, list[float]] = {}
+    
+    for repeat in range(repeats):
+        timings = run_types(gamepath, os.path.join(output_path, 'objects.json'), template)
+        timings.update(run_elements(gamepath, os.path.join(output_path, 'elements.json')))
+        
+        for name, seconds in timings.items():
+            runs.setdefault(name, []).append(seconds)
+    
+    return {
+        name : {
+            'median' : statistics.median(times),
+            'min' : min(times),
+        } for name, times in runs.items()
+    }
+
+def compare(results : dict, baseline : dict):
+    """Print the change of every phase compared with an older result file.
+    """
+    if baseline.get('params') != results.get('params'):
+        print('warning: the baseline was run with different parameters', file = sys.stderr)
+    
+    print(f"{'phase':>22} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, timing in results['phases'].items():
+        old = baseline.get('phases', {}).get(name)
+        if old == None:
+            continue
+        
+        ratio = timing['median'] / old['median'] if old['median'] > 0 else float('inf')
+        print(f"{name:>22} {old['median'] * 1000:8.1f}ms {timing['median'] * 1000:8.1f}ms {ratio:6.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    synthetic.add_arguments(parser)
+    parser.add_argument('--repeats', type = int, default = 3, help = 'runs of every analysis (default: 3)')
+    parser.add_argument('--template', default = None, help = 'object types template (default: none)')
+    parser.add_argument('--keep', default = None, metavar = 'PATH', help = 'write the synthetic game to this folder and keep it')
+    parser.add_argument('-o', '--output', default = None, help = 'save the results to this JSON file')
+    parser.add_argument('--compare', default = None, metavar = 'PATH', help = 'results file to compare with')
+    args = parser.parse_args()
+    
+    params = {
+        'levels' : args.levels,
+        'objects_per_level' : args.objects_per_level,
+        'object_files' : args.object_files,
+        'properties' : args.properties,
+        'shapes' : args.shapes,
+        'sprites' : args.sprites,
+        'seed' : args.seed,
+        'repeats' : args.repeats,
+    }
+    
+    with tempfile.TemporaryDirectory() as temp_path:
+        gamepath = args.keep or os.path.join(temp_path, 'game')
+        
+        start = time.perf_counter()
+        synthetic.generate(
+            gamepath,
+            levels = args.levels,
+            objects_per_level = args.objects_per_level,
+            object_files = args.object_files,
+            properties = args.properties,
+            shapes = args.shapes,
+            sprites = args.sprites,
+            seed = args.seed,
+        )
+        print(f'generated game in {time.perf_counter() - start:.2f} seconds', file = sys.stderr)
+        
+        phases = run_suite(gamepath, temp_path, args.repeats, args.template)
+    
+    results = {
+        'python' : platform.python_version(),
+        'platform' : platform.platform(),
+        'revision' : get_revision(),
+        'params' : params,
+        'phases' : phases,
+    }
+    
+    for name, timing in phases.items():
+        print(f"{name:>22}: {timing['median'] * 1000:8.1f} ms median, {timing['min'] * 1000:8.1f} ms min")
+    
+    if args.output != None:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent = 2)
+    
+    if args.compare != None:
+        with open(args.compare, 'r') as file:
+            compare(results, json.load(file))
+
+if __name__ == '__main__':
+    main()
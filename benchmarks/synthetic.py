@@ -0,0 +1,151 @@
+"""Generate a synthetic game asset tree, with levels, objects and sprites, so the analyses can be run without a game install.
+    
+    python benchmarks/synthetic.py path/to/game --levels 50 --objects-per-level 100
+"""
+import os
+import random
+import argparse
+from xml.sax.saxutils import quoteattr
+
+TYPES = ['rock', 'fan', 'spout', 'door', 'switch', 'converter', 'balloon', 'bomb']
+
+def random_value(rng : random.Random, kind : int) -> str:
+    if kind == 0:
+        return str(rng.randrange(2))
+    if kind == 1:
+        return str(rng.randrange(-100, 100))
+    if kind == 2:
+        return f'{rng.uniform(-10, 10):.3f}'
+    if kind == 3:
+        return f'{rng.uniform(-10, 10):.2f} {rng.uniform(-10, 10):.2f}'
+    if kind == 4:
+        return ','.join(str(rng.randrange(10)) for _ in range(rng.randint(2, 4)))
+    return rng.choice(['water', 'lava', 'steam', 'mud', 'ooze', 'none'])
+
+def generate(
+    path : str,
+    levels : int = 20,
+    objects_per_level : int = 50,
+    object_files : int = 200,
+    properties : int = 20,
+    shapes : int = 2,
+    sprites : int = 2,
+    seed : int = 0,
+) -> str:
+    """Generate a synthetic game.
+    
+    Args:
+        path (str): Game folder. The assets are written to `path/assets`.
+        levels (int, optional): Number of levels. Defaults to 20.
+        objects_per_level (int, optional): Objects in every level. Defaults to 50.
+        object_files (int, optional): Number of `.hs` object files. Defaults to 200.
+        properties (int, optional): Default properties per object file. Defaults to 20.
+        shapes (int, optional): Shapes per object file. Defaults to 2.
+        sprites (int, optional): Sprites per object file. Defaults to 2.
+        seed (int, optional): Random seed, so the same arguments make the same files. Defaults to 0.
+    
+    Returns:
+        str: The game folder.
+    """
+    rng = random.Random(seed)
+    assets = os.path.join(path, 'assets')
+    
+    for folder in ['Levels', 'Objects', 'Sprites']:
+        os.makedirs(os.path.join(assets, folder), exist_ok = True)
+    
+    sprite_count = max(1, object_files // 4)
+    for index in range(sprite_count):
+        with open(os.path.join(assets, 'Sprites', f'sprite{index}.sprite'), 'w') as file:
+            file.write('<?xml version="1.0"?>\n<Sprite>\n</Sprite>\n')
+    
+    # property names are shared between object files, like real games, and every name has one kind of value
+    names = [f'Property{index}Value' for index in range(properties * 2)] + [f'Connection{index}' for index in range(4)]
+    kinds = {name : rng.randrange(6) for name in names}
+    
+    for index in range(object_files):
+        lines = ['<InteractiveObject>']
+        
+        lines.append('<Shapes>')
+        for shape in range(shapes):
+            lines.append('<Shape>')
+            for point in range(4):
+                lines.append(f'<Point pos="{rng.uniform(-5, 5):.3f} {rng.uniform(-5, 5):.3f}"/>')
+            lines.append('</Shape>')
+        lines.append('</Shapes>')
+        
+        lines.append('<Sprites>')
+        for sprite in range(sprites):
+            lines.append(
+                f'<Sprite filename="/Sprites/sprite{rng.randrange(sprite_count)}.sprite" pos="0 0" angle="0" gridSize="1 1" isBackground="false"/>'
+            )
+        lines.append('</Sprites>')
+        
+        lines.append('<UVs>')
+        for uv in range(4):
+            lines.append(f'<UV pos="{rng.random():.3f} {rng.random():.3f}"/>')
+        lines.append('</UVs>')
+        
+        lines.append('<VertIndices>')
+        for vert in range(6):
+            lines.append(f'<Vert index="{rng.randrange(4)}"/>')
+        lines.append('</VertIndices>')
+        
+        lines.append('<DefaultProperties>')
+        lines.append(f'<Property name="Type" value="{TYPES[index % len(TYPES)]}"/>')
+        for name in rng.sample(names, min(properties, len(names))):
+            lines.append(f'<Property name="{name}" value={quoteattr(random_value(rng, kinds[name]))}/>')
+        lines.append('</DefaultProperties>')
+        
+        lines.append('</InteractiveObject>')
+        
+        with open(os.path.join(assets, 'Objects', f'object{index}.hs'), 'w') as file:
+            file.write('\n'.join(lines) + '\n')
+    
+    for level in range(levels):
+        lines = ['<?xml version="1.0"?>', '<Objects>']
+        
+        for index in range(objects_per_level):
+            lines.append(f'<Object name="object{index}">')
+            lines.append(f'<AbsoluteLocation value="{rng.uniform(0, 100):.2f} {rng.uniform(0, 100):.2f}"/>')
+            lines.append('<Properties>')
+            lines.append(f'<Property name="Filename" value="/Objects/object{rng.randrange(object_files)}.hs"/>')
+            for name in rng.sample(names, rng.randint(0, 3)):
+                lines.append(f'<Property name="{name}" value={quoteattr(random_value(rng, kinds[name]))}/>')
+            lines.append('</Properties>')
+            lines.append('</Object>')
+        
+        lines.append('</Objects>')
+        
+        with open(os.path.join(assets, 'Levels', f'level{level}.xml'), 'w') as file:
+            file.write('\n'.join(lines) + '\n')
+    
+    return path
+
+def add_arguments(parser : argparse.ArgumentParser):
+    parser.add_argument('--levels', type = int, default = 20, help = 'number of levels (default: 20)')
+    parser.add_argument('--objects-per-level', type = int, default = 50, help = 'objects in every level (default: 50)')
+    parser.add_argument('--object-files', type = int, default = 200, help = 'number of object files (default: 200)')
+    parser.add_argument('--properties', type = int, default = 20, help = 'default properties per object file (default: 20)')
+    parser.add_argument('--shapes', type = int, default = 2, help = 'shapes per object file (default: 2)')
+    parser.add_argument('--sprites', type = int, default = 2, help = 'sprites per object file (default: 2)')
+    parser.add_argument('--seed', type = int, default = 0, help = 'random seed (default: 0)')
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument('path', help = 'game folder to write')
+    add_arguments(parser)
+    args = parser.parse_args()
+    
+    generate(
+        args.path,
+        levels = args.levels,
+        objects_per_level = args.objects_per_level,
+        object_files = args.object_files,
+        properties = args.properties,
+        shapes = args.shapes,
+        sprites = args.sprites,
+        seed = args.seed,
+    )
+
+if __name__ == '__main__':
+    main()
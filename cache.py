@@ -0,0 +1,308 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import typing
+
+DEFAULT_CACHE_DIR = '.analysis_cache'
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+class Analysis_Cache():
+    def __init__(
+        self,
+        path : str = DEFAULT_CACHE_DIR,
+        max_size : int = DEFAULT_MAX_SIZE,
+    ) -> None:
+        """On-disk cache for per-file analysis results.
+        
+        Entries are keyed by a kind (e.g. `'WMW/level'`) and the file path on disk, and are only valid while the content hash of the file, and the content hash of every dependency recorded with the entry, are unchanged. File hashes are remembered together with the file size and mtime, so unchanged files are not read again.
+        
+        Args:
+            path (str, optional): Cache directory. Defaults to '.analysis_cache'.
+            max_size (int, optional): Maximum size of the cached data in bytes. Least recently used entries are evicted past this. Defaults to 256 MiB.
+        """
+        self.path = path
+        self.max_size = max_size
+        
+        os.makedirs(self.path, exist_ok = True)
+        
+        # every write is its own short transaction, so parallel workers sharing the cache don't wait on each other's write lock
+        self.connection = sqlite3.connect(
+            os.path.join(self.path, 'cache.sqlite'),
+            timeout = 60,
+            isolation_level = None,
+        )
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        # it's only a cache, so a commit doesn't have to wait for the disk
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                filepath TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime INTEGER,
+                hash TEXT
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                kind TEXT,
+                filepath TEXT,
+                hash TEXT,
+                deps TEXT,
+                data TEXT,
+                size INTEGER,
+                used REAL,
+                PRIMARY KEY (kind, filepath)
+            );
+        """)
+        
+        self._hashes : dict[str, str | None] = {}
+        self._used : dict[tuple[str, str], float] = {}
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def file_hash(self, filepath : str) -> str | None:
+        """Get the content hash of a file. The hash is reused if the size and mtime of the file have not changed.
+        
+        Args:
+            filepath (str): Path to file on disk.
+        
+        Returns:
+            str | None: sha1 hex digest, or `None` if the file does not exist.
+        """
+        if filepath in self._hashes:
+            return self._hashes[filepath]
+        
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            self._hashes[filepath] = None
+            return None
+        
+        row = self.connection.execute(
+            'SELECT size, mtime, hash FROM files WHERE filepath = ?',
+            (filepath,),
+        ).fetchone()
+        
+        if row != None and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            hash = row[2]
+        else:
+            with open(filepath, 'rb') as file:
+                hash = hashlib.sha1(file.read()).hexdigest()
+            
+            self.connection.execute(
+                'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)',
+                (filepath, stat.st_size, stat.st_mtime_ns, hash),
+            )
+        
+        self._hashes[filepath] = hash
+        return hash
+    
+    def get(self, kind : str, filepath : str) -> typing.Any:
+        """Get cached data for a file.
+        
+        Args:
+            kind (str): Kind of entry.
+            filepath (str): Path to file on disk.
+        
+        Returns:
+            Any: The cached data, or `None` if there is no valid entry.
+        """
+        row = self.connection.execute(
+            'SELECT hash, deps, data FROM entries WHERE kind = ? AND filepath = ?',
+            (kind, filepath),
+        ).fetchone()
+        
+        if row == None or row[0] != self.file_hash(filepath):
+            self.misses += 1
+            return None
+        
+        deps : dict[str, str | None] = json.loads(row[1])
+        for dep, hash in deps.items():
+            if self.file_hash(dep) != hash:
+                self.misses += 1
+                return None
+        
+        self.hits += 1
+        self._used[(kind, filepath)] = time.time()
+        return json.loads(row[2])
+    
+    def put(
+        self,
+        kind : str,
+        filepath : str,
+        data : typing.Any,
+        deps : typing.Iterable[str] = (),
+    ):
+        """Store data for a file.
+        
+        Args:
+            kind (str): Kind of entry.
+            filepath (str): Path to file on disk.
+            data (Any): JSON serializable data.
+            deps (Iterable[str], optional): Other files on disk this data was built from. Defaults to ().
+        """
+        hash = self.file_hash(filepath)
+        if hash == None:
+            return
+        
+        deps = {dep : self.file_hash(dep) for dep in deps}
+        data = json.dumps(data, separators = (',', ':'))
+        
+        self.connection.execute(
+            'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (
+                kind,
+                filepath,
+                hash,
+                json.dumps(deps),
+                data,
+                len(data),
+                time.time(),
+            ),
+        )
+    
+    def invalidate(self, filepath : str = None, kind : str = None) -> int:
+        """Remove entries from the cache.
+        
+        Args:
+            filepath (str, optional): Only remove entries for this file, or files in this folder. Defaults to all files.
+            kind (str, optional): Only remove entries of this kind. Defaults to all kinds.
+        
+        Returns:
+            int: Number of removed entries.
+        """
+        query = 'DELETE FROM entries WHERE 1'
+        args = []
+        
+        if filepath not in ['', None]:
+            filepath = os.path.abspath(filepath)
+            # an exact prefix, since LIKE would treat '_' and '%' in the path as wildcards, and ignore case
+            folder = os.path.join(filepath, '')
+            query += ' AND (filepath = ? OR substr(filepath, 1, length(?)) = ?)'
+            args += [filepath, folder, folder]
+        if kind not in ['', None]:
+            query += ' AND kind = ?'
+            args.append(kind)
+        
+        count = self.connection.execute(query, args).rowcount
+        self._hashes.clear()
+        
+        return count
+    
+    def clear(self):
+        """Remove everything from the cache.
+        """
+        self.connection.execute('DELETE FROM entries')
+        self.connection.execute('DELETE FROM files')
+        self.connection.execute('VACUUM')
+        self._hashes.clear()
+    
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits in `max_size`.
+        
+        Returns:
+            int: Number of evicted entries.
+        """
+        total = self.size()
+        if total <= self.max_size:
+            return 0
+        
+        evicted = 0
+        
+        for kind, filepath, size in self.connection.execute(
+            'SELECT kind, filepath, size FROM entries ORDER BY used ASC'
+        ).fetchall():
+            if total <= self.max_size:
+                break
+            
+            self.connection.execute(
+                'DELETE FROM entries WHERE kind = ? AND filepath = ?',
+                (kind, filepath),
+            )
+            total -= size
+            evicted += 1
+        
+        return evicted
+    
+    def size(self) -> int:
+        """Total size of the cached data in bytes.
+        """
+        return self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+    
+    def info(self) -> dict[str, int]:
+        return {
+            'entries' : self.connection.execute('SELECT COUNT(*) FROM entries').fetchone()[0],
+            'files' : self.connection.execute('SELECT COUNT(*) FROM files').fetchone()[0],
+            'size' : self.size(),
+            'max_size' : self.max_size,
+        }
+    
+    def refresh(self):
+        """Forget file hashes remembered during this run, so changed files are noticed.
+        """
+        self._hashes.clear()
+    
+    def commit(self):
+        """Write when entries were last used, and evict entries if the cache is too big, in one transaction.
+        """
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            self.connection.executemany(
+                'UPDATE entries SET used = ? WHERE kind = ? AND filepath = ?',
+                [(used, kind, filepath) for (kind, filepath), used in self._used.items()],
+            )
+            self.evict()
+        except:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.connection.execute('COMMIT')
+        self._used.clear()
+    
+    def close(self):
+        self.commit()
+        self.connection.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
+
+def main(argv : list[str] = None):
+    parser = argparse.ArgumentParser(
+        description = 'Manage the analysis cache.',
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default = DEFAULT_CACHE_DIR,
+        help = f'cache directory (default: {DEFAULT_CACHE_DIR})',
+    )
+    
+    commands = parser.add_subparsers(dest = 'command', required = True)
+    
+    commands.add_parser('info', help = 'show cache size')
+    commands.add_parser('clear', help = 'remove every cache entry')
+    
+    invalidate = commands.add_parser('invalidate', help = 'remove entries for files or folders')
+    invalidate.add_argument('paths', nargs = '*', help = 'files or folders on disk (default: everything)')
+    invalidate.add_argument('--kind', default = None, help = "only remove entries of this kind, e.g. 'WMW/level'")
+    
+    args = parser.parse_args(argv)
+    
+    with Analysis_Cache(args.cache_dir) as cache:
+        if args.command == 'info':
+            print(json.dumps(cache.info(), indent = 2))
+        elif args.command == 'clear':
+            cache.clear()
+            print('cleared cache')
+        elif args.command == 'invalidate':
+            count = 0
+            for path in args.paths or [None]:
+                count += cache.invalidate(path, args.kind)
+            print(f'removed {count} entries')
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Run the object analyses without a window.
+    
+    python cli.py types path/to/game --template object_type_lists/wmw-template.json --output wmw_objects.json
+    python cli.py elements path/to/game --output wmw_elements.json
+    python cli.py batch games.json --output-dir batch_output
+    python cli.py diff old/wmw_objects.json new/wmw_objects.json
+"""
+import sys
+import time
+import logging
+import argparse
+import typing
+
+import utils
+
+class Progress_Printer():
+    def __init__(
+        self,
+        label : str = '',
+        interval : float = 1.0,
+        stream : typing.TextIO = None,
+    ) -> None:
+        """Progress callback that prints text progress at most once every `interval` seconds, instead of on every call.
+        
+        Args:
+            label (str, optional): Text in front of every line. Defaults to ''.
+            interval (float, optional): Minimum seconds between lines. Defaults to 1.0.
+            stream (TextIO, optional): Stream to print to. Defaults to `sys.stderr`.
+        """
+        self.label = label
+        self.interval = interval
+        self.stream = stream
+        
+        self.last_time = 0.0
+    
+    def __call__(self, index : int, name : str, max : int):
+        now = time.monotonic()
+        
+        # always show when a step finishes
+        if now - self.last_time < self.interval and index < max and name != 'Done!':
+            return
+        
+        self.last_time = now
+        
+        print(
+            f'[{self.label}] ({index}/{max}) {name}',
+            file = self.stream or sys.stderr,
+            flush = True,
+        )
+
+def run_types(args : argparse.Namespace):
+    from object_types import Object_Analysis
+    
+    analysis = Object_Analysis(
+        args.gamepath,
+        args.assets,
+        args.game,
+        args.template,
+        args.output,
+        load_callback = None if args.quiet else Progress_Printer('load', args.interval),
+        analysis_callback = None if args.quiet else Progress_Printer('analysis', args.interval),
+        workers = args.workers,
+        cache = args.cache_dir,
+        write_index = args.index or args.update,
+        property_rules = args.property_rule,
+        compact = args.compact,
+        database = args.database,
+        metrics = args.metrics,
+        profile = args.profile,
+        loader = args.loader,
+        numeric_stats = args.numeric_stats,
+        memory_limit = args.memory_limit,
+        shard_dir = args.shard_dir,
+    )
+    
+    if args.update:
+        analysis.update()
+    else:
+        analysis.start()
+
+def run_elements(args : argparse.Namespace):
+    from object_elements import Object_Element_Analysis
+    
+    analysis = Object_Element_Analysis(
+        args.gamepath,
+        args.assets,
+        args.game,
+        args.output,
+        load_callback = None if args.quiet else Progress_Printer('load', args.interval),
+        analysis_callback = None if args.quiet else Progress_Printer('analysis', args.interval),
+        cache = args.cache_dir,
+        compact = args.compact,
+        metrics = args.metrics,
+        profile = args.profile,
+        loader = args.loader,
+        detailed_stats = not args.summary_only,
+        top = args.top,
+    )
+    
+    analysis.start()
+
+def run_batch(args : argparse.Namespace):
+    from batch import Batch_Analysis
+    
+    batch = Batch_Analysis.from_file(
+        args.config,
+        output_dir = args.output_dir,
+        template = args.template,
+        elements = args.elements,
+        analysis_callback = None if args.quiet else lambda name : Progress_Printer(name, args.interval),
+        workers = args.workers,
+        cache = args.cache_dir,
+        property_rules = args.property_rule,
+        compact = args.compact,
+        loader = args.loader,
+        metrics = args.metrics,
+        numeric_stats = args.numeric_stats,
+    )
+    
+    batch.start()
+
+def run_diff(args : argparse.Namespace):
+    import diff
+    
+    start_time = time.perf_counter()
+    
+    result = diff.diff_outputs(diff.load_output(args.old), diff.load_output(args.new))
+    
+    if args.output != None:
+        diff.export_diff(result, args.output, args.compact)
+    
+    summary = diff.summarize(result)
+    if summary != '':
+        print(summary)
+    
+    logging.info(f'Took: {time.perf_counter() - start_time} seconds')
+
+def main(argv : list[str] = None):
+    parser = argparse.ArgumentParser(
+        description = 'Analyze game objects without a window.',
+    )
+    
+    game = argparse.ArgumentParser(add_help = False)
+    game.add_argument('gamepath', help = 'path to the game directory')
+    game.add_argument('--assets', default = '/assets', help = "assets folder relative to the game path (default: '/assets')")
+    game.add_argument('--game', default = 'WMW', help = "game, e.g. 'WMW' (default: 'WMW')")
+    
+    common = argparse.ArgumentParser(add_help = False)
+    common.add_argument('--cache-dir', default = None, help = 'cache folder (default: no cache)')
+    common.add_argument('--compact', action = 'store_true', help = 'write the output without indentation')
+    common.add_argument('--interval', type = float, default = 1.0, help = 'seconds between progress lines (default: 1)')
+    common.add_argument('-q', '--quiet', action = 'store_true', help = 'do not print progress')
+    common.add_argument('-v', '--verbose', action = 'store_true', help = 'print debug logs')
+    common.add_argument('--log-file', default = None, help = 'also write logs to this file')
+    common.add_argument('--metrics', action = 'store_true', help = 'write phase timings next to the output, e.g. wmw_objects.metrics.json')
+    common.add_argument('--loader', choices = ['metadata', 'wmwpy'], default = 'metadata', help = "'metadata' only reads the xml, 'wmwpy' loads full wmwpy objects with sprites and images (default: metadata)")
+    common.add_argument('--profile', choices = ['cprofile', 'tracemalloc'], default = None, help = 'also profile the analysis and add the results to the metrics')
+    
+    commands = parser.add_subparsers(dest = 'command', required = True)
+    
+    types = commands.add_parser('types', parents = [game, common], help = 'find the properties and value types of every object type')
+    types.add_argument('--template', default = 'object_type_lists/wmw-template.json', help = 'object types template (default: object_type_lists/wmw-template.json)')
+    types.add_argument('-o', '--output', default = 'wmw_objects.json', help = 'output file (default: wmw_objects.json)')
+    types.add_argument('--database', default = None, metavar = 'PATH', help = 'also export a SQLite database, e.g. wmw_objects.sqlite')
+    types.add_argument('-j', '--workers', type = int, default = 1, help = 'worker processes for levels, 0 for one per cpu (default: 1)')
+    types.add_argument('--index', action = 'store_true', help = 'write an index next to the output for --update')
+    types.add_argument('--update', action = 'store_true', help = 'only analyze files that changed since the last run with --index')
+    types.add_argument('--property-rule', action = 'append', default = [], metavar = 'REGEX', help = 'extra property name rule, a regex with a `name` group (can be repeated)')
+    types.add_argument('--memory-limit', type = float, default = None, metavar = 'MB', help = 'spill partial results to disk past this many MiB, and merge them into the output at the end (can\'t be used with --index, --update or --database)')
+    types.add_argument('--shard-dir', default = None, help = 'folder for the spilled partial results (default: the system temporary folder)')
+    types.add_argument('--numeric-stats', action = 'store_true', help = 'add the min, max, mean and percentiles of numeric properties to the output (needs numpy)')
+    types.set_defaults(run = run_types)
+    
+    elements = commands.add_parser('elements', parents = [game, common], help = 'find the elements of every object')
+    elements.add_argument('-o', '--output', default = 'wmw_elements.json', help = 'output file (default: wmw_elements.json)')
+    elements.add_argument('--summary-only', action = 'store_true', help = 'only write the summary of every element, without the per object stats')
+    elements.add_argument('--top', type = int, default = 10, help = 'objects with the most of every element in the summary (default: 10)')
+    elements.set_defaults(run = run_elements)
+    
+    batch = commands.add_parser('batch', parents = [common], help = 'analyze several games in one process and compare them')
+    batch.add_argument('config', help = "JSON list of games, each with 'gamepath' and optionally 'name', 'assets', 'game' and 'template'")
+    batch.add_argument('-o', '--output-dir', default = 'batch_output', help = 'output folder, with one output per game and diff.json (default: batch_output)')
+    batch.add_argument('--template', default = 'object_type_lists/wmw-template.json', help = 'object types template for games without their own (default: object_type_lists/wmw-template.json)')
+    batch.add_argument('--elements', action = 'store_true', help = 'also find the elements of every game')
+    batch.add_argument('-j', '--workers', type = int, default = 1, help = 'worker processes for levels, 0 for one per cpu (default: 1)')
+    batch.add_argument('--property-rule', action = 'append', default = [], metavar = 'REGEX', help = 'extra property name rule, a regex with a `name` group (can be repeated)')
+    batch.add_argument('--numeric-stats', action = 'store_true', help = 'add the min, max, mean and percentiles of numeric properties to the outputs (needs numpy)')
+    batch.set_defaults(run = run_batch)
+    
+    diff = commands.add_parser('diff', help = 'compare the object types outputs of two builds of a game')
+    diff.add_argument('old', help = 'older output, e.g. old/wmw_objects.json')
+    diff.add_argument('new', help = 'newer output')
+    diff.add_argument('-o', '--output', default = None, help = 'also write the full diff to this JSON file')
+    diff.add_argument('--compact', action = 'store_true', help = 'write the diff without indentation')
+    diff.add_argument('-v', '--verbose', action = 'store_true', help = 'print debug logs')
+    diff.add_argument('--log-file', default = None, help = 'also write logs to this file')
+    diff.set_defaults(run = run_diff)
+    
+    args = parser.parse_args(argv)
+    
+    utils.createLogger(
+        'file' if args.log_file else 'stream',
+        filename = args.log_file,
+        level = logging.DEBUG if args.verbose else logging.INFO,
+    )
+    
+    args.run(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,203 @@
+import json
+import hashlib
+import typing
+
+from json_utils import dump_stream, _sort_key
+from type_inference import Type_Summary, parse_type
+
+DIGEST_SIZE = 16
+
+# type -> (digest of the type, property -> digest of the property)
+Output_Digests = dict[str, tuple[bytes, dict[str, bytes]]]
+
+def load_output(path : str) -> dict[str, dict[str, dict]]:
+    with open(path, 'r') as file:
+        return json.load(file)
+
+def get_property_digest(property : dict) -> bytes:
+    """Get a digest of a property in an analysis output. Lists are sorted first, so the digest doesn't depend on the order the values were written in.
+    """
+    canonical = {
+        key : sorted(value, key = _sort_key) if isinstance(value, list) else value
+        for key, value in property.items()
+    }
+    
+    return hashlib.blake2b(
+        json.dumps(canonical, sort_keys = True, separators = (',', ':'), default = str).encode(),
+        digest_size = DIGEST_SIZE,
+    ).digest()
+
+def get_digests(output : dict[str, dict[str, dict]]) -> Output_Digests:
+    """Get the digest of every property and every type in an analysis output. The digest of a type is made from the names and digests of its properties, so an unchanged type can be skipped with a single comparison.
+    """
+    digests = {}
+    
+    for type, properties in output.items():
+        property_digests = {name : get_property_digest(property) for name, property in properties.items()}
+        
+        type_hash = hashlib.blake2b(digest_size = DIGEST_SIZE)
+        for name in sorted(property_digests):
+            type_hash.update(name.encode())
+            type_hash.update(b'\0')
+            type_hash.update(property_digests[name])
+        
+        digests[type] = (type_hash.digest(), property_digests)
+    
+    return digests
+
+def compare_types(old : str, new : str) -> typing.Literal['widened', 'narrowed', 'changed']:
+    """Get how a data type changed, e.g. 'int' -> 'float' is widened, and 'float' -> 'int' is narrowed.
+    """
+    old_classification = parse_type(old)
+    new_classification = parse_type(new)
+    
+    if old == 'any' and new_classification != None:
+        return 'widened'
+    if new == 'any' and old_classification != None:
+        return 'narrowed'
+    if old_classification == None or new_classification == None:
+        return 'changed'
+    
+    summary = Type_Summary()
+    summary.add_classification(new_classification)
+    if not summary.add_classification(old_classification):
+        return 'widened'
+    
+    summary = Type_Summary()
+    summary.add_classification(old_classification)
+    if not summary.add_classification(new_classification):
+        return 'narrowed'
+    
+    return 'changed'
+
+def diff_property(old : dict, new : dict) -> dict:
+    """Compare one property in two outputs.
+    
+    Returns:
+        dict: `{'type' : [old, new], 'change' : 'widened' | 'narrowed' | 'changed', 'added_values', 'removed_values', 'added_files', 'removed_files'}`, with only the keys that changed.
+    """
+    result = {}
+    
+    old_type = old.get('type', 'any')
+    new_type = new.get('type', 'any')
+    if old_type != new_type:
+        result['type'] = [old_type, new_type]
+        result['change'] = compare_types(old_type, new_type)
+    
+    for key in ['values', 'files']:
+        old_items = set(old.get(key) or [])
+        new_items = set(new.get(key) or [])
+        
+        if old_items == new_items:
+            continue
+        
+        added = new_items - old_items
+        removed = old_items - new_items
+        if len(added) > 0:
+            result[f'added_{key}'] = added
+        if len(removed) > 0:
+            result[f'removed_{key}'] = removed
+    
+    return result
+
+def diff_outputs(
+    old : dict[str, dict[str, dict]],
+    new : dict[str, dict[str, dict]],
+    old_digests : Output_Digests = None,
+    new_digests : Output_Digests = None,
+) -> dict:
+    """Structural diff of two object type analysis outputs, e.g. `wmw_objects.json` of two builds of a game.
+    
+    Types and properties with the same digest in both outputs are skipped without comparing their values.
+    
+    Args:
+        old (dict[str, dict[str, dict]]): The older output.
+        new (dict[str, dict[str, dict]]): The newer output.
+        old_digests (Output_Digests, optional): Digests of the older output, from `get_digests()`. Defaults to computing them.
+        new_digests (Output_Digests, optional): Digests of the newer output. Defaults to computing them.
+    
+    Returns:
+        dict: `{'added_types' : [...], 'removed_types' : [...], 'types' : {type : {'added_properties' : {property : data type}, 'removed_properties' : {property : data type}, 'properties' : {property : diff_property()}}}}`. `types` only has the types in both outputs that changed.
+    """
+    if old_digests == None:
+        old_digests = get_digests(old)
+    if new_digests == None:
+        new_digests = get_digests(new)
+    
+    diff = {
+        'added_types' : [type for type in new if type not in old],
+        'removed_types' : [type for type in old if type not in new],
+        'types' : {},
+    }
+    
+    for type, properties in new.items():
+        if type not in old:
+            continue
+        
+        old_type_digest, old_property_digests = old_digests[type]
+        new_type_digest, new_property_digests = new_digests[type]
+        if old_type_digest == new_type_digest:
+            continue
+        
+        old_properties = old[type]
+        
+        result = {
+            'added_properties' : {
+                name : property.get('type', 'any')
+                for name, property in properties.items()
+                if name not in old_properties
+            },
+            'removed_properties' : {
+                name : property.get('type', 'any')
+                for name, property in old_properties.items()
+                if name not in properties
+            },
+            'properties' : {},
+        }
+        
+        for name, property in properties.items():
+            if name not in old_properties or old_property_digests[name] == new_property_digests[name]:
+                continue
+            
+            property_diff = diff_property(old_properties[name], property)
+            if len(property_diff) > 0:
+                result['properties'][name] = property_diff
+        
+        result = {key : value for key, value in result.items() if len(value) > 0}
+        if len(result) > 0:
+            diff['types'][type] = result
+    
+    return diff
+
+def export_diff(diff : dict, output : str, compact : bool = False):
+    with open(output, 'w') as file:
+        dump_stream(diff, file, indent = None if compact else 2)
+
+def summarize(diff : dict) -> str:
+    """Get a short text summary of a diff, one line per change.
+    """
+    lines = []
+    
+    for type in diff['added_types']:
+        lines.append(f'+ {type}')
+    for type in diff['removed_types']:
+        lines.append(f'- {type}')
+    
+    for type, result in diff['types'].items():
+        for name, data_type in result.get('added_properties', {}).items():
+            lines.append(f'+ {type}.{name} ({data_type})')
+        for name, data_type in result.get('removed_properties', {}).items():
+            lines.append(f'- {type}.{name} ({data_type})')
+        
+        for name, property in result.get('properties', {}).items():
+            changes = []
+            if 'type' in property:
+                old_type, new_type = property['type']
+                changes.append(f"{old_type} -> {new_type} ({property['change']})")
+            for key in ['added_values', 'removed_values', 'added_files', 'removed_files']:
+                if key in property:
+                    changes.append(f"{'+' if key.startswith('added') else '-'}{len(property[key])} {key.split('_')[1]}")
+            
+            lines.append(f"~ {type}.{name}: {', '.join(changes)}")
+    
+    return '\n'.join(lines)
@@ -0,0 +1,172 @@
+import os
+import json
+import fnmatch
+import typing
+import concurrent.futures
+
+LEVEL_PATTERN = '*/Levels/*.xml'
+OBJECT_PATTERN = '*.hs'
+
+MANIFEST_VERSION = 1
+
+def natural_sort(paths : typing.Iterable[str]) -> list[str]:
+    """Sort paths in the same order as the wmwpy filesystem, e.g. 'level2.xml' before 'level10.xml'.
+    """
+    try:
+        import natsort
+    except ImportError:
+        return sorted(paths)
+    
+    return natsort.natsorted(paths)
+
+def _scan_folder(path : str, prefix : str) -> tuple[dict[str, list[int]], list[tuple[str, str]]]:
+    """List a single folder.
+    
+    Returns:
+        tuple[dict[str, list[int]], list[tuple[str, str]]]: The files in the folder as `{asset path : [size, mtime_ns]}`, and the subfolders as `(path on disk, asset path)`.
+    """
+    files = {}
+    folders = []
+    
+    with os.scandir(path) as entries:
+        for entry in entries:
+            asset_path = f'{prefix}/{entry.name}'
+            
+            # like os.walk, symlinks to folders are not followed
+            if entry.is_dir():
+                if not entry.is_symlink():
+                    folders.append((entry.path, asset_path))
+                continue
+            
+            try:
+                stat = entry.stat()
+            except OSError:
+                # broken symlinks are still files to wmwpy
+                files[asset_path] = None
+                continue
+            
+            files[asset_path] = [stat.st_size, stat.st_mtime_ns]
+    
+    return files, folders
+
+def _scan_tree(path : str, prefix : str) -> dict[str, list[int]]:
+    files = {}
+    folders = [(path, prefix)]
+    
+    while len(folders) > 0:
+        folder, folder_prefix = folders.pop()
+        folder_files, subfolders = _scan_folder(folder, folder_prefix)
+        files.update(folder_files)
+        folders.extend(subfolders)
+    
+    return files
+
+class Asset_Manifest():
+    def __init__(
+        self,
+        files : dict[str, list[int] | None] = None,
+    ) -> None:
+        """Every file in the game assets, with its size and mtime, from a single walk of the asset folder.
+        
+        Args:
+            files (dict[str, list[int] | None], optional): Asset path (e.g. '/Objects/rock.hs') -> `[size, mtime_ns]`. Defaults to None.
+        """
+        self.files = files if files != None else {}
+        
+        self._sorted : list[str] = None
+        self._matches : dict[str, list[str]] = {}
+    
+    @classmethod
+    def scan(cls, path : str, workers : int = None) -> 'Asset_Manifest':
+        """Walk an asset folder once with `os.scandir`. The top level folders are walked in parallel threads, which helps most on cold or network drives.
+        
+        Args:
+            path (str): Path to the asset folder on disk.
+            workers (int, optional): Threads. Defaults to `min(8, os.cpu_count())`.
+        
+        Raises:
+            FileNotFoundError: The asset folder does not exist.
+        
+        Returns:
+            Asset_Manifest: The manifest.
+        """
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f'Folder {path} does not exist')
+        
+        if workers in [0, None]:
+            workers = min(8, os.cpu_count() or 1)
+        
+        files, folders = _scan_folder(path, '')
+        
+        if workers > 1 and len(folders) > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers = workers) as executor:
+                for folder_files in executor.map(lambda folder : _scan_tree(*folder), folders):
+                    files.update(folder_files)
+        else:
+            for folder in folders:
+                files.update(_scan_tree(*folder))
+        
+        return cls(files)
+    
+    def match(self, pattern : str) -> list[str]:
+        """Get the files that match a glob pattern, in natural order, like `wmwpy.Filesystem.listdir(recursive = True, search = pattern)`.
+        """
+        matches = self._matches.get(pattern)
+        if matches == None:
+            if self._sorted == None:
+                self._sorted = natural_sort(self.files)
+            
+            matches = fnmatch.filter(self._sorted, pattern)
+            self._matches[pattern] = matches
+        
+        return list(matches)
+    
+    def classify(self, patterns : dict[str, str]) -> dict[str, list[str]]:
+        """Get the files for several patterns at once.
+        
+        Args:
+            patterns (dict[str, str]): Name -> glob pattern, e.g. `{'levels' : '*/Levels/*.xml'}`.
+        
+        Returns:
+            dict[str, list[str]]: Name -> matching files.
+        """
+        return {name : self.match(pattern) for name, pattern in patterns.items()}
+    
+    def get_stat(self, path : str) -> list[int] | None:
+        return self.files.get(path)
+    
+    def get_changes(self, previous : 'Asset_Manifest') -> set[str]:
+        """Get the files that were added, removed or changed (size or mtime) since a previous manifest.
+        """
+        changed = {path for path, stat in self.files.items() if previous.files.get(path) != stat}
+        changed.update(path for path in previous.files if path not in self.files)
+        
+        return changed
+    
+    def __contains__(self, path : str) -> bool:
+        return path in self.files
+    
+    def __len__(self) -> int:
+        return len(self.files)
+    
+    def to_dict(self) -> dict:
+        return {
+            'version' : MANIFEST_VERSION,
+            'files' : self.files,
+        }
+    
+    @classmethod
+    def from_dict(cls, data : dict) -> 'Asset_Manifest':
+        if data.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"unsupported manifest version {data.get('version')}")
+        
+        return cls(data['files'])
+    
+    def save(self, path : str):
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, separators = (',', ':'))
+    
+    @classmethod
+    def load(cls, path : str) -> 'Asset_Manifest':
+        with open(path, 'r') as file:
+            return cls.from_dict(json.load(file))
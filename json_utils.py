@@ -1,4 +1,6 @@
-
+import json
+import typing
+from collections.abc import Mapping
 
 def make_json_friendly(data : list | dict | set):
     if isinstance(data, set):
@@ -27,4 +29,76 @@ def list_to_set(data : list | dict | set):
         return data
     
     else:
-        return data
\ No newline at end of file
+        return data
+
+def dump_stream(
+    data : typing.Any,
+    file : typing.TextIO,
+    indent : int | None = 2,
+    sort_keys : bool = True,
+    level : int = 0,
+):
+    """Write data as JSON piece by piece, without building the whole document in memory. Sets are written as sorted lists, and `data` is never modified. Any `Mapping` can be written, so lazy views work too.
+
+    With `indent = 2`, the output is the same as `json.dump(data, file, indent = 2, sort_keys = True)` with sorted sets.
+
+    Args:
+        data (Any): Data to write.
+        file (TextIO): File to write to.
+        indent (int | None, optional): Indent, or `None` for compact output. Defaults to 2.
+        sort_keys (bool, optional): Write object keys in sorted order. Defaults to True.
+        level (int, optional): Indent level to start at, to write a value inside a document that is written by hand. Defaults to 0.
+    """
+    write = file.write
+    
+    item_separator = ','
+    key_separator = ':' if indent == None else ': '
+    
+    def newline(level : int) -> str:
+        if indent == None:
+            return ''
+        return '\n' + ' ' * (indent * level)
+    
+    def write_value(value, level : int):
+        if isinstance(value, Mapping):
+            keys = sorted(value) if sort_keys else list(value)
+            if len(keys) == 0:
+                write('{}')
+                return
+            
+            write('{')
+            for index, key in enumerate(keys):
+                if index > 0:
+                    write(item_separator)
+                write(newline(level + 1))
+                write(json.dumps(str(key)))
+                write(key_separator)
+                write_value(value[key], level + 1)
+            write(newline(level))
+            write('}')
+        
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            if isinstance(value, (set, frozenset)):
+                value = sorted(value, key = _sort_key)
+            
+            if len(value) == 0:
+                write('[]')
+                return
+            
+            write('[')
+            for index, item in enumerate(value):
+                if index > 0:
+                    write(item_separator)
+                write(newline(level + 1))
+                write_value(item, level + 1)
+            write(newline(level))
+            write(']')
+        
+        else:
+            write(json.dumps(value))
+    
+    write_value(data, level)
+
+def _sort_key(value) -> tuple[str, str]:
+    # sets can mix types, e.g. None with strings
+    return (type(value).__name__, str(value))
@@ -0,0 +1,324 @@
+import os
+import json
+import time
+import math
+import heapq
+import random
+import typing
+import contextlib
+
+PROFILE_MODES = ['cprofile', 'tracemalloc']
+
+class Phase_Timings():
+    def __init__(
+        self,
+        slowest : int = 10,
+        samples : int = None,
+    ) -> None:
+        """Timings of the calls of one phase.
+        
+        Every call is kept with its file, unless `samples` is set. Then only the count, total and max, a heap of the slowest calls with a file, and a fixed size random sample of the times are kept, so the memory doesn't grow with the number of calls, and the percentiles are estimated from the sample.
+        
+        Args:
+            slowest (int, optional): Number of slowest calls to keep with `samples`. Defaults to 10.
+            samples (int, optional): Size of the sample of times. Defaults to keeping every call.
+        """
+        self.slowest = slowest
+        self.samples = samples
+        
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        
+        # every (seconds, file), without `samples`
+        self.calls : list[tuple[float, str | None]] = []
+        # with `samples`, a min heap of the slowest (seconds, file), and the sampled times
+        self.slowest_calls : list[tuple[float, str]] = []
+        self.times : list[float] = []
+        
+        # seeded, so reports are the same every run
+        self._random = random.Random(0)
+    
+    def add(self, seconds : float, file : str = None):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        
+        if self.samples == None:
+            self.calls.append((seconds, file))
+            return
+        
+        if file != None:
+            if len(self.slowest_calls) < self.slowest:
+                heapq.heappush(self.slowest_calls, (seconds, file))
+            elif seconds > self.slowest_calls[0][0]:
+                heapq.heapreplace(self.slowest_calls, (seconds, file))
+        
+        # reservoir sampling, so every call has the same chance to be in the sample
+        if len(self.times) < self.samples:
+            self.times.append(seconds)
+        else:
+            index = self._random.randrange(self.count)
+            if index < self.samples:
+                self.times[index] = seconds
+    
+    def limit(self, samples : int):
+        """Stop keeping every call, and only keep `samples` sampled times.
+        """
+        if self.samples != None:
+            return
+        
+        calls = self.calls
+        
+        self.samples = samples
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.calls = []
+        
+        for seconds, file in calls:
+            self.add(seconds, file)
+    
+    def merge(self, other : 'Phase_Timings'):
+        """Add the calls of another phase. If either phase only keeps a sample, the result does too.
+        """
+        if other.samples != None:
+            self.limit(other.samples)
+        
+        if other.samples == None:
+            for seconds, file in other.calls:
+                self.add(seconds, file)
+            return
+        
+        for seconds, file in other.slowest_calls:
+            if len(self.slowest_calls) < self.slowest:
+                heapq.heappush(self.slowest_calls, (seconds, file))
+            elif seconds > self.slowest_calls[0][0]:
+                heapq.heapreplace(self.slowest_calls, (seconds, file))
+        
+        if len(self.times) + len(other.times) <= self.samples:
+            self.times += other.times
+        else:
+            # take the times from both samples in proportion to the number of calls they stand for
+            mine = self._random.sample(self.times, len(self.times))
+            theirs = self._random.sample(other.times, len(other.times))
+            
+            times = []
+            while len(times) < self.samples:
+                if len(theirs) > 0 and (len(mine) == 0 or self._random.random() * (self.count + other.count) >= self.count):
+                    times.append(theirs.pop())
+                else:
+                    times.append(mine.pop())
+            self.times = times
+        
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+    
+    def report(self) -> dict:
+        if self.samples == None:
+            times = sorted(seconds for seconds, file in self.calls)
+            total = math.fsum(times)
+            slowest = sorted((call for call in self.calls if call[1] != None), key = lambda call : call[0], reverse = True)
+        else:
+            times = sorted(self.times)
+            total = self.total
+            slowest = sorted(self.slowest_calls, key = lambda call : call[0], reverse = True)
+        
+        report = {
+            'count' : self.count,
+            'total' : total,
+            'p50' : percentile(times, 50),
+            'p95' : percentile(times, 95),
+            'max' : self.max,
+        }
+        
+        if len(slowest) > 0:
+            report['slowest'] = [[file, seconds] for seconds, file in slowest[:self.slowest]]
+        
+        return report
+
+class Analysis_Metrics():
+    def __init__(
+        self,
+        slowest : int = 10,
+        profile : typing.Literal['cprofile', 'tracemalloc'] = None,
+        samples : int = None,
+    ) -> None:
+        """Timings of the phases of an analysis, e.g. loading the game, parsing every level, and exporting.
+        
+        Every phase keeps the time of each call, and the file it was for, so the report can show the total, percentiles and the slowest files of the phase.
+        
+        Args:
+            slowest (int, optional): Number of slowest files to report for every phase. Defaults to 10.
+            profile (Literal['cprofile', 'tracemalloc'], optional): Profiler to run between `start_profile()` and `stop_profile()`. Defaults to no profiler.
+            samples (int, optional): Only keep this many sampled times of every phase, with the count, total and slowest files, so the metrics don't grow with the number of files. Defaults to keeping every call.
+        """
+        if profile not in PROFILE_MODES + [None]:
+            raise ValueError(f'profile must be one of {PROFILE_MODES}')
+        
+        self.slowest = slowest
+        self.profile = profile
+        self.samples = samples
+        
+        self.phases : dict[str, Phase_Timings] = {}
+        self.counters : dict[str, int] = {}
+        
+        self._profiler = None
+        self.profile_stats : dict = None
+    
+    def get_phase(self, name : str) -> Phase_Timings:
+        if name not in self.phases:
+            self.phases[name] = Phase_Timings(self.slowest, self.samples)
+        return self.phases[name]
+    
+    def add(self, name : str, seconds : float, file : str = None):
+        self.get_phase(name).add(seconds, file)
+    
+    def count(self, name : str, amount : int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+    
+    @contextlib.contextmanager
+    def phase(self, name : str, file : str = None):
+        """Time a block as one call of a phase.
+        
+        Example
+        ```python
+        >> with metrics.phase('level_parse', path):
+        >>     level = game.Level(path)
+        ```
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, file)
+    
+    def merge(self, other : 'Analysis_Metrics'):
+        """Add the timings and counters of another instance, e.g. from a worker process.
+        """
+        for name, phase in other.phases.items():
+            self.get_phase(name).merge(phase)
+        
+        for name, amount in other.counters.items():
+            self.count(name, amount)
+    
+    def clear(self, keep : typing.Iterable[str] = ()):
+        """Remove the timings and counters, except the phases in `keep`, e.g. loading the game, which only happens once.
+        """
+        self.phases = {name : self.phases[name] for name in keep if name in self.phases}
+        self.counters = {}
+        self.profile_stats = None
+    
+    def start_profile(self):
+        """Start the profiler, if there is one.
+        """
+        if self.profile == 'cprofile':
+            import cProfile
+            
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.profile == 'tracemalloc':
+            import tracemalloc
+            
+            tracemalloc.start()
+            self._profiler = tracemalloc
+    
+    def stop_profile(self, output : str = None, limit : int = 30):
+        """Stop the profiler and keep the top functions (cProfile) or allocation sites (tracemalloc) for the report.
+        
+        Args:
+            output (str, optional): For cProfile, also write the full stats to this file, which can be opened with `pstats` or snakeviz. Defaults to None.
+            limit (int, optional): Number of entries in the report. Defaults to 30.
+        """
+        if self._profiler == None:
+            return
+        
+        if self.profile == 'cprofile':
+            import pstats
+            
+            self._profiler.disable()
+            if output not in ['', None]:
+                self._profiler.dump_stats(output)
+            
+            stats = pstats.Stats(self._profiler).stats
+            top = sorted(stats.items(), key = lambda item : item[1][3], reverse = True)[:limit]
+            
+            self.profile_stats = {
+                'mode' : 'cprofile',
+                'file' : output,
+                'functions' : [
+                    {
+                        'function' : f'{file}:{line}({function})',
+                        'calls' : calls,
+                        'total' : total,
+                        'cumulative' : cumulative,
+                    }
+                    for (file, line, function), (primitive_calls, calls, total, cumulative, callers) in top
+                ],
+            }
+        elif self.profile == 'tracemalloc':
+            snapshot = self._profiler.take_snapshot()
+            current, peak = self._profiler.get_traced_memory()
+            self._profiler.stop()
+            
+            self.profile_stats = {
+                'mode' : 'tracemalloc',
+                'current' : current,
+                'peak' : peak,
+                'allocations' : [
+                    {
+                        'line' : str(stat.traceback[0]),
+                        'size' : stat.size,
+                        'count' : stat.count,
+                    }
+                    for stat in snapshot.statistics('lineno')[:limit]
+                ],
+            }
+        
+        self._profiler = None
+    
+    def get_phase_report(self, name : str) -> dict:
+        if name not in self.phases:
+            return Phase_Timings(self.slowest).report()
+        return self.phases[name].report()
+    
+    def report(self) -> dict:
+        """Get the report, with the count, total, p50, p95, max and slowest files of every phase, the counters, and the profiler results.
+        """
+        report = {
+            'phases' : {name : self.get_phase_report(name) for name in self.phases},
+            'counters' : dict(self.counters),
+        }
+        if self.profile_stats != None:
+            report['profile'] = self.profile_stats
+        
+        return report
+    
+    def summary(self) -> str:
+        """Get a short text summary, one line per phase.
+        """
+        lines = []
+        for name in self.phases:
+            phase = self.get_phase_report(name)
+            lines.append(f"{name}: {phase['count']} calls, {phase['total']:.3f}s total, p50 {phase['p50'] * 1000:.1f}ms, p95 {phase['p95'] * 1000:.1f}ms")
+        
+        return '\n'.join(lines)
+    
+    def export(self, output : str):
+        with open(output, 'w') as file:
+            json.dump(self.report(), file, indent = 2)
+
+def percentile(values : list[float], percent : float) -> float:
+    """Get a percentile of sorted values, using the nearest rank.
+    """
+    if len(values) == 0:
+        return 0.0
+    
+    rank = math.ceil(percent / 100 * len(values))
+    return values[max(0, rank - 1)]
+
+def get_report_path(output : str, suffix : str = '.metrics.json') -> str:
+    """Get the path of a report next to an output file, e.g. 'wmw_objects.metrics.json'.
+    """
+    return os.path.splitext(output)[0] + suffix
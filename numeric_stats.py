@@ -0,0 +1,73 @@
+import typing
+
+from type_inference import classify
+
+PERCENTILES = (5, 50, 95)
+
+NUMERIC_TYPES = {'bit', 'int', 'float'}
+
+def group_numeric_values(values : typing.Iterable[str]) -> dict[int, list[str]]:
+    """Group the numeric values of a property by their number of components, e.g. '1.5' has 1 and '0 -9.8' has 2. Strings and comma separated lists are skipped.
+    """
+    groups = {}
+    
+    for value in values:
+        if not isinstance(value, str):
+            value = str(value)
+        
+        types, is_comma_list = classify(value)
+        if is_comma_list or any(type not in NUMERIC_TYPES for type in types):
+            continue
+        
+        groups.setdefault(len(types), []).append(value)
+    
+    return groups
+
+def get_numeric_stats(
+    values : typing.Iterable[str],
+    percentiles : typing.Sequence[float] = PERCENTILES,
+) -> dict[str, typing.Any] | None:
+    """Get the range and distribution of the numeric values of a property with NumPy.
+    
+    The values are parsed in one go into a 2D array with a row per value and a column per component, so vectors like 'PinOffset' get a range per component. If the values have different numbers of components, the most common one is used. The statistics are over the distinct values, since the analysis doesn't count how often a value is used.
+    
+    Args:
+        values (Iterable[str]): Property values.
+        percentiles (Sequence[float], optional): Percentiles to add as `p<percent>`. They use the nearest rank, so they are always values of the property. Defaults to (5, 50, 95).
+    
+    Returns:
+        dict[str, Any] | None: `{'count', 'min', 'max', 'mean', 'p5', 'p50', 'p95'}`, with a number for single values and a list per component for vectors, or None if there are no finite numeric values.
+    """
+    import numpy
+    
+    groups = group_numeric_values(values)
+    if len(groups) == 0:
+        return None
+    
+    # most values, then most components
+    components, group = max(groups.items(), key = lambda item : (len(item[1]), item[0]))
+    
+    array = numpy.array(' '.join(group).replace('_', '').split(), dtype = numpy.float64).reshape(-1, components)
+    array = array[numpy.isfinite(array).all(axis = 1)]
+    # every statistic is per component, so the columns can be sorted on their own, which makes the mean independent of the order of the values
+    array.sort(axis = 0)
+    if len(array) == 0:
+        return None
+    
+    def to_json(row : 'numpy.ndarray'):
+        row = [int(value) if value.is_integer() else value for value in row.tolist()]
+        return row[0] if components == 1 else row
+    
+    stats = {
+        'count' : len(array),
+        'min' : to_json(array.min(axis = 0)),
+        'max' : to_json(array.max(axis = 0)),
+        'mean' : to_json(array.mean(axis = 0)),
+    }
+    
+    if len(percentiles) > 0:
+        results = numpy.percentile(array, percentiles, axis = 0, method = 'inverted_cdf')
+        for percent, row in zip(percentiles, results):
+            stats[f'p{percent:g}'] = to_json(row)
+    
+    return stats
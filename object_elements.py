@@ -1,55 +1,24 @@
 import logging
 import os
-from datetime import datetime
 import time
-
-def createLogger(type = 'file', filename = 'logs/log.log'):
-    for handler in logging.root.handlers[:]:
-        logging.root.removeHandler(handler)
-    format = '[%(levelname)s] %(message)s'
-    datefmt = '%I:%M:%S %p'
-    level = logging.DEBUG
-
-    # filename = 'log.log'
-    
-    handlers = []
-
-    if type == 'file':
-        try:
-            os.mkdir('logs')
-        except:
-            pass
-        
-        handlers.append(logging.FileHandler(filename))
-        format = '[%(asctime)s] [%(levelname)s] %(message)s'
-
-        # logging.basicConfig(filename=filename, filemode='w', format=format, datefmt=datefmt, level=level)
-        # logger.info('logging file')
-    
-    handlers.append(logging.StreamHandler())
-    logging.basicConfig(format=format, datefmt=datefmt, level=level, handlers=handlers)
-    
-    logger = logging.getLogger(__name__)
-    logger.info(filename)
-
-
-_log_filename = f'logs/{datetime.now().strftime("%m-%d-%y_%H-%M-%S")}.log'
-
-createLogger('file', filename = _log_filename)
-
-
 import typing
-import tkinter as tk
-from tkinter import ttk
-from tkinter import filedialog
 import copy
-
-import wmwpy
+import threading
 import json
 
+import utils
 from json_utils import *
-from settings import Settings
+from cache import Analysis_Cache
+from metrics import Analysis_Metrics, get_report_path, percentile
+from asset_metadata import Metadata_Loader, Object_Metadata
+from discovery import Asset_Manifest, OBJECT_PATTERN
+
+# wmwpy is only imported when a game is loaded, because it takes most of the import time
+if typing.TYPE_CHECKING:
+    import wmwpy
 
+ELEMENTS = ('Shapes', 'Sprites', 'UVs', 'VertIndices', 'DefaultProperties')
+PERCENTILES = (50, 90, 95, 99)
 
 class Object_Element_Analysis():
     def __init__(
@@ -60,6 +29,14 @@ class Object_Element_Analysis():
         output : str = 'elements_output.json',
         load_callback : typing.Callable[[int, str, int], typing.Any] = None,
         analysis_callback : typing.Callable[[int, str, int], typing.Any] = None,
+        cache : str | Analysis_Cache = None,
+        compact : bool = False,
+        cancel_event : threading.Event = None,
+        metrics : bool = False,
+        profile : typing.Literal['cprofile', 'tracemalloc'] = None,
+        loader : typing.Literal['metadata', 'wmwpy'] = 'metadata',
+        detailed_stats : bool = True,
+        top : int = 10,
     ) -> None:
         if gamepath in ['', None]:
             raise TypeError('gamepath must be a path')
@@ -67,14 +44,41 @@ class Object_Element_Analysis():
         self.load_callback = load_callback
         self.anaysis_callback = analysis_callback
         
-        self.game : wmwpy.Game = wmwpy.load(
-            gamepath = gamepath,
-            assets = assets,
-            game = game,
-            load_callback = self.load_callback
-        )
+        self.cancel_event = cancel_event if cancel_event != None else threading.Event()
+        
+        self.gamepath = gamepath
+        self.assets = assets
+        self.game_name = game
+        
+        self.cache : Analysis_Cache = None
+        if isinstance(cache, Analysis_Cache):
+            self.cache = cache
+        elif cache not in ['', None]:
+            self.cache = Analysis_Cache(cache)
+        
+        if loader not in ['metadata', 'wmwpy']:
+            raise ValueError("loader must be 'metadata' or 'wmwpy'")
+        
+        # 'metadata' only reads the xml, 'wmwpy' loads full wmwpy objects with their sprites, to check the results
+        self.loader = loader
+        self.metadata = Metadata_Loader(gamepath, assets)
+        
+        self.metrics = Analysis_Metrics(profile = profile)
+        self.write_metrics = metrics or profile != None
+        
+        if not os.path.isdir(utils.asset_path(gamepath, assets, '')):
+            raise FileNotFoundError(f'Folder {utils.asset_path(gamepath, assets, "")} does not exist')
+        
+        # the wmwpy game is only loaded when it's used, see `game`
+        self._game : 'wmwpy.Game' = None
+        self.manifest : Asset_Manifest = None
         
         self.output_path = output
+        self.compact = compact
+        
+        # `stats` has the count of every object for every element, `summary` always has the distribution
+        self.detailed_stats = detailed_stats
+        self.top = top
         
         self.template = {'stats': {}, 'elements': {}}
         
@@ -88,6 +92,43 @@ class Object_Element_Analysis():
                 ]
             ]] = copy.deepcopy(self.template)
     
+    @property
+    def game(self) -> 'wmwpy.Game':
+        """The wmwpy game. It's loaded the first time it's used, which is only needed for `loader = 'wmwpy'`; files are found with `discover()`.
+        """
+        if self._game == None:
+            with self.metrics.phase('load'):
+                import wmwpy
+                
+                self._game = wmwpy.load(
+                    gamepath = self.gamepath,
+                    assets = self.assets,
+                    game = self.game_name,
+                    load_callback = self.load_callback
+                )
+        
+        return self._game
+    
+    def discover(self) -> Asset_Manifest:
+        """Find every file in the game assets with a single walk, and keep it in `self.manifest`.
+        """
+        with self.metrics.phase('list_files'):
+            self.manifest = Asset_Manifest.scan(utils.asset_path(self.gamepath, self.assets, ''))
+        
+        if callable(self.load_callback):
+            self.load_callback(len(self.manifest), 'Finished loading game', len(self.manifest))
+        
+        return self.manifest
+    
+    def cancel(self):
+        """Stop the analysis at the next file. `start()` raises `utils.Analysis_Cancelled`, and nothing is exported. This can be called from another thread.
+        """
+        self.cancel_event.set()
+    
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise utils.Analysis_Cancelled('analysis cancelled')
+    
     def start(
         self,
         anaysis_callback : typing.Callable[[int, str, int], typing.Any] = None,
@@ -100,27 +141,24 @@ class Object_Element_Analysis():
         
         start_time = time.time()
         
-        object_files = self.game.filesystem.listdir(
-            recursive = True,
-            search = '*.hs'
-        )
-        finished_objects = set()
+        self.metrics.clear(keep = ['load'])
+        self.metrics.start_profile()
+        
+        self.discover()
+        object_files = self.manifest.match(OBJECT_PATTERN)
         
         self.object_elements = copy.deepcopy(self.template)
         
         progress = 0
         
         for path in object_files:
+            self.check_cancelled()
             
             if callable(self.anaysis_callback):
                 self.anaysis_callback(progress, path, len(object_files))
             
             try:
-                obj = self.game.Object(
-                    path,
-                )
-                
-                self.analyze_object(obj)
+                self.object_elements['elements'][path] = self.load_object(path)
             except:
                 logging.exception(f'unable to analyze object {path}')
             
@@ -129,18 +167,67 @@ class Object_Element_Analysis():
         if callable(self.anaysis_callback):
             self.anaysis_callback(progress, 'Done!', len(object_files))
         
-        self.get_stats()
-        self.export_object_elements()
+        if self.cache != None:
+            logging.info(f'cache: {self.cache.hits} hits, {self.cache.misses} misses')
+            self.cache.commit()
+        
+        with self.metrics.phase('stats'):
+            self.get_stats()
+        with self.metrics.phase('export'):
+            self.export_object_elements()
         
         end_time = time.time()
         
+        self.metrics.add('total', end_time - start_time)
+        self.metrics.stop_profile(get_report_path(self.output_path, '.prof') if self.write_metrics else None)
+        
+        logging.debug(f'metrics:\n{self.metrics.summary()}')
+        
+        if self.write_metrics:
+            self.metrics.export(get_report_path(self.output_path))
+        
         logging.info(f'Took: {end_time - start_time} seconds')
     
-    def analyze_object(self, object : wmwpy.classes.Object):
+    def load_object(self, path : str) -> dict[str, int]:
+        """Get the element counts of an object file, from the cache if it has not changed.
+        
+        Args:
+            path (str): Path to `.hs` object file.
+        
+        Returns:
+            dict[str, int]: Element counts.
+        """
+        if self.cache != None:
+            filepath = utils.asset_path(self.gamepath, self.assets, path)
+            kind = f'{self.game_name}/elements/{self.loader}'
+            
+            elements = self.cache.get(kind, filepath)
+            if elements != None:
+                self.metrics.count('object_cache_hits')
+                return elements
+        
+        with self.metrics.phase('object_load', path):
+            if self.loader == 'wmwpy':
+                obj = self.game.Object(
+                    path,
+                )
+            else:
+                obj = self.metadata.load_object(path)
+        elements = self.get_elements(obj)
+        
+        if self.cache != None:
+            self.cache.put(kind, filepath, elements)
+        
+        return elements
+    
+    def analyze_object(self, object : 'wmwpy.classes.Object'):
         name = object.filename
         self.object_elements['elements'].setdefault(name, {})
         
-        self.object_elements['elements'][name] = {
+        self.object_elements['elements'][name] = self.get_elements(object)
+    
+    def get_elements(self, object : 'wmwpy.classes.Object | Object_Metadata') -> dict[str, int]:
+        return {
             'Shapes': len(object.shapes),
             'Sprites': len(object.sprites),
             'UVs': len(object.UVs),
@@ -149,6 +236,14 @@ class Object_Element_Analysis():
         }
     
     def get_stats(self):
+        """Add the `summary` of every element, and the per object `stats` if `self.detailed_stats` is set.
+        """
+        self.object_elements['summary'] = self.get_summary()
+        
+        if not self.detailed_stats:
+            self.object_elements.pop('stats', None)
+            return
+        
         self.object_elements['stats'] = {
             'Shapes': {},
             'Sprites': {},
@@ -160,307 +255,138 @@ class Object_Element_Analysis():
             for stat in self.object_elements['elements'][obj]:
                 if self.object_elements['elements'][obj][stat]:
                     self.object_elements['stats'][stat][obj] = self.object_elements['elements'][obj][stat]
+    
+    def get_summary(self) -> dict[str, dict[str, typing.Any]]:
+        """Get the distribution of every element over all objects with NumPy. The counts are put in one array with a row per object and a column per element, and every statistic is computed for all columns at once. Without NumPy, the same summary is made with `get_python_summary()`.
         
-    def export_object_elements(self, output = None):
-        if output not in ['', None] and isinstance(output, str):
-            self.output_path = output
-
-        object_elements = make_json_friendly(self.object_elements)
-        
-        with open(self.output_path, 'w') as file:
-            json.dump(object_elements, file, indent = 2)
-
-class Objects_analysis_gui(tk.Tk):
-    def __init__(self, master = None, *args, **kwargs):
-        super().__init__(master, *args, **kwargs)
-        self.title('Find object properties')
-        self.geometry('%dx%d' % (500 , 300) )
-        
-        self.settings = Settings(
-            'config_object_elements.json',
-            {
-                'version' : 1,
-                'gamepath' : '',
-                'assets' : '/assets',
-                'game' : 'WMW',
-                'output' : 'wmw_elements.json',
-            }
-        )
+        The histogram has power of two buckets: 0, 1, 2-3, 4-7, 8-15, and so on, as `[min, max, objects]`.
         
-        self.game : wmwpy.Game = None
-
-        self.create_window()
-
-    def create_window(self):
-        self.create_config()
-        self.start_button = ttk.Button(
-            text = 'Start',
-            command = self.start_analysis,
-        )
-        self.start_button.pack()
-        self.create_progress_bars()
-    
-    def create_config(self):
-        self.config_frame = ttk.Frame()
-        self.config_frame.pack(side = 'top', fill = 'both', )
-        self.config_frame.columnconfigure(1, weight=1)
-        
-        self.config_widgets : dict[str, tk.Widget | dict[str, tk.Widget]] = {}
-        
-        def create_row(
-            parent : tk.Widget = self,
-            label_text : str = '',
-            entry_type : typing.Literal['text', 'options'] = 'text',
-            entry_callback : typing.Callable[[str], str] = None,
-            default_value : str = '',
-            use_button : bool = True,
-            button_text : str = 'Browse',
-            button_callback : typing.Callable[[str], typing.Any] = None,
-            row = 0,
-            options : list[str] = []
-        ) -> dict[typing.Literal[
-            'label',
-            'var',
-            'entry',
-            'button',
-        ]]:
-            
-            label = ttk.Label(
-                parent,
-                text = label_text,
-            )
-            label.grid(row = row, column = 0, sticky='ew', padx=4, pady=2)
-            
-            var = tk.StringVar(
-                value = default_value,
-            )
-            var.trace_add(
-                'write',
-                lambda *args : entry_callback(var.get()),
-            )
-            
-            def get_entry(
-                type : typing.Literal['text', 'options'],
-                var,
-                options : list = [],
-            ):
-                if type == 'options':
-                    return ttk.Combobox(
-                        parent,
-                        textvariable = var,
-                        values = options,
-                    )
-                else:
-                    return ttk.Entry(
-                        parent,
-                        textvariable = var,
-                    )
-            
-            entry = get_entry(
-                entry_type,
-                var = var,
-                options = options,
-            )
-            # entry.insert(0, var.get())
-            entry.grid(row = row, column = 1, sticky = 'ew', padx=4, pady=2)
-            
-            button = None
-            
-            if use_button:
-                button = ttk.Button(
-                    parent,
-                    text = button_text,
-                    command = lambda *args : var.set(button_callback(var.get())),
-                )
-                button.grid(row = row, column = 2, sticky = 'ew', padx=4, pady=2)
-            
-            return {
-                'label' : label,
-                'var' : var,
-                'entry' : entry,
-                'button' : button,
-            }
+        Returns:
+            dict[str, dict[str, Any]]: Element -> `{'count', 'nonzero', 'total', 'min', 'max', 'mean', 'p50', 'p90', 'p95', 'p99', 'histogram', 'top'}`. `count` is the number of objects, `nonzero` the number of objects that have the element, and `top` the `self.top` objects with the most (leaving out objects without the element), as `[object, count]`.
+        """
+        try:
+            import numpy
+        except ImportError:
+            return self.get_python_summary()
         
-        def validate(
-            default = '',
-            result = None,
-        ):
-            
-            if result in ['', None]:
-                return default
-            else:
-                return result
-        
-        self.config_widgets['gamepath'] = create_row(
-            self.config_frame,
-            label_text = 'Game path',
-            entry_type = 'text',
-            entry_callback = lambda value : self.settings.set('gamepath', value),
-            default_value = self.settings.get('gamepath'),
-            button_callback = lambda path : validate(
-                path,
-                filedialog.askdirectory(
-                    initialdir = os.path.dirname(path),
-                    title = 'Game directory',
-                )
-            ),
-            row = 0,
-        )
-        self.config_widgets['assets'] = create_row(
-            self.config_frame,
-            label_text = 'Assets path',
-            entry_type = 'text',
-            entry_callback = lambda value : self.settings.set('assets', value),
-            default_value = self.settings.get('assets'),
-            button_callback = lambda path : os.path.relpath(
-                validate(
-                    wmwpy.Utils.path.joinPath(self.settings.get('gamepath'), path),
-                    filedialog.askdirectory(
-                        initialdir = os.path.dirname(wmwpy.Utils.path.joinPath(self.settings.get('gamepath'), path)),
-                        title = 'Assets directory',
-                    )
-                ),
-                self.settings.get('gamepath')
-            ),
-            row = 1,
-        )
-        self.config_widgets['game'] = create_row(
-            self.config_frame,
-            label_text = 'Game',
-            entry_type = 'options',
-            options = list(wmwpy.GAMES.keys()),
-            entry_callback = lambda value : self.settings.set('game', value),
-            default_value = self.settings.get('game'),
-            use_button = False,
-            row = 2,
-        )
-        self.config_widgets['output'] = create_row(
-            self.config_frame,
-            label_text = 'Output',
-            entry_type = 'text',
-            entry_callback = lambda value : self.settings.set('output', value),
-            default_value = self.settings.get('output'),
-            button_callback = lambda path : validate(
-                path,
-                filedialog.asksaveasfilename(
-                    title = 'Select output filename',
-                    defaultextension = '.json',
-                    filetypes = (('JSON file', '.json'),
-                                 ('Any', '*.*')),
-                    initialdir = os.path.dirname(path),
-                )
-            ),
-            row = 4,
-        )
+        elements = self.object_elements['elements']
+        names = list(elements)
         
+        counts = numpy.array(
+            [[elements[name].get(element, 0) for element in ELEMENTS] for name in names],
+            dtype = numpy.int64,
+        ).reshape(len(names), len(ELEMENTS))
         
+        if len(names) == 0:
+            return {element : {'count' : 0} for element in ELEMENTS}
         
-    def create_progress_bars(self):
+        minimum = counts.min(axis = 0)
+        maximum = counts.max(axis = 0)
+        mean = counts.mean(axis = 0)
+        total = counts.sum(axis = 0)
+        nonzero = numpy.count_nonzero(counts, axis = 0)
+        percentiles = numpy.percentile(counts, PERCENTILES, axis = 0, method = 'inverted_cdf')
         
-        self.progress_frame = ttk.Frame()
-        self.progress_frame.columnconfigure(0, weight = 1, uniform = 'progress')
-        self.progress_frame.columnconfigure(1, weight = 1, uniform = 'progress')
-        self.progress_frame.pack(side = 'bottom', fill = 'both', )
+        # the exponent of a count is its bucket, e.g. 5 = 0.625 * 2**3 is in bucket 3 (4-7), and 0 is in bucket 0
+        buckets = numpy.frexp(counts.astype(numpy.float64))[1]
+        # the objects with the most first, and in file order if they have the same
+        top = numpy.argsort(-counts, axis = 0, kind = 'stable')[:self.top]
         
-        self.progress_bars : dict[typing.Literal['full', 'loading'], dict[typing.Literal['progress', 'label', 'var', 'callback'], ttk.Progressbar | ttk.Label | tk.StringVar]] = {
-            'full' : {},
-            'loading' : {},
-        }
+        summary = {}
         
-        def create_progress_bar(
-            parent : tk.Widget = self,
-            row : int = 0,
-        ) -> dict[typing.Literal[
-            'var',
-            'progress',
-            'label',
-            'callback',
-        ], tk.StringVar |
-           ttk.Progressbar |
-           ttk.Label]:
+        for column, element in enumerate(ELEMENTS):
+            histogram = numpy.bincount(buckets[:, column])
             
-            var = tk.StringVar()
+            summary[element] = {
+                'count' : len(names),
+                'nonzero' : int(nonzero[column]),
+                'total' : int(total[column]),
+                'min' : int(minimum[column]),
+                'max' : int(maximum[column]),
+                'mean' : float(mean[column]),
+                **{f'p{percent}' : int(value) for percent, value in zip(PERCENTILES, percentiles[:, column])},
+                'histogram' : [
+                    get_histogram_bucket(bucket, objects)
+                    for bucket, objects in enumerate(histogram.tolist())
+                    if objects > 0
+                ],
+                'top' : [[names[row], int(counts[row, column])] for row in top[:, column].tolist() if counts[row, column] > 0],
+            }
+        
+        return summary
+    
+    def get_python_summary(self) -> dict[str, dict[str, typing.Any]]:
+        """Get the same summary as `get_summary()` without NumPy, one element at a time.
+        """
+        elements = self.object_elements['elements']
+        names = list(elements)
+        
+        if len(names) == 0:
+            return {element : {'count' : 0} for element in ELEMENTS}
+        
+        summary = {}
+        
+        for element in ELEMENTS:
+            counts = [elements[name].get(element, 0) for name in names]
+            ordered = sorted(counts)
             
-            progress : ttk.Progressbar = ttk.Progressbar(
-                parent
-            )
-            progress.grid(row = row, column = 0, sticky = 'ew', padx = 4, pady = 2)
+            # the bit length of a count is the same bucket as its exponent
+            histogram = {}
+            for count in counts:
+                histogram[count.bit_length()] = histogram.get(count.bit_length(), 0) + 1
             
-            label = ttk.Label(
-                parent,
-                textvariable = var,
-            )
-            label.grid(row = row, column = 1, sticky = 'ew', padx = 4, pady = 2)
+            # sorted() is stable, so objects with the same count stay in file order
+            top = sorted(range(len(names)), key = lambda row : -counts[row])[:self.top]
             
-            def callback(index, name, max):
-                progress['max'] = max
-                progress['value'] = index
-                var.set(f'({index}/{max}) {name}')
-                
-                self.update()
-            
-            return {
-                'var' : var,
-                'label' : label,
-                'progress' : progress,
-                'callback' : callback,
+            summary[element] = {
+                'count' : len(names),
+                'nonzero' : len(counts) - counts.count(0),
+                'total' : sum(counts),
+                'min' : ordered[0],
+                'max' : ordered[-1],
+                'mean' : sum(counts) / len(counts),
+                **{f'p{percent}' : percentile(ordered, percent) for percent in PERCENTILES},
+                'histogram' : [get_histogram_bucket(bucket, histogram[bucket]) for bucket in sorted(histogram)],
+                'top' : [[names[row], counts[row]] for row in top if counts[row] > 0],
             }
-            
-        self.progress_bars['full'] = create_progress_bar(
-            self.progress_frame,
-            row = 0,
-        )
-        self.progress_bars['loading'] = create_progress_bar(
-            self.progress_frame,
-            row = 1,
-        )
-        
-    def set_state(
-        self,
-        state : typing.Literal['enabled', 'disabled'] = 'enabled',
-        widget : tk.Widget = None,
-    ):
-        if widget == None:
-            widget = self
-        
-        if len(widget.winfo_children()) < 1:
-            return
         
-        for child in widget.winfo_children():
-            try:
-                child.configure(state = state)
-            except:
-                pass
-            # if isinstance(child, (tk.Frame, ttk.Frame)):
-            #     self.set_state(
-            #         state,
-            #         child,
-            #     )
-
-    def start_analysis(self):
-        self.set_state('disabled')
-        self.set_state('disabled', self.config_frame)
+        return summary
+    
+    def export_object_elements(self, output = None, compact : bool = None):
+        """Export the object elements as JSON, with sorted keys.
         
-        try:
-            analysis = Object_Element_Analysis(
-                self.settings.get('gamepath'),
-                self.settings.get('assets'),
-                self.settings.get('game'),
-                self.settings.get('output'),
-                load_callback = self.progress_bars['loading']['callback'],
-                analysis_callback = self.progress_bars['full']['callback'],
-            )
-            
-            analysis.start()
-        except:
-            logging.exception('analysis error')
+        Args:
+            output (str, optional): Output path. Defaults to `self.output_path`.
+            compact (bool, optional): Write without indentation. Defaults to `self.compact`.
+        """
+        if output not in ['', None] and isinstance(output, str):
+            self.output_path = output
+        if compact == None:
+            compact = self.compact
         
-        self.set_state('enabled')
-        self.set_state('enabled', self.config_frame)
+        with open(self.output_path, 'w') as file:
+            dump_stream(self.object_elements, file, indent = None if compact else 2)
+
+def get_histogram_bucket(bucket : int, objects : int) -> list[int]:
+    """Get the `[min, max, objects]` of a power of two histogram bucket, where bucket 0 is 0, 1 is 1, 2 is 2-3, 3 is 4-7, and so on.
+    """
+    if bucket == 0:
+        return [0, 0, int(objects)]
+    return [1 << (bucket - 1), (1 << bucket) - 1, int(objects)]
+
+def __getattr__(name : str):
+    # the window is in object_elements_gui, so tkinter is only imported when it's used
+    if name == 'Objects_analysis_gui':
+        import object_elements_gui
+        return object_elements_gui.Objects_analysis_gui
+    
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 def main():
-    app = Objects_analysis_gui()
-    app.mainloop()
+    utils.createLogger('file')
+    
+    import object_elements_gui
+    object_elements_gui.main()
 
 if __name__ == '__main__':
     main()
@@ -1,4 +1,3 @@
-
 import traceback
 import logging
 import os
@@ -6,57 +5,31 @@ import sys
 import subprocess
 import io
 import platform
-from datetime import datetime
 import time
-
-import utils
-
-def createLogger(type = 'file', filename = 'logs/log.log'):
-    for handler in logging.root.handlers[:]:
-        logging.root.removeHandler(handler)
-    format = '[%(levelname)s] %(message)s'
-    datefmt = '%I:%M:%S %p'
-    level = logging.DEBUG
-
-    # filename = 'log.log'
-    
-    handlers = []
-
-    if type == 'file':
-        try:
-            os.mkdir('logs')
-        except:
-            pass
-        
-        handlers.append(logging.FileHandler(filename))
-        format = '[%(asctime)s] [%(levelname)s] %(message)s'
-
-        # logging.basicConfig(filename=filename, filemode='w', format=format, datefmt=datefmt, level=level)
-        # logger.info('logging file')
-    
-    handlers.append(logging.StreamHandler())
-    logging.basicConfig(format=format, datefmt=datefmt, level=level, handlers=handlers)
-    
-    logger = logging.getLogger(__name__)
-    logger.info(filename)
-
-
-_log_filename = f'logs/{datetime.now().strftime("%m-%d-%y_%H-%M-%S")}.log'
-
-createLogger('file', filename = _log_filename)
-
-
 import typing
-import tkinter as tk
-from tkinter import ttk
-from tkinter import filedialog
 import copy
-
-import wmwpy
+import threading
+import multiprocessing
+import math
+import collections
+import concurrent.futures
 import json
 
+import utils
+import type_inference
+import objects_database
 from json_utils import *
-from settings import Settings
+from cache import Analysis_Cache
+from store import Property_Store, Interner
+from property_names import Property_Normalizer, Rule
+from metrics import Analysis_Metrics, get_report_path
+from asset_metadata import Metadata_Loader, Object_Metadata
+from discovery import Asset_Manifest, LEVEL_PATTERN, OBJECT_PATTERN
+from shards import Shard_Spiller, dump_merged
+
+# wmwpy is only imported when a game is loaded, because it takes most of the import time
+if typing.TYPE_CHECKING:
+    import wmwpy
 
 OBJECT_TYPES : dict[
     str, dict[
@@ -68,6 +41,18 @@ OBJECT_TYPES : dict[
         ]
     ]] = {}
 
+# version of the object records, which is part of the cache keys
+RECORD_VERSION = 2
+
+# version of the index kept next to the output for `update()`
+INDEX_VERSION = 2
+
+# most levels in one worker slice with a memory limit, since every slice is a partial store in memory
+SHARD_SLICE_SIZE = 16
+
+# sampled times per metrics phase with a memory limit, instead of the time of every file
+METRICS_SAMPLES = 1000
+
 class Object_Analysis():
     def __init__(
         self,
@@ -78,6 +63,21 @@ class Object_Analysis():
         output : str = 'objects_output.json',
         load_callback : typing.Callable[[int, str, int], typing.Any] = None,
         analysis_callback : typing.Callable[[int, str, int], typing.Any] = None,
+        workers : int = 1,
+        cache : str | Analysis_Cache = None,
+        write_index : bool = False,
+        property_rules : typing.Iterable[Rule] = None,
+        compact : bool = False,
+        database : str = None,
+        cancel_event : threading.Event = None,
+        metrics : bool = False,
+        profile : typing.Literal['cprofile', 'tracemalloc'] = None,
+        loader : typing.Literal['metadata', 'wmwpy'] = 'metadata',
+        value_ids : Interner = None,
+        file_ids : Interner = None,
+        numeric_stats : bool = False,
+        memory_limit : float = None,
+        shard_dir : str = None,
     ) -> None:
         if gamepath in ['', None]:
             raise TypeError('gamepath must be a path')
@@ -85,12 +85,63 @@ class Object_Analysis():
         self.load_callback = load_callback
         self.anaysis_callback = analysis_callback
         
-        self.game : wmwpy.Game = wmwpy.load(
-            gamepath = gamepath,
-            assets = assets,
-            game = game,
-            load_callback = self.load_callback
-        )
+        self.cancel_event = cancel_event if cancel_event != None else threading.Event()
+        
+        self.gamepath = gamepath
+        self.assets = assets
+        self.game_name = game
+        
+        if workers in [0, None]:
+            workers = os.cpu_count() or 1
+        self.workers = max(1, int(workers))
+        
+        self.cache : Analysis_Cache = None
+        if isinstance(cache, Analysis_Cache):
+            self.cache = cache
+        elif cache not in ['', None]:
+            self.cache = Analysis_Cache(cache)
+        
+        self.write_index = write_index
+        self.index : dict[
+            typing.Literal['version', 'game', 'files', 'sources'],
+            typing.Any,
+        ] = None
+        self._contributions : set[tuple[str, str, str, str]] = None
+        
+        # object file -> property override sets it was seen with in levels
+        self.seen_objects : dict[str, set[frozenset[str]]] = {}
+        self.skipped_objects = 0
+        
+        self.property_rules = list(property_rules or [])
+        self.normalizer = Property_Normalizer(self.property_rules)
+        
+        if loader not in ['metadata', 'wmwpy']:
+            raise ValueError("loader must be 'metadata' or 'wmwpy'")
+        
+        # 'metadata' only reads the xml, 'wmwpy' loads full wmwpy objects with their sprites, to check the results
+        self.loader = loader
+        self.metadata = Metadata_Loader(gamepath, assets)
+        
+        # timings are always kept, but only written next to the output when asked for. With a memory limit they're sampled, so they don't grow with the number of files
+        self.metrics = Analysis_Metrics(profile = profile, samples = None if memory_limit == None else METRICS_SAMPLES)
+        self.write_metrics = metrics or profile != None
+        
+        # min, max, mean and percentiles of numeric properties, which needs numpy
+        self.numeric_stats = numeric_stats
+        
+        # MiB of partial results to keep in memory before spilling them to disk, see `check_memory()`
+        if memory_limit != None and (write_index or database not in ['', None]):
+            raise ValueError("memory_limit can't be used with write_index or database, which need every result in memory")
+        self.memory_limit = memory_limit
+        self.shard_dir = shard_dir
+        self.shards : Shard_Spiller = None
+        
+        if not os.path.isdir(utils.asset_path(gamepath, assets, '')):
+            raise FileNotFoundError(f'Folder {utils.asset_path(gamepath, assets, "")} does not exist')
+        
+        # the wmwpy game is only loaded when it's used, see `game`
+        self._game : 'wmwpy.Game' = None
+        self.manifest : Asset_Manifest = None
         
         self.template : dict[
             str, dict[
@@ -102,6 +153,8 @@ class Object_Analysis():
                 ]
             ]] = {}
         self.output_path = output
+        self.compact = compact
+        self.database_path = database
         
         if template not in ['', None]:
             if isinstance(template, str):
@@ -111,15 +164,75 @@ class Object_Analysis():
                 self.template = copy.deepcopy(template)
         self.template = list_to_set(self.template)
         
-        self.object_types : dict[
+        # the interners can be shared between analyses, e.g. several games in a batch
+        self.value_ids = value_ids if value_ids != None else Interner()
+        self.file_ids = file_ids if file_ids != None else Interner()
+        
+        self.store = self.new_store(self.template)
+    
+    @property
+    def game(self) -> 'wmwpy.Game':
+        """The wmwpy game. It's loaded the first time it's used, which is only needed for `loader = 'wmwpy'`; files are found with `discover()`.
+        """
+        if self._game == None:
+            with self.metrics.phase('load'):
+                import wmwpy
+                
+                self._game = wmwpy.load(
+                    gamepath = self.gamepath,
+                    assets = self.assets,
+                    game = self.game_name,
+                    load_callback = self.load_callback
+                )
+        
+        return self._game
+    
+    def discover(self) -> Asset_Manifest:
+        """Find every file in the game assets with a single walk, and keep it in `self.manifest`.
+        """
+        with self.metrics.phase('list_files'):
+            self.manifest = Asset_Manifest.scan(utils.asset_path(self.gamepath, self.assets, ''))
+        
+        if callable(self.load_callback):
+            self.load_callback(len(self.manifest), 'Finished loading game', len(self.manifest))
+        
+        return self.manifest
+    
+    @property
+    def object_types(self) -> dict[
+        str, dict[
             str, dict[
-                str, dict[
-                    typing.Literal[
-                        'type',
-                        'values'
-                    ], typing.Literal['int', 'float', 'bool', 'bit', 'string'] | set[str]
-                ]
-            ]] = copy.deepcopy(self.template)
+                typing.Literal[
+                    'type',
+                    'values',
+                    'files',
+                ], typing.Literal['int', 'float', 'bool', 'bit', 'string'] | set[str]
+            ]
+        ]]:
+        """The observed properties of every object type, built from `self.store`. Changing the returned dict does not change the store, but it can be assigned to replace the store.
+        """
+        return self.store.to_dict()
+    
+    @object_types.setter
+    def object_types(self, object_types : dict):
+        self.store = self.new_store(object_types)
+    
+    def new_store(self, object_types : dict = None) -> Property_Store:
+        """Make a store that uses the interners of this analysis.
+        
+        Args:
+            object_types (dict, optional): Data in the `object_types` format. Defaults to an empty store.
+        """
+        return Property_Store.from_dict(object_types or {}, self.value_ids, self.file_ids)
+    
+    def cancel(self):
+        """Stop the analysis at the next file. `start()` raises `utils.Analysis_Cancelled`, and nothing is exported. This can be called from another thread.
+        """
+        self.cancel_event.set()
+    
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise utils.Analysis_Cancelled('analysis cancelled')
     
     def start(
         self,
@@ -133,514 +246,989 @@ class Object_Analysis():
         
         start_time = time.time()
         
-        level_files = self.game.filesystem.listdir(
-            recursive = True,
-            search = '*/Levels/*.xml'
-        )
-        object_files = self.game.filesystem.listdir(
-            recursive = True,
-            search = '*.hs'
-        )
-        finished_objects = set()
+        self.metrics.clear(keep = ['load'])
+        self.metrics.start_profile()
         
-        self.object_types = copy.deepcopy(self.template)
+        self.discover()
+        level_files = self.manifest.match(LEVEL_PATTERN)
+        object_files = self.manifest.match(OBJECT_PATTERN)
+        self.store = self.new_store(self.template)
+        self.seen_objects = {}
+        self.shards = None
+        if self.write_index:
+            self.index = self.new_index()
         
         progress = 0
         
         logging.debug(level_files)
         
-        for path in level_files:
-            if callable(self.anaysis_callback):
-                self.anaysis_callback(progress, path, len(level_files))
-            
-            level = self.game.Level(
-                path,
-                load_callback = self.load_callback,
-                ignore_errors = True,
-            )
-            
-            self.analyze_level(level)
-            level_objects = {obj.filename for obj in level.objects}
-            finished_objects.union(level_objects)
-            
-            progress += 1
+        if self.workers > 1 and len(level_files) > 1:
+            with self.metrics.phase('levels_parallel'):
+                self.analyze_levels_parallel(level_files)
+            progress = len(level_files)
+        else:
+            for path in level_files:
+                self.check_cancelled()
+                
+                if callable(self.anaysis_callback):
+                    self.anaysis_callback(progress, path, len(level_files))
+                
+                records = self.load_level(path)
+                with self.metrics.phase('level_analyze', path):
+                    self.add_level_records(records, source = path)
+                self.check_memory()
+                
+                progress += 1
         
         if callable(self.anaysis_callback):
             self.anaysis_callback(progress, 'Levels finished', len(level_files))
         
         progress = 0
         
+        finished_objects = self.get_covered_objects()
+        object_count = len(object_files)
         object_files = [path for path in object_files if path not in finished_objects]
+        self.skipped_objects = object_count - len(object_files)
+        
+        logging.info(f'skipped {self.skipped_objects} of {object_count} objects already covered by levels')
+        self.metrics.count('skipped_objects', self.skipped_objects)
         
         for path in object_files:
+            self.check_cancelled()
             
             if callable(self.anaysis_callback):
                 self.anaysis_callback(progress, path, len(level_files))
             
             try:
-                obj = self.game.Object(
-                    path,
-                )
-                
-                self.analyze_object(obj)
+                records = self.load_object(path)
+                with self.metrics.phase('object_analyze', path):
+                    self.add_records(records, source = path)
             except:
                 logging.exception(f'unable to analyze object {path}')
+            self.check_memory()
             
             progress += 1
         
         if callable(self.anaysis_callback):
             self.anaysis_callback(progress, 'Done!', len(object_files))
         
-        self.get_data_types()
-        self.export_objects()
+        if self.cache != None:
+            logging.info(f'cache: {self.cache.hits} hits, {self.cache.misses} misses')
+            self.cache.commit()
+        
+        logging.info(f'property names: {self.normalizer.hits} hits, {self.normalizer.misses} misses')
+        
+        self.route_shared_properties()
+        
+        if self.shards != None:
+            with self.metrics.phase('export'):
+                self.export_shards()
+        else:
+            with self.metrics.phase('type_inference'):
+                self.get_data_types()
+            if self.numeric_stats:
+                with self.metrics.phase('numeric_stats'):
+                    self.get_numeric_stats()
+            with self.metrics.phase('export'):
+                self.export_objects()
+        
+        if self.index != None:
+            with self.metrics.phase('export_index'):
+                self.export_index()
         
         end_time = time.time()
         
+        self.finish_metrics(end_time - start_time)
+        
         logging.info(f'Took: {end_time - start_time} seconds')
+    
+    def update(
+        self,
+        changed_files : typing.Iterable[str] = None,
+        previous : str | dict = None,
+        anaysis_callback : typing.Callable[[int, str, int], typing.Any] = None,
+        load_callback : typing.Callable[[int, str, int], typing.Any] = None,
+    ):
+        """Update a previous output in place, only analyzing files that changed. The contributions of changed and removed files are retracted using the index saved next to the previous output, and the contributions of changed and new files are added. If there is no index, this falls back to a full `start()`.
         
-    def analyze_level(self, level : wmwpy.classes.Level):
-        if not isinstance(level, wmwpy.classes.Level):
-            raise TypeError('level must be Level object')
+        Args:
+            changed_files (Iterable[str], optional): Changed files, as paths in the game assets or on disk. Defaults to detecting changes from the file sizes and mtimes in the index.
+            previous (str | dict, optional): Previous output. Defaults to the output path.
+            anaysis_callback (Callable[[int, str, int], Any], optional): Analysis progress callback. Defaults to None.
+            load_callback (Callable[[int, str, int], Any], optional): Loading progress callback. Defaults to None.
+        """
+        if self.memory_limit != None:
+            raise ValueError("update() can't be used with memory_limit, since it needs the whole previous output in memory")
         
-        for obj in level.objects:
-            self.analyze_object(obj)
-    
-    def analyze_object(self, object : wmwpy.classes.Object):
-        self.object_types.setdefault(object.type, {})
+        if callable(anaysis_callback):
+            self.anaysis_callback = anaysis_callback
+        if callable(load_callback):
+            self.load_callback = load_callback
         
-        properties = copy.deepcopy(object.defaultProperties)
-        properties.update(copy.deepcopy(object.properties))
+        start_time = time.time()
         
-        for property in properties:
-            if property == 'Type':
-                continue
-            
-            new_property = self.check_property(property)
+        if previous in ['', None]:
+            previous = self.output_path
+        
+        self.write_index = True
+        
+        previous_path = previous if isinstance(previous, str) else None
+        
+        try:
+            self.index = self.load_index(self.get_index_path(previous_path))
             
-            if new_property in self.object_types.setdefault('', {}):
-                self.object_types[''][new_property]['values'].add(properties[property])
-                self.object_types[''][new_property].setdefault('files', set())
-                self.object_types[''][new_property]['files'].add(object.filename)
-                continue
+            if isinstance(previous, str):
+                with open(previous, 'r') as file:
+                    previous = json.load(file)
+            self.store = self.new_store(previous)
+        except (OSError, ValueError):
+            logging.warning('unable to load previous output or index, running full analysis')
+            return self.start()
+        
+        # numeric statistics are found again if they're asked for, like in a full analysis
+        for properties in self.store.entries.values():
+            for entry in properties.values():
+                entry.stats = None
+        
+        self.metrics.clear(keep = ['load'])
+        self.metrics.start_profile()
+        
+        self.discover()
+        level_files = self.manifest.match(LEVEL_PATTERN)
+        object_files = self.manifest.match(OBJECT_PATTERN)
+        current_files = set(level_files) | set(object_files)
+        
+        sources : dict[str, dict] = self.index['sources']
+        files : dict[str, list[int] | None] = self.index['files']
+        
+        if changed_files == None:
+            # the stats come from the manifest, so this doesn't touch the disk
+            changed = {
+                path for path in current_files | set(files)
+                if self.get_file_stat(path) != files.get(path)
+            }
             
-            type_properties = self.object_types[object.type].setdefault(
-                new_property,
-                {
-                    'type' : 'any',
-                    'values' : set(),
-                    'files': set(),
-                }
-            )
+            try:
+                previous_manifest = Asset_Manifest.load(self.get_manifest_path(previous_path))
+            except (OSError, ValueError):
+                previous_manifest = None
             
-            type_properties['values'].add(str(properties[property]))
-            type_properties.setdefault('files', set())
-            type_properties['files'].add(object.filename)
-    
-    def check_property(self, property):
-        split = utils.split_num(property)
+            if previous_manifest != None:
+                changed.update(self.manifest.get_changes(previous_manifest))
+        else:
+            changed = {self.get_asset_path(path) for path in changed_files}
         
-        if split[0] == '':
-            return property
+        changed.update(path for path in current_files if path not in files)
+        changed.update(path for path in sources if path not in current_files)
         
-        if split[1].isnumeric():
-            return split[0] + '#'
+        # levels that use a changed object have to be analyzed again
+        stale = {
+            path for path, source in sources.items()
+            if path in changed or not changed.isdisjoint(source['objects'])
+        }
         
-        return property
-    
-    def get_data_types(self):
+        affected : set[tuple[str, str]] = set()
+        shared = self.get_shared_properties()
+        
+        for path in stale:
+            for type, property, value, filename in sources.pop(path)['contributions']:
+                affected.add((type, property))
+        
+        for path in changed:
+            files.pop(path, None)
+        
+        logging.info(f'{len(changed)} changed files, {len(stale)} stale sources')
+        
+        level_files = [path for path in level_files if path not in sources]
         
         progress = 0
-        length = len(self.object_types)
         
-        for key in self.object_types:
+        for path in level_files:
+            self.check_cancelled()
+            
             if callable(self.anaysis_callback):
-                self.anaysis_callback(progress, key, length)
+                self.anaysis_callback(progress, path, len(level_files))
             
-            type = self.object_types[key]
+            records = self.load_level(path)
+            with self.metrics.phase('level_analyze', path):
+                self.add_level_records(records, source = path)
             
-            type_progress = 0
-            for name in type:
-                if callable(self.load_callback):
-                    self.anaysis_callback(type_progress, key, len(type))
-                
-                property = type[name]
-                
-                property['type'] = self.check_data_type(property['values'])
+            progress += 1
+        
+        self.seen_objects = {}
+        for source in sources.values():
+            for filename, overrides in source.get('seen', {}).items():
+                self.seen_objects.setdefault(filename, set()).update(frozenset(o) for o in overrides)
+        
+        # objects that are covered by levels now are not separate sources anymore
+        finished_objects = self.get_covered_objects()
+        for path in object_files:
+            if path in finished_objects and path in sources:
+                for type, property, value, filename in sources.pop(path)['contributions']:
+                    affected.add((type, property))
+        
+        object_files = [path for path in object_files if path not in sources and path not in finished_objects]
+        
+        progress = 0
+        
+        for path in object_files:
+            self.check_cancelled()
             
-                type_progress += 1
+            if callable(self.anaysis_callback):
+                self.anaysis_callback(progress, path, len(object_files))
             
-            if callable(self.load_callback):
-                self.anaysis_callback(type_progress, 'Done!', len(type))
+            try:
+                records = self.load_object(path)
+                with self.metrics.phase('object_analyze', path):
+                    self.add_records(records, source = path)
+            except:
+                logging.exception(f'unable to analyze object {path}')
             
             progress += 1
         
         if callable(self.anaysis_callback):
-            self.anaysis_callback(progress, 'Done!', length)
+            self.anaysis_callback(progress, 'Done!', len(object_files))
         
-
-    
-    def check_data_type(self, values : list | set):
-        hierarchy = ['bit', 'int', 'float', 'string']
+        for path in level_files + object_files:
+            if path in sources:
+                for type, property, value, filename in sources[path]['contributions']:
+                    affected.add((type, property))
         
-        types = [utils.check_type(val) for val in values]
+        # properties that objects without a type added or stopped adding move between the '' type and the other types
+        moved = shared ^ self.get_shared_properties()
+        if len(moved) > 0:
+            for source in sources.values():
+                for type, property, value, filename in source['contributions']:
+                    if property in moved:
+                        affected.add((type, property))
+            
+            for type, properties in self.template.items():
+                affected.update((type, property) for property in properties if property in moved)
         
-        is_comma_list = False
+        with self.metrics.phase('rebuild_properties'):
+            self.rebuild_properties(affected)
+            self.route_shared_properties()
         
-        splits : list[list[str]] = []
+        if self.cache != None:
+            self.cache.commit()
         
-        for type in types:
-            split = type.split()
-            splits.append(split)
-            
-            if split[-1] == '...':
-                is_comma_list = True
+        with self.metrics.phase('type_inference'):
+            self.get_data_types()
+        if self.numeric_stats:
+            with self.metrics.phase('numeric_stats'):
+                self.get_numeric_stats()
+        with self.metrics.phase('export'):
+            self.export_objects()
+        with self.metrics.phase('export_index'):
+            self.export_index()
+        
+        end_time = time.time()
+        
+        self.finish_metrics(end_time - start_time)
+        
+        logging.info(f'Took: {end_time - start_time} seconds')
+    
+    def rebuild_properties(self, keys : typing.Iterable[tuple[str, str]]):
+        """Rebuild the values and files of properties from the template and the contributions in the index. Properties in the '' type are routed like `route_shared_properties()`, so the result is the same as a full analysis.
         
-        final_type = []
+        Args:
+            keys (Iterable[tuple[str, str]]): `(type, property)` pairs to rebuild, with the type of the objects that added them. The property in the '' type is rebuilt too.
+        """
+        shared = self.get_shared_properties()
         
-        length = max(len(l) for l in splits)
+        entries = {}
+        for type, property in keys:
+            entries[(type, property)] = (set(), set())
+            entries[('', property)] = (set(), set())
         
-        length -= is_comma_list
+        used_types = set()
         
-        for index in range(length):
-            type = 'bit'
+        for source in self.index['sources'].values():
+            used_types.update(source['types'])
             
-            for val in splits:
-                if len(val) <= index:
-                    continue
-                if val[index] == '...':
-                    continue
-                
-                if hierarchy.index(val[index]) > hierarchy.index(type):
-                    type = val[index]
+            for type, property, value, filename in source['contributions']:
+                entry = entries.get(('' if property in shared else type, property))
+                if entry != None:
+                    entry[0].add(value)
+                    entry[1].add(filename)
+        
+        # properties that are in the template are kept even without values
+        kept = set()
+        
+        for type, properties in self.template.items():
+            for property, template in properties.items():
+                key = ('' if property in shared else type, property)
+                entry = entries.get(key)
+                if entry != None:
+                    entry[0].update(template['values'])
+                    entry[1].update(template.get('files', set()))
+                    kept.add(key)
+        
+        for (type, property), (values, files) in entries.items():
+            if len(values) == 0 and (type, property) not in kept:
+                self.store.remove(type, property)
+                continue
             
-            final_type.append(type)
+            self.store.set_values(
+                self.store.setdefault(type, property),
+                values,
+                files if len(files) > 0 else None,
+            )
         
-        if is_comma_list:
-            final_type.append('...')
+        for type in list(self.store.entries):
+            if len(self.store.entries[type]) == 0 and type not in self.template and type not in used_types:
+                self.store.remove(type)
+    
+    def new_index(self) -> dict:
+        return {
+            'version' : INDEX_VERSION,
+            'game' : self.game_name,
+            'files' : {},
+            'sources' : {},
+        }
+    
+    def get_index_path(self, output : str = None) -> str:
+        """Get the path of the index that is kept next to an output file, e.g. 'wmw_objects.index.json'.
+        """
+        if output in ['', None]:
+            output = self.output_path
         
-        return ' '.join(final_type)
+        return os.path.splitext(output)[0] + '.index.json'
+    
+    def get_manifest_path(self, output : str = None) -> str:
+        """Get the path of the asset manifest that is kept next to an output file with the index, e.g. 'wmw_objects.manifest.json'.
+        """
+        if output in ['', None]:
+            output = self.output_path
         
+        return os.path.splitext(output)[0] + '.manifest.json'
+    
+    def load_index(self, path : str = None) -> dict:
+        if path in ['', None]:
+            path = self.get_index_path()
         
-    def export_objects(self, output = None):
-        if output not in ['', None] and isinstance(output, str):
-            self.output_path = output
+        with open(path, 'r') as file:
+            index = json.load(file)
         
-        object_types = make_json_friendly(self.object_types)
+        if index.get('version') != INDEX_VERSION or index.get('game') != self.game_name:
+            raise ValueError(f'index {path} is not for this game')
         
-        with open(self.output_path, 'w') as file:
-            json.dump(object_types, file, indent = 2)
-
-class Objects_analysis_gui(tk.Tk):
-    def __init__(self, master = None, *args, **kwargs):
-        super().__init__(master, *args, **kwargs)
-        self.title('Find object properties')
-        self.geometry('%dx%d' % (500 , 300) )
-        
-        self.settings = Settings(
-            'config_object_properties.json',
-            {
-                'version' : 1,
-                'gamepath' : '',
-                'assets' : '/assets',
-                'game' : 'WMW',
-                'template' : 'object_type_lists/wmw-template.json',
-                'output' : 'wmw_objects.json',
+        return index
+    
+    def export_index(self, output : str = None):
+        """Export the index, which maps every level and object file to the property values it contributed.
+        """
+        index = self.new_index()
+        index['files'] = self.index['files']
+        
+        for path, source in self.index['sources'].items():
+            index['sources'][path] = {
+                'objects' : list(source['objects']),
+                'types' : list(source['types']),
+                'seen' : {
+                    filename : [sorted(o) for o in overrides]
+                    for filename, overrides in source.get('seen', {}).items()
+                },
+                'contributions' : [list(contribution) for contribution in source['contributions']],
             }
-        )
         
-        self.game : wmwpy.Game = None
-
-        self.create_window()
-
-    def create_window(self):
-        self.create_config()
-        self.start_button = ttk.Button(
-            text = 'Start',
-            command = self.start_analysis,
+        with open(self.get_index_path(output), 'w') as file:
+            json.dump(index, file, separators = (',', ':'))
+        
+        if self.manifest != None:
+            self.manifest.save(self.get_manifest_path(output))
+    
+    def get_file_stat(self, path : str) -> list[int] | None:
+        if self.manifest != None and path in self.manifest:
+            return self.manifest.get_stat(path)
+        
+        try:
+            stat = os.stat(self.get_file_path(path))
+        except OSError:
+            return None
+        
+        return [stat.st_size, stat.st_mtime_ns]
+    
+    def get_asset_path(self, path : str) -> str:
+        """Get the path inside the game assets of a file, which can be a path on disk or already a path in the assets.
+        """
+        assets = self.get_file_path('')
+        filepath = os.path.abspath(path)
+        
+        if filepath.startswith(assets + os.sep) and os.path.exists(filepath):
+            path = os.path.relpath(filepath, assets)
+        
+        return '/' + path.replace('\\', '/').strip('/')
+    
+    def analyze_levels_parallel(self, level_files : list[str], workers : int = None):
+        """Analyze level files in a process pool. Every worker loads the game once, then analyzes slices of `level_files` into its own partial `Property_Store`, which are merged back in the original level order, so the result matches a sequential run.
+        
+        Args:
+            level_files (list[str]): Paths to the level xml files.
+            workers (int, optional): Number of worker processes. Defaults to `self.workers`.
+        """
+        if workers in [0, None]:
+            workers = self.workers
+        
+        # a few slices per worker keeps the pool busy when some levels are much bigger than others
+        slice_size = max(1, math.ceil(len(level_files) / (workers * 4)))
+        if self.memory_limit != None:
+            slice_size = min(slice_size, SHARD_SLICE_SIZE)
+        slices = [level_files[i:i + slice_size] for i in range(0, len(level_files), slice_size)]
+        
+        progress = 0
+        
+        # workers check this between levels, so they stop soon after the analysis is cancelled or fails
+        worker_cancel_event = multiprocessing.Event()
+        
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers = workers,
+            initializer = _init_level_worker,
+            initargs = (
+                self.gamepath,
+                self.assets,
+                self.game_name,
+                self.template,
+                self.cache.path if self.cache != None else None,
+                self.index != None,
+                self.property_rules,
+                self.loader,
+                worker_cancel_event,
+            ),
         )
-        self.start_button.pack()
-        self.create_progress_bars()
-    
-    def create_config(self):
-        self.config_frame = ttk.Frame()
-        self.config_frame.pack(side = 'top', fill = 'both', )
-        self.config_frame.columnconfigure(1, weight=1)
-        
-        self.config_widgets : dict[str, tk.Widget | dict[str, tk.Widget]] = {}
-        
-        def create_row(
-            parent : tk.Widget = self,
-            label_text : str = '',
-            entry_type : typing.Literal['text', 'options'] = 'text',
-            entry_callback : typing.Callable[[str], str] = None,
-            default_value : str = '',
-            use_button : bool = True,
-            button_text : str = 'Browse',
-            button_callback : typing.Callable[[str], typing.Any] = None,
-            row = 0,
-            options : list[str] = []
-        ) -> dict[typing.Literal[
-            'label',
-            'var',
-            'entry',
-            'button',
-        ]]:
+        
+        # with a memory limit, only a few finished slices can wait to be merged
+        max_pending = len(slices) if self.memory_limit == None else workers * 2
+        
+        try:
+            futures = collections.deque(executor.submit(_analyze_level_slice, level_slice) for level_slice in slices[:max_pending])
             
-            label = ttk.Label(
-                parent,
-                text = label_text,
-            )
-            label.grid(row = row, column = 0, sticky='ew', padx=4, pady=2)
+            for index, level_slice in enumerate(slices):
+                future = futures.popleft()
+                if index + max_pending < len(slices):
+                    futures.append(executor.submit(_analyze_level_slice, slices[index + max_pending]))
+                
+                if callable(self.anaysis_callback):
+                    self.anaysis_callback(progress, level_slice[0], len(level_files))
+                
+                while not future.done():
+                    self.check_cancelled()
+                    concurrent.futures.wait([future], timeout = 0.1)
+                
+                store, slice_index, seen_objects, metrics = future.result()
+                self.merge_object_types(store)
+                self.metrics.merge(metrics)
+                
+                for filename, overrides in seen_objects.items():
+                    self.seen_objects.setdefault(filename, set()).update(overrides)
+                
+                if self.index != None:
+                    self.index['files'].update(slice_index['files'])
+                    self.index['sources'].update(slice_index['sources'])
+                
+                self.check_memory()
+                
+                progress += len(level_slice)
+        except:
+            # slices that haven't started are dropped, and running ones stop at their next level
+            worker_cancel_event.set()
+            executor.shutdown(wait = True, cancel_futures = True)
+            raise
+        
+        executor.shutdown()
+    
+    def analyze_levels(self, level_files : list[str]):
+        for path in level_files:
+            self.check_cancelled()
             
-            var = tk.StringVar(
-                value = default_value,
-            )
-            var.trace_add(
-                'write',
-                lambda *args : entry_callback(var.get()),
-            )
+            records = self.load_level(path)
+            with self.metrics.phase('level_analyze', path):
+                self.add_level_records(records, source = path)
+    
+    def get_file_path(self, path : str) -> str:
+        """Get the path on disk of a file in the game assets.
+        
+        Args:
+            path (str): Path inside the game assets, e.g. '/Objects/rock.hs'.
+        
+        Returns:
+            str: Absolute path on disk.
+        """
+        return utils.asset_path(self.gamepath, self.assets, path)
+    
+    def load_level(self, path : str) -> list[list]:
+        """Get the object records of a level, from the cache if the level and the objects in it have not changed.
+        
+        Args:
+            path (str): Path to level xml file.
+        
+        Returns:
+            list[list]: List of `[type, filename, properties, overrides]` records.
+        """
+        if self.cache != None:
+            filepath = self.get_file_path(path)
+            kind = f'{self.game_name}/level/{RECORD_VERSION}/{self.loader}'
             
-            def get_entry(
-                type : typing.Literal['text', 'options'],
-                var,
-                options : list = [],
-            ):
-                if type == 'options':
-                    return ttk.Combobox(
-                        parent,
-                        textvariable = var,
-                        values = options,
-                    )
-                else:
-                    return ttk.Entry(
-                        parent,
-                        textvariable = var,
-                    )
-            
-            entry = get_entry(
-                entry_type,
-                var = var,
-                options = options,
+            records = self.cache.get(kind, filepath)
+            if records != None:
+                self.metrics.count('level_cache_hits')
+                return records
+        
+        with self.metrics.phase('level_load', path):
+            if self.loader == 'wmwpy':
+                # wmwpy loads the level xml, and every object in it with its sprites
+                objects = self.game.Level(
+                    path,
+                    load_callback = self.load_callback,
+                    ignore_errors = True,
+                ).objects
+            else:
+                objects = self.metadata.load_level(path, load_callback = self.load_callback)
+        with self.metrics.phase('level_records', path):
+            records = [self.get_object_record(obj) for obj in objects]
+        self.metrics.count('level_objects', len(records))
+        
+        if self.cache != None:
+            self.cache.put(
+                kind,
+                filepath,
+                records,
+                deps = {self.get_file_path(record[1]) for record in records if record[1]},
             )
-            # entry.insert(0, var.get())
-            entry.grid(row = row, column = 1, sticky = 'ew', padx=4, pady=2)
-            
-            button = None
+        
+        return records
+    
+    def load_object(self, path : str) -> list[list]:
+        """Get the record of a single object file, from the cache if it has not changed.
+        
+        Args:
+            path (str): Path to `.hs` object file.
+        
+        Returns:
+            list[list]: List with one `[type, filename, properties, overrides]` record.
+        """
+        if self.cache != None:
+            filepath = self.get_file_path(path)
+            kind = f'{self.game_name}/object/{RECORD_VERSION}/{self.loader}'
             
-            if use_button:
-                button = ttk.Button(
-                    parent,
-                    text = button_text,
-                    command = lambda *args : var.set(button_callback(var.get())),
+            records = self.cache.get(kind, filepath)
+            if records != None:
+                self.metrics.count('object_cache_hits')
+                return records
+        
+        with self.metrics.phase('object_load', path):
+            if self.loader == 'wmwpy':
+                obj = self.game.Object(
+                    path,
                 )
-                button.grid(row = row, column = 2, sticky = 'ew', padx=4, pady=2)
+            else:
+                obj = self.metadata.load_object(path)
+        records = [self.get_object_record(obj)]
+        
+        if self.cache != None:
+            self.cache.put(kind, filepath, records)
+        
+        return records
+    
+    def get_level_records(self, level : 'wmwpy.classes.Level') -> list[list]:
+        return [self.get_object_record(obj) for obj in level.objects]
+    
+    def get_object_record(self, object : 'wmwpy.classes.Object | Object_Metadata') -> list:
+        """Get the record of an object, which is `[type, filename, properties, overrides]`. `overrides` are the default properties (and 'Type') that this object instance changed.
+        """
+        default_properties = object.defaultProperties
+        
+        # property values are strings, so a shallow merge is enough; nothing here modifies them
+        properties = {**default_properties, **object.properties}
+        
+        overrides = [
+            name for name, value in default_properties.items()
+            if name != 'Type' and properties[name] != value
+        ]
+        if object.type != default_properties.get('Type', ''):
+            overrides.append('Type')
+        
+        return [object.type, object.filename, properties, overrides]
+    
+    def add_level_records(self, records : list[list], source : str = None):
+        """Add the object records of a level, and remember which object files were seen with which overrides.
+        """
+        self.add_records(records, source = source)
+        
+        seen = {}
+        for type, filename, properties, overrides in records:
+            seen.setdefault(filename, set()).add(frozenset(overrides))
+        
+        for filename, overrides in seen.items():
+            self.seen_objects.setdefault(filename, set()).update(overrides)
+        
+        if self.index != None and source != None:
+            self.index['sources'][source]['seen'] = seen
+    
+    def get_covered_objects(self) -> set[str]:
+        """Get the object files that don't need to be analyzed on their own, because levels already used them with their default type, and every default property was left unchanged by at least one of those instances. Analyzing these objects again would only add values that are already in the same type.
+        
+        Skipping them doesn't change the output, since properties are only moved into the '' type after every file is analyzed (see `route_shared_properties()`), so which type the values end up in doesn't depend on which files were analyzed first.
+        """
+        covered = set()
+        
+        for filename, overrides in self.seen_objects.items():
+            # instances with a different type add their values to another type
+            overrides = [o for o in overrides if 'Type' not in o]
+            
+            if len(overrides) > 0 and len(frozenset.intersection(*overrides)) == 0:
+                covered.add(filename)
+        
+        return covered
+    
+    def add_records(self, records : list[list], source : str = None):
+        """Add the properties of object records.
+        
+        Args:
+            records (list[list]): List of `[type, filename, properties, overrides]` records.
+            source (str, optional): The level or object file the records came from, which is recorded in the index if there is one. Defaults to None.
+        """
+        if self.index != None and source != None:
+            objects = {record[1] for record in records if record[1]}
             
-            return {
-                'label' : label,
-                'var' : var,
-                'entry' : entry,
-                'button' : button,
+            # every record adds its type, and the '' type if it has any property, even if all of them end up in another type
+            types = {record[0] for record in records}
+            if any(name != 'Type' for record in records for name in record[2]):
+                types.add('')
+            
+            self.index['sources'][source] = {
+                'objects' : objects,
+                'types' : types,
+                'contributions' : set(),
             }
+            self._contributions = self.index['sources'][source]['contributions']
+            
+            for path in objects | {source}:
+                self.index['files'][path] = self.get_file_stat(path)
+        
+        for type, filename, properties, overrides in records:
+            self.add_properties(type, filename, properties)
+        
+        self._contributions = None
+    
+    def merge_object_types(self, object_types : dict | Property_Store):
+        """Merge partial object types (e.g. from a worker) into `self.store`.
+        
+        Args:
+            object_types (dict | Property_Store): Partial object types, either as a store or with the same structure as `self.object_types`.
+        """
+        if not isinstance(object_types, Property_Store):
+            object_types = self.new_store(object_types)
         
-        def validate(
-            default = '',
-            result = None,
-        ):
+        self.store.merge(object_types)
+    
+    def check_memory(self):
+        """Spill the partial results to disk if they are past `self.memory_limit`.
+        """
+        if self.memory_limit == None:
+            return
+        
+        if self.store.get_size() >= self.memory_limit * 1024 * 1024:
+            self.spill()
+    
+    def spill(self):
+        """Write the partial results to a sorted run on disk, and continue with an empty store and interners, so memory doesn't grow with the number of files. The runs are merged in `export_shards()`.
+        """
+        if self.shards == None:
+            self.shards = Shard_Spiller(self.shard_dir)
+        
+        with self.metrics.phase('spill'):
+            self.shards.spill(self.store)
+        self.metrics.count('shards')
+        
+        logging.debug(f'spilled shard {len(self.shards)} to {self.shards.directory}')
+        
+        # properties in the '' type are shared by every type, so the next shard routes them there right away, and fewer shards have to be rewritten in `export_shards()`
+        shared = {name : {'type' : 'any'} for name in self.store.entries.get('', {})}
+        
+        self.value_ids = Interner()
+        self.file_ids = Interner()
+        self.store = self.new_store({'' : shared})
+    
+    def analyze_level(self, level : 'wmwpy.classes.Level'):
+        import wmwpy
+        
+        if not isinstance(level, wmwpy.classes.Level):
+            raise TypeError('level must be Level object')
+        
+        for obj in level.objects:
+            self.analyze_object(obj)
+    
+    def analyze_object(self, object : 'wmwpy.classes.Object'):
+        self.add_properties(
+            object.type,
+            object.filename,
+            {**object.defaultProperties, **object.properties},
+        )
+    
+    def add_properties(self, type : str, filename : str, properties : dict[str, str]):
+        self.store.add_type(type)
+        
+        normalize = self.normalizer.normalize
+        
+        for property in properties:
+            if property == 'Type':
+                continue
+            
+            new_property = normalize(property)
             
-            if result in ['', None]:
-                return default
+            value = str(properties[property])
+            
+            # properties in the '' type are shared by every type. Properties that only become shared later are moved by `route_shared_properties()`
+            entry = self.store.add_type('').get(new_property)
+            if entry != None:
+                type_name = ''
             else:
-                return result
-        
-        self.config_widgets['gamepath'] = create_row(
-            self.config_frame,
-            label_text = 'Game path',
-            entry_type = 'text',
-            entry_callback = lambda value : self.settings.set('gamepath', value),
-            default_value = self.settings.get('gamepath'),
-            button_callback = lambda path : validate(
-                path,
-                filedialog.askdirectory(
-                    initialdir = os.path.dirname(path),
-                    title = 'Game directory',
-                )
-            ),
-            row = 0,
-        )
-        self.config_widgets['assets'] = create_row(
-            self.config_frame,
-            label_text = 'Assets path',
-            entry_type = 'text',
-            entry_callback = lambda value : self.settings.set('assets', value),
-            default_value = self.settings.get('assets'),
-            button_callback = lambda path : os.path.relpath(
-                validate(
-                    wmwpy.Utils.path.joinPath(self.settings.get('gamepath'), path),
-                    filedialog.askdirectory(
-                        initialdir = os.path.dirname(wmwpy.Utils.path.joinPath(self.settings.get('gamepath'), path)),
-                        title = 'Assets directory',
-                    )
-                ),
-                self.settings.get('gamepath')
-            ),
-            row = 1,
-        )
-        self.config_widgets['game'] = create_row(
-            self.config_frame,
-            label_text = 'Game',
-            entry_type = 'options',
-            options = list(wmwpy.GAMES.keys()),
-            entry_callback = lambda value : self.settings.set('game', value),
-            default_value = self.settings.get('game'),
-            use_button = False,
-            row = 2,
-        )
-        self.config_widgets['template'] = create_row(
-            self.config_frame,
-            label_text = 'Object Template',
-            entry_type = 'text',
-            entry_callback = lambda value : self.settings.set('template', value),
-            default_value = self.settings.get('template'),
-            button_callback = lambda path : validate(
-                path,
-                filedialog.askopenfilename(
-                    title = 'Select objects template',
-                    defaultextension = '.json',
-                    filetypes = (('JSON file', '.json'),
-                                 ('Any', '*.*')),
-                    initialdir = os.path.dirname(path),
-                )
-            ),
-            row = 3,
-        )
-        self.config_widgets['output'] = create_row(
-            self.config_frame,
-            label_text = 'Output',
-            entry_type = 'text',
-            entry_callback = lambda value : self.settings.set('output', value),
-            default_value = self.settings.get('output'),
-            button_callback = lambda path : validate(
-                path,
-                filedialog.asksaveasfilename(
-                    title = 'Select output filename',
-                    defaultextension = '.json',
-                    filetypes = (('JSON file', '.json'),
-                                 ('Any', '*.*')),
-                    initialdir = os.path.dirname(path),
-                )
-            ),
-            row = 4,
-        )
+                type_name = type
+                entry = self.store.setdefault(type, new_property)
+            
+            self.store.add(entry, value, filename)
+            
+            # contributions keep the type of the object, since the routing depends on every other file
+            if self._contributions != None:
+                self._contributions.add((type, new_property, value, filename))
+    
+    def route_shared_properties(self):
+        """Move the properties of every type that are also in the '' type (from the template, or from objects without a type) into the '' type.
         
+        A property is only put in the '' type when it's added if the '' type already has it, which depends on the order of the files, e.g. levels that are analyzed in parallel. Moving the rest afterwards makes the result the same for any order: a property name that is in the '' type is never in another type.
+        """
+        shared = self.store.entries.get('')
+        if not shared:
+            return
         
+        for type, properties in self.store.entries.items():
+            if type == '':
+                continue
+            
+            for name in [name for name in properties if name in shared]:
+                self.store.move(type, name, '')
+    
+    def get_shared_properties(self) -> set[str]:
+        """Get the names of the properties in the '' type, from the template and the contributions of objects without a type in the index.
+        """
+        shared = set(self.template.get('', {}))
         
-    def create_progress_bars(self):
+        for source in self.index['sources'].values():
+            for type, property, value, filename in source['contributions']:
+                if type == '':
+                    shared.add(property)
         
-        self.progress_frame = ttk.Frame()
-        self.progress_frame.columnconfigure(0, weight = 1, uniform = 'progress')
-        self.progress_frame.columnconfigure(1, weight = 1, uniform = 'progress')
-        self.progress_frame.pack(side = 'bottom', fill = 'both', )
+        return shared
+    
+    def get_type_summary(self, type : str, property : str) -> type_inference.Type_Summary:
+        return self.store.get_summary(self.store.get(type, property))
+    
+    def check_property(self, property):
+        return self.normalizer.normalize(property)
+    
+    def get_data_types(self):
         
-        self.progress_bars : dict[typing.Literal['full', 'loading'], dict[typing.Literal['progress', 'label', 'var', 'callback'], ttk.Progressbar | ttk.Label | tk.StringVar]] = {
-            'full' : {},
-            'loading' : {},
-        }
+        progress = 0
+        length = len(self.store)
         
-        def create_progress_bar(
-            parent : tk.Widget = self,
-            row : int = 0,
-        ) -> dict[typing.Literal[
-            'var',
-            'progress',
-            'label',
-            'callback',
-        ], tk.StringVar |
-           ttk.Progressbar |
-           ttk.Label]:
-            
-            var = tk.StringVar()
-            
-            progress : ttk.Progressbar = ttk.Progressbar(
-                parent
-            )
-            progress.grid(row = row, column = 0, sticky = 'ew', padx = 4, pady = 2)
+        for key in self.store:
+            self.check_cancelled()
             
-            label = ttk.Label(
-                parent,
-                textvariable = var,
-            )
-            label.grid(row = row, column = 1, sticky = 'ew', padx = 4, pady = 2)
+            if callable(self.anaysis_callback):
+                self.anaysis_callback(progress, key, length)
+            
+            type = self.store.entries[key]
             
-            def callback(index, name, max):
-                progress['max'] = max
-                progress['value'] = index
-                var.set(f'({index}/{max}) {name}')
+            type_progress = 0
+            for name in type:
+                if callable(self.load_callback):
+                    self.anaysis_callback(type_progress, key, len(type))
                 
-                self.update()
+                entry = type[name]
+                
+                entry.type = self.store.get_summary(entry).type
+                
+                type_progress += 1
             
-            return {
-                'var' : var,
-                'label' : label,
-                'progress' : progress,
-                'callback' : callback,
-            }
+            if callable(self.load_callback):
+                self.anaysis_callback(type_progress, 'Done!', len(type))
             
-        self.progress_bars['full'] = create_progress_bar(
-            self.progress_frame,
-            row = 0,
-        )
-        self.progress_bars['loading'] = create_progress_bar(
-            self.progress_frame,
-            row = 1,
-        )
+            progress += 1
         
-    def set_state(
-        self,
-        state : typing.Literal['enabled', 'disabled'] = 'enabled',
-        widget : tk.Widget = None,
-    ):
-        if widget == None:
-            widget = self
+        if callable(self.anaysis_callback):
+            self.anaysis_callback(progress, 'Done!', length)
+    
+    
+    
+    def get_numeric_stats(self):
+        """Add the range and distribution of the values of every numeric property, which are exported as `stats`. Properties without numeric values get no `stats`.
+        """
+        import numeric_stats
         
-        if len(widget.winfo_children()) < 1:
-            return
+        for properties in self.store.entries.values():
+            self.check_cancelled()
+            
+            for entry in properties.values():
+                entry.stats = numeric_stats.get_numeric_stats(self.store.get_values(entry))
+    
+    def check_data_type(self, values : list | set):
+        return type_inference.infer_data_type(values)
+    
+    def export_objects(self, output = None, compact : bool = None):
+        """Export the object types as JSON. Properties are written one by one straight from the store, with keys and values sorted, so the output is the same for the same data. Sequential, parallel and incremental (`update()`) runs over the same files give the same data, so their outputs are byte-identical.
         
-        for child in widget.winfo_children():
-            try:
-                child.configure(state = state)
-            except:
-                pass
-            # if isinstance(child, (tk.Frame, ttk.Frame)):
-            #     self.set_state(
-            #         state,
-            #         child,
-            #     )
-
-    def start_analysis(self):
-        self.set_state('disabled')
-        self.set_state('disabled', self.config_frame)
+        Args:
+            output (str, optional): Output path. Defaults to `self.output_path`.
+            compact (bool, optional): Write without indentation. Defaults to `self.compact`.
+        """
+        if output not in ['', None] and isinstance(output, str):
+            self.output_path = output
+        if compact == None:
+            compact = self.compact
+        
+        with open(self.output_path, 'w') as file:
+            dump_stream(self.store.view(), file, indent = None if compact else 2)
+        
+        if self.database_path not in ['', None]:
+            self.export_database()
+    
+    def export_shards(self, output = None, compact : bool = None):
+        """Spill the last partial results, then merge every shard into the output with a k-way merge, one property at a time. The data types (and numeric statistics) are found during the merge, and the output is the same as `export_objects()` without a memory limit. Afterwards, the results are only in the output, and `self.store` is empty.
+        
+        Args:
+            output (str, optional): Output path. Defaults to `self.output_path`.
+            compact (bool, optional): Write without indentation. Defaults to `self.compact`.
+        """
+        if output not in ['', None] and isinstance(output, str):
+            self.output_path = output
+        if compact == None:
+            compact = self.compact
+        
+        if self.numeric_stats:
+            import numeric_stats
+        
+        def get_properties():
+            for type, name, values, files in self.shards.merge():
+                if name == None:
+                    yield type, None, None
+                    continue
+                
+                property = {
+                    'type' : type_inference.infer_data_type(values),
+                    'values' : values,
+                }
+                if files != None:
+                    property['files'] = files
+                if self.numeric_stats:
+                    stats = numeric_stats.get_numeric_stats(values)
+                    if stats != None:
+                        property['stats'] = stats
+                
+                yield type, name, property
+        
+        self.spill()
         
         try:
-            analysis = Object_Analysis(
-                self.settings.get('gamepath'),
-                self.settings.get('assets'),
-                self.settings.get('game'),
-                self.settings.get('template'),
-                self.settings.get('output'),
-                load_callback = self.progress_bars['loading']['callback'],
-                analysis_callback = self.progress_bars['full']['callback'],
-            )
+            # properties that became shared after a shard was spilled are still in other types in that shard
+            with self.metrics.phase('route_shards'):
+                self.shards.route_shared_properties()
             
-            analysis.start()
-        except:
-            logging.exception('analysis error')
+            with open(self.output_path, 'w') as file:
+                dump_merged(get_properties(), file, indent = None if compact else 2)
+        finally:
+            self.shards.cleanup()
+    
+    def finish_metrics(self, seconds : float):
+        """Stop the profiler, log a summary of the metrics, and write the report next to the output if metrics are enabled.
+        """
+        self.metrics.add('total', seconds)
+        
+        report_path = get_report_path(self.output_path)
+        
+        self.metrics.stop_profile(get_report_path(self.output_path, '.prof') if self.write_metrics else None)
+        
+        logging.debug(f'metrics:\n{self.metrics.summary()}')
+        
+        if self.write_metrics:
+            self.metrics.export(report_path)
+            logging.info(f'metrics: {report_path}')
+    
+    def export_database(self, output : str = None):
+        """Export the object types to a SQLite database, which can be queried with `objects_database.Objects_Database` without loading everything.
         
-        self.set_state('enabled')
-        self.set_state('enabled', self.config_frame)
+        Args:
+            output (str, optional): Database path. Defaults to `self.database_path`.
+        """
+        if output in ['', None]:
+            output = self.database_path
+        
+        objects_database.export_database(
+            self.store,
+            output,
+            meta = {'game' : self.game_name},
+        )
+
+_worker_analysis : Object_Analysis = None
+
+def _init_level_worker(
+    gamepath : str,
+    assets : str,
+    game : str,
+    template : dict,
+    cache : str = None,
+    write_index : bool = False,
+    property_rules : list[Rule] = None,
+    loader : str = 'metadata',
+    cancel_event : 'multiprocessing.synchronize.Event' = None,
+):
+    global _worker_analysis
+    
+    _worker_analysis = Object_Analysis(
+        gamepath,
+        assets,
+        game,
+        template,
+        output = None,
+        cache = cache,
+        write_index = write_index,
+        property_rules = property_rules,
+        loader = loader,
+        cancel_event = cancel_event,
+    )
+
+def _analyze_level_slice(level_files : list[str]) -> tuple[Property_Store, dict, dict, Analysis_Metrics]:
+    _worker_analysis.store = _worker_analysis.new_store(_worker_analysis.template)
+    _worker_analysis.metrics.clear()
+    _worker_analysis.seen_objects = {}
+    if _worker_analysis.write_index:
+        _worker_analysis.index = _worker_analysis.new_index()
     
+    _worker_analysis.analyze_levels(level_files)
+    
+    if _worker_analysis.cache != None:
+        _worker_analysis.cache.commit()
+    
+    return (
+        _worker_analysis.store,
+        _worker_analysis.index,
+        _worker_analysis.seen_objects,
+        _worker_analysis.metrics,
+    )
+
+def __getattr__(name : str):
+    # the window is in object_types_gui, so tkinter is only imported when it's used
+    if name == 'Objects_analysis_gui':
+        import object_types_gui
+        return object_types_gui.Objects_analysis_gui
+    
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
 def main():
-    app = Objects_analysis_gui()
-    app.mainloop()
+    utils.createLogger('file')
+    
+    import object_types_gui
+    object_types_gui.main()
 
 if __name__ == '__main__':
     main()
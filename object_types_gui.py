@@ -0,0 +1,435 @@
+import logging
+import os
+import typing
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk
+from tkinter import filedialog
+
+import wmwpy
+
+import utils
+from settings import Settings
+from utils import Analysis_Cancelled
+from object_types import Object_Analysis
+
+class Objects_analysis_gui(tk.Tk):
+    # milliseconds between progress redraws
+    FRAME_TIME = 50
+    
+    def __init__(self, master = None, *args, **kwargs):
+        super().__init__(master, *args, **kwargs)
+        self.title('Find object properties')
+        self.geometry('%dx%d' % (500 , 300) )
+        
+        self.settings = Settings(
+            'config_object_properties.json',
+            {
+                'version' : 1,
+                'gamepath' : '',
+                'assets' : '/assets',
+                'game' : 'WMW',
+                'template' : 'object_type_lists/wmw-template.json',
+                'output' : 'wmw_objects.json',
+                'workers' : 1,
+                'cache' : '',
+            },
+            write_behind = True,
+        )
+        
+        self.game : wmwpy.Game = None
+        
+        self.progress_queue : queue.Queue[tuple[str, tuple[int, str, int]]] = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.analysis_thread : threading.Thread = None
+
+        self.create_window()
+        self.protocol('WM_DELETE_WINDOW', self.close)
+
+    def create_window(self):
+        self.create_config()
+        self.start_button = ttk.Button(
+            text = 'Start',
+            command = self.start_analysis,
+        )
+        self.start_button.pack()
+        self.cancel_button = ttk.Button(
+            text = 'Cancel',
+            command = self.cancel_analysis,
+            state = 'disabled',
+        )
+        self.cancel_button.pack()
+        self.create_progress_bars()
+    
+    def create_config(self):
+        self.config_frame = ttk.Frame()
+        self.config_frame.pack(side = 'top', fill = 'both', )
+        self.config_frame.columnconfigure(1, weight=1)
+        
+        self.config_widgets : dict[str, tk.Widget | dict[str, tk.Widget]] = {}
+        
+        def create_row(
+            parent : tk.Widget = self,
+            label_text : str = '',
+            entry_type : typing.Literal['text', 'options'] = 'text',
+            entry_callback : typing.Callable[[str], str] = None,
+            default_value : str = '',
+            use_button : bool = True,
+            button_text : str = 'Browse',
+            button_callback : typing.Callable[[str], typing.Any] = None,
+            row = 0,
+            options : list[str] = []
+        ) -> dict[typing.Literal[
+            'label',
+            'var',
+            'entry',
+            'button',
+        ]]:
+            
+            label = ttk.Label(
+                parent,
+                text = label_text,
+            )
+            label.grid(row = row, column = 0, sticky='ew', padx=4, pady=2)
+            
+            var = tk.StringVar(
+                value = default_value,
+            )
+            var.trace_add(
+                'write',
+                lambda *args : entry_callback(var.get()),
+            )
+            
+            def get_entry(
+                type : typing.Literal['text', 'options'],
+                var,
+                options : list = [],
+            ):
+                if type == 'options':
+                    return ttk.Combobox(
+                        parent,
+                        textvariable = var,
+                        values = options,
+                    )
+                else:
+                    return ttk.Entry(
+                        parent,
+                        textvariable = var,
+                    )
+            
+            entry = get_entry(
+                entry_type,
+                var = var,
+                options = options,
+            )
+            # entry.insert(0, var.get())
+            entry.grid(row = row, column = 1, sticky = 'ew', padx=4, pady=2)
+            
+            button = None
+            
+            if use_button:
+                button = ttk.Button(
+                    parent,
+                    text = button_text,
+                    command = lambda *args : var.set(button_callback(var.get())),
+                )
+                button.grid(row = row, column = 2, sticky = 'ew', padx=4, pady=2)
+            
+            return {
+                'label' : label,
+                'var' : var,
+                'entry' : entry,
+                'button' : button,
+            }
+        
+        def validate(
+            default = '',
+            result = None,
+        ):
+            
+            if result in ['', None]:
+                return default
+            else:
+                return result
+        
+        self.config_widgets['gamepath'] = create_row(
+            self.config_frame,
+            label_text = 'Game path',
+            entry_type = 'text',
+            entry_callback = lambda value : self.settings.set('gamepath', value),
+            default_value = self.settings.get('gamepath'),
+            button_callback = lambda path : validate(
+                path,
+                filedialog.askdirectory(
+                    initialdir = os.path.dirname(path),
+                    title = 'Game directory',
+                )
+            ),
+            row = 0,
+        )
+        self.config_widgets['assets'] = create_row(
+            self.config_frame,
+            label_text = 'Assets path',
+            entry_type = 'text',
+            entry_callback = lambda value : self.settings.set('assets', value),
+            default_value = self.settings.get('assets'),
+            button_callback = lambda path : os.path.relpath(
+                validate(
+                    wmwpy.Utils.path.joinPath(self.settings.get('gamepath'), path),
+                    filedialog.askdirectory(
+                        initialdir = os.path.dirname(wmwpy.Utils.path.joinPath(self.settings.get('gamepath'), path)),
+                        title = 'Assets directory',
+                    )
+                ),
+                self.settings.get('gamepath')
+            ),
+            row = 1,
+        )
+        self.config_widgets['game'] = create_row(
+            self.config_frame,
+            label_text = 'Game',
+            entry_type = 'options',
+            options = list(wmwpy.GAMES.keys()),
+            entry_callback = lambda value : self.settings.set('game', value),
+            default_value = self.settings.get('game'),
+            use_button = False,
+            row = 2,
+        )
+        self.config_widgets['template'] = create_row(
+            self.config_frame,
+            label_text = 'Object Template',
+            entry_type = 'text',
+            entry_callback = lambda value : self.settings.set('template', value),
+            default_value = self.settings.get('template'),
+            button_callback = lambda path : validate(
+                path,
+                filedialog.askopenfilename(
+                    title = 'Select objects template',
+                    defaultextension = '.json',
+                    filetypes = (('JSON file', '.json'),
+                                 ('Any', '*.*')),
+                    initialdir = os.path.dirname(path),
+                )
+            ),
+            row = 3,
+        )
+        self.config_widgets['output'] = create_row(
+            self.config_frame,
+            label_text = 'Output',
+            entry_type = 'text',
+            entry_callback = lambda value : self.settings.set('output', value),
+            default_value = self.settings.get('output'),
+            button_callback = lambda path : validate(
+                path,
+                filedialog.asksaveasfilename(
+                    title = 'Select output filename',
+                    defaultextension = '.json',
+                    filetypes = (('JSON file', '.json'),
+                                 ('Any', '*.*')),
+                    initialdir = os.path.dirname(path),
+                )
+            ),
+            row = 4,
+        )
+        self.config_widgets['workers'] = create_row(
+            self.config_frame,
+            label_text = 'Workers',
+            entry_type = 'text',
+            entry_callback = lambda value : self.settings.set('workers', value),
+            default_value = self.settings.get('workers'),
+            use_button = False,
+            row = 5,
+        )
+        self.config_widgets['cache'] = create_row(
+            self.config_frame,
+            label_text = 'Cache folder',
+            entry_type = 'text',
+            entry_callback = lambda value : self.settings.set('cache', value),
+            default_value = self.settings.get('cache'),
+            button_callback = lambda path : validate(
+                path,
+                filedialog.askdirectory(
+                    initialdir = os.path.dirname(path),
+                    title = 'Cache directory',
+                )
+            ),
+            row = 6,
+        )
+        
+        
+        
+    def create_progress_bars(self):
+        
+        self.progress_frame = ttk.Frame()
+        self.progress_frame.columnconfigure(0, weight = 1, uniform = 'progress')
+        self.progress_frame.columnconfigure(1, weight = 1, uniform = 'progress')
+        self.progress_frame.pack(side = 'bottom', fill = 'both', )
+        
+        self.progress_bars : dict[typing.Literal['full', 'loading'], dict[typing.Literal['progress', 'label', 'var', 'callback'], ttk.Progressbar | ttk.Label | tk.StringVar]] = {
+            'full' : {},
+            'loading' : {},
+        }
+        
+        def create_progress_bar(
+            parent : tk.Widget = self,
+            row : int = 0,
+        ) -> dict[typing.Literal[
+            'var',
+            'progress',
+            'label',
+            'callback',
+        ], tk.StringVar |
+           ttk.Progressbar |
+           ttk.Label]:
+            
+            var = tk.StringVar()
+            
+            progress : ttk.Progressbar = ttk.Progressbar(
+                parent
+            )
+            progress.grid(row = row, column = 0, sticky = 'ew', padx = 4, pady = 2)
+            
+            label = ttk.Label(
+                parent,
+                textvariable = var,
+            )
+            label.grid(row = row, column = 1, sticky = 'ew', padx = 4, pady = 2)
+            
+            def callback(index, name, max):
+                progress['max'] = max
+                progress['value'] = index
+                var.set(f'({index}/{max}) {name}')
+            
+            return {
+                'var' : var,
+                'label' : label,
+                'progress' : progress,
+                'callback' : callback,
+            }
+            
+        self.progress_bars['full'] = create_progress_bar(
+            self.progress_frame,
+            row = 0,
+        )
+        self.progress_bars['loading'] = create_progress_bar(
+            self.progress_frame,
+            row = 1,
+        )
+        
+    def set_state(
+        self,
+        state : typing.Literal['enabled', 'disabled'] = 'enabled',
+        widget : tk.Widget = None,
+    ):
+        if widget == None:
+            widget = self
+        
+        if len(widget.winfo_children()) < 1:
+            return
+        
+        for child in widget.winfo_children():
+            try:
+                child.configure(state = state)
+            except:
+                pass
+            # if isinstance(child, (tk.Frame, ttk.Frame)):
+            #     self.set_state(
+            #         state,
+            #         child,
+            #     )
+
+    def start_analysis(self):
+        if self.analysis_thread != None and self.analysis_thread.is_alive():
+            return
+        
+        self.set_state('disabled')
+        self.set_state('disabled', self.config_frame)
+        self.cancel_button.configure(state = 'normal')
+        
+        args = [
+            self.settings.get('gamepath'),
+            self.settings.get('assets'),
+            self.settings.get('game'),
+            self.settings.get('template'),
+            self.settings.get('output'),
+        ]
+        kwargs = {
+            'cache' : self.settings.get('cache'),
+            'workers' : int(self.settings.get('workers') or 1),
+        }
+        
+        self.cancel_event = threading.Event()
+        self.analysis_thread = threading.Thread(
+            target = self.run_analysis,
+            args = (args, kwargs, self.cancel_event),
+            daemon = True,
+        )
+        self.analysis_thread.start()
+        
+        self.after(self.FRAME_TIME, self.poll_progress)
+    
+    def run_analysis(self, args : list, kwargs : dict, cancel_event : threading.Event):
+        """Run the analysis. This runs on the analysis thread, so it only talks to the window through `self.progress_queue`.
+        """
+        try:
+            analysis = Object_Analysis(
+                *args,
+                load_callback = lambda *progress : self.progress_queue.put(('loading', progress)),
+                analysis_callback = lambda *progress : self.progress_queue.put(('full', progress)),
+                cancel_event = cancel_event,
+                **kwargs,
+            )
+            
+            analysis.start()
+        except Analysis_Cancelled:
+            logging.info('analysis cancelled')
+            self.progress_queue.put(('full', (0, 'Cancelled', 1)))
+        except:
+            logging.exception('analysis error')
+            self.progress_queue.put(('full', (0, 'Error, see the log', 1)))
+    
+    def poll_progress(self):
+        """Show the latest progress of every bar, so the window is redrawn at most once every `FRAME_TIME` no matter how many files are analyzed.
+        """
+        # checked before the queue is emptied, so the last progress of a finished thread is not missed
+        running = self.analysis_thread.is_alive()
+        
+        latest = {}
+        
+        while True:
+            try:
+                bar, progress = self.progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            
+            latest[bar] = progress
+        
+        for bar, progress in latest.items():
+            self.progress_bars[bar]['callback'](*progress)
+        
+        if running:
+            self.after(self.FRAME_TIME, self.poll_progress)
+            return
+        
+        self.set_state('enabled')
+        self.set_state('enabled', self.config_frame)
+        self.cancel_button.configure(state = 'disabled')
+    
+    def cancel_analysis(self):
+        self.cancel_event.set()
+        self.cancel_button.configure(state = 'disabled')
+    
+    def close(self):
+        self.cancel_event.set()
+        self.settings.close()
+        self.destroy()
+
+def main():
+    utils.createLogger('file')
+    
+    app = Objects_analysis_gui()
+    app.mainloop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+import os
+import sqlite3
+
+from store import Property_Store
+
+DATABASE_VERSION = 1
+
+SCHEMA = """
+    CREATE TABLE meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    CREATE TABLE types (
+        id INTEGER PRIMARY KEY,
+        name TEXT UNIQUE
+    );
+    CREATE TABLE properties (
+        id INTEGER PRIMARY KEY,
+        type_id INTEGER REFERENCES types(id),
+        name TEXT,
+        data_type TEXT,
+        UNIQUE (type_id, name)
+    );
+    CREATE TABLE "values" (
+        id INTEGER PRIMARY KEY,
+        value TEXT
+    );
+    CREATE TABLE files (
+        id INTEGER PRIMARY KEY,
+        path TEXT UNIQUE
+    );
+    CREATE TABLE property_values (
+        property_id INTEGER,
+        value_id INTEGER,
+        PRIMARY KEY (property_id, value_id)
+    ) WITHOUT ROWID;
+    CREATE TABLE property_files (
+        property_id INTEGER,
+        file_id INTEGER,
+        PRIMARY KEY (property_id, file_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX property_values_value ON property_values (value_id);
+    CREATE INDEX property_files_file ON property_files (file_id);
+    CREATE INDEX properties_name ON properties (name);
+"""
+
+def export_database(
+    store : Property_Store,
+    path : str,
+    meta : dict[str, str] = None,
+):
+    """Export a store to a SQLite database with tables for types, properties, values and files, and join tables between them. The database is written to a temporary file and renamed, so readers never see a half written database.
+    
+    Args:
+        store (Property_Store): Store to export.
+        path (str): Output path, e.g. 'wmw_objects.sqlite'.
+        meta (dict[str, str], optional): Extra metadata, e.g. the game. Defaults to None.
+    """
+    temp_path = path + '.tmp'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    
+    connection = sqlite3.connect(temp_path)
+    
+    try:
+        connection.executescript(SCHEMA)
+        
+        connection.executemany(
+            'INSERT INTO meta VALUES (?, ?)',
+            [('version', str(DATABASE_VERSION))] + [(key, str(value)) for key, value in (meta or {}).items()],
+        )
+        
+        property_values = []
+        property_files = []
+        used_values = set()
+        used_files = set()
+        property_id = 0
+        
+        for type_id, (type, properties) in enumerate(store.entries.items()):
+            connection.execute('INSERT INTO types VALUES (?, ?)', (type_id, type))
+            
+            for name, entry in properties.items():
+                connection.execute(
+                    'INSERT INTO properties VALUES (?, ?, ?, ?)',
+                    (property_id, type_id, name, entry.type),
+                )
+                
+                # the store ids are used as row ids, so nothing has to be looked up again
+                values = list(entry.values)
+                used_values.update(values)
+                property_values.extend((property_id, id) for id in values)
+                
+                if entry.files != None:
+                    files = list(entry.files)
+                    used_files.update(files)
+                    property_files.extend((property_id, id) for id in files)
+                
+                property_id += 1
+        
+        connection.executemany(
+            'INSERT INTO "values" VALUES (?, ?)',
+            ((id, store.value_ids.get(id)) for id in sorted(used_values)),
+        )
+        connection.executemany(
+            'INSERT INTO files VALUES (?, ?)',
+            ((id, store.file_ids.get(id)) for id in sorted(used_files)),
+        )
+        connection.executemany('INSERT INTO property_values VALUES (?, ?)', property_values)
+        connection.executemany('INSERT INTO property_files VALUES (?, ?)', property_files)
+        
+        connection.commit()
+    finally:
+        connection.close()
+    
+    os.replace(temp_path, path)
+
+class Objects_Database():
+    def __init__(self, path : str) -> None:
+        """Read-only access to a database written by `export_database()`. Nothing is loaded up front; every lookup is an indexed query.
+        
+        Args:
+            path (str): Path to the database.
+        
+        Example
+        ```python
+        >> with Objects_Database('wmw_objects.sqlite') as database:
+        >>     database.get_files('spout', 'FluidType')
+        {'/Objects/spout.hs', ...}
+        ```
+        """
+        self.path = path
+        self.connection = sqlite3.connect(
+            f'file:{os.path.abspath(path)}?mode=ro',
+            uri = True,
+            check_same_thread = False,
+        )
+        
+        version = self.get_meta().get('version')
+        if version != str(DATABASE_VERSION):
+            self.connection.close()
+            raise ValueError(f'unsupported database version {version}')
+    
+    def get_meta(self) -> dict[str, str]:
+        return dict(self.connection.execute('SELECT key, value FROM meta'))
+    
+    def get_types(self) -> list[str]:
+        return [name for (name,) in self.connection.execute('SELECT name FROM types ORDER BY id')]
+    
+    def get_properties(self, type : str) -> dict[str, str]:
+        """Get the properties of an object type.
+        
+        Returns:
+            dict[str, str]: Property name -> data type.
+        """
+        return dict(self.connection.execute(
+            '''SELECT properties.name, properties.data_type FROM properties
+            JOIN types ON types.id = properties.type_id
+            WHERE types.name = ? ORDER BY properties.id''',
+            (type,),
+        ))
+    
+    def get_data_type(self, type : str, property : str) -> str | None:
+        row = self.connection.execute(
+            '''SELECT properties.data_type FROM properties
+            JOIN types ON types.id = properties.type_id
+            WHERE types.name = ? AND properties.name = ?''',
+            (type, property),
+        ).fetchone()
+        
+        return None if row == None else row[0]
+    
+    def get_values(self, type : str, property : str) -> set[str]:
+        return {value for (value,) in self.connection.execute(
+            '''SELECT "values".value FROM property_values
+            JOIN "values" ON "values".id = property_values.value_id
+            WHERE property_values.property_id = (
+                SELECT properties.id FROM properties
+                JOIN types ON types.id = properties.type_id
+                WHERE types.name = ? AND properties.name = ?
+            )''',
+            (type, property),
+        )}
+    
+    def get_files(self, type : str, property : str) -> set[str]:
+        """Get the files that use a property on an object type.
+        """
+        return {path for (path,) in self.connection.execute(
+            '''SELECT files.path FROM property_files
+            JOIN files ON files.id = property_files.file_id
+            WHERE property_files.property_id = (
+                SELECT properties.id FROM properties
+                JOIN types ON types.id = properties.type_id
+                WHERE types.name = ? AND properties.name = ?
+            )''',
+            (type, property),
+        )}
+    
+    def get_file_properties(self, path : str) -> list[tuple[str, str]]:
+        """Get the properties a file uses.
+        
+        Returns:
+            list[tuple[str, str]]: `(type, property)` pairs.
+        """
+        return self.connection.execute(
+            '''SELECT types.name, properties.name FROM property_files
+            JOIN properties ON properties.id = property_files.property_id
+            JOIN types ON types.id = properties.type_id
+            WHERE property_files.file_id = (SELECT id FROM files WHERE path = ?)
+            ORDER BY properties.id''',
+            (path,),
+        ).fetchall()
+    
+    def get_property_types(self, property : str) -> list[str]:
+        """Get the object types that have a property.
+        """
+        return [name for (name,) in self.connection.execute(
+            '''SELECT types.name FROM properties
+            JOIN types ON types.id = properties.type_id
+            WHERE properties.name = ? ORDER BY types.id''',
+            (property,),
+        )]
+    
+    def close(self):
+        self.connection.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
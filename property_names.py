@@ -0,0 +1,85 @@
+import re
+import typing
+
+import utils
+
+Rule = str | tuple[str, str]
+
+class Property_Normalizer():
+    def __init__(self, rules : typing.Iterable[Rule] = None) -> None:
+        """Normalizes property names, so indexed properties like 'Connection0' and 'Connection12' share the key 'Connection#'. Results are cached, since the same few names come up for every object.
+        
+        Args:
+            rules (Iterable[str | tuple[str, str]], optional): Extra normalization rules, which are checked in order before the default one. A rule is either a regex with a `name` group, which is normalized to `name + '#'`, or a `(regex, template)` pair, which is normalized with `re.Match.expand(template)`. The regex has to match the whole property name. Defaults to None.
+        
+        Example
+        ```python
+        >> normalizer = Property_Normalizer([r'(?P<name>.+)_\\d+'])
+        >> normalizer.normalize('Spout_2')
+        'Spout#'
+        >> normalizer.normalize('Connection0')
+        'Connection#'
+        ```
+        """
+        self.rules : list[tuple[re.Pattern, str]] = []
+        
+        for rule in rules or []:
+            if isinstance(rule, str):
+                rule = (rule, r'\g<name>#')
+            
+            pattern, template = rule
+            self.rules.append((re.compile(pattern), template))
+        
+        self.cache : dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def normalize(self, property : str) -> str:
+        """Get the normalized key of a property name.
+        
+        Args:
+            property (str): Property name.
+        
+        Returns:
+            str: Normalized key, e.g. 'Connection#'.
+        """
+        key = self.cache.get(property)
+        
+        if key != None:
+            self.hits += 1
+            return key
+        
+        self.misses += 1
+        key = self.apply_rules(property)
+        self.cache[property] = key
+        return key
+    
+    def apply_rules(self, property : str) -> str:
+        """Normalize a property name without the cache.
+        """
+        for pattern, template in self.rules:
+            match = pattern.fullmatch(property)
+            if match:
+                return match.expand(template)
+        
+        split = utils.split_num(property)
+        
+        if split[0] == '':
+            return property
+        
+        if split[1].isnumeric():
+            return split[0] + '#'
+        
+        return property
+    
+    def cache_info(self) -> dict[str, int]:
+        return {
+            'hits' : self.hits,
+            'misses' : self.misses,
+            'size' : len(self.cache),
+        }
+    
+    def clear(self):
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
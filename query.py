@@ -0,0 +1,277 @@
+import bisect
+import json
+import typing
+from collections.abc import Mapping
+
+from store import Property_Store
+
+if typing.TYPE_CHECKING:
+    from object_types import Object_Analysis
+
+class Term_Index():
+    # length of the n-grams used for substring search
+    GRAM_SIZE = 3
+    
+    def __init__(
+        self,
+        terms : typing.Iterable[str],
+        ignore_case : bool = False,
+    ) -> None:
+        """Index of strings for prefix search (with a sorted list and `bisect`) and substring search (with an n-gram index).
+        
+        Args:
+            terms (Iterable[str]): Strings to index.
+            ignore_case (bool, optional): Match regardless of case. Defaults to False.
+        """
+        self.ignore_case = ignore_case
+        
+        # folded key -> original terms
+        self.originals : dict[str, set[str]] = {}
+        for term in terms:
+            self.originals.setdefault(self.fold(term), set()).add(term)
+        
+        self.keys = sorted(self.originals)
+        
+        self.grams : dict[str, set[int]] = {}
+        for id, key in enumerate(self.keys):
+            for gram in self.get_grams(key):
+                self.grams.setdefault(gram, set()).add(id)
+    
+    def fold(self, term : str) -> str:
+        term = str(term)
+        return term.casefold() if self.ignore_case else term
+    
+    def get_grams(self, key : str) -> set[str]:
+        size = self.GRAM_SIZE
+        return {key[index:index + size] for index in range(len(key) - size + 1)}
+    
+    def get_terms(self, keys : typing.Iterable[str]) -> list[str]:
+        terms = []
+        for key in keys:
+            terms.extend(sorted(self.originals[key]))
+        return terms
+    
+    def prefix(self, prefix : str) -> list[str]:
+        """Get the terms that start with `prefix`, in sorted order.
+        """
+        prefix = self.fold(prefix)
+        
+        start = bisect.bisect_left(self.keys, prefix)
+        end = start
+        while end < len(self.keys) and self.keys[end].startswith(prefix):
+            end += 1
+        
+        return self.get_terms(self.keys[start:end])
+    
+    def substring(self, text : str) -> list[str]:
+        """Get the terms that contain `text`, in sorted order.
+        """
+        text = self.fold(text)
+        
+        if len(text) < self.GRAM_SIZE:
+            # too short for the n-grams, but short queries are rare
+            return self.get_terms(key for key in self.keys if text in key)
+        
+        candidates = None
+        # rarest n-grams first, so the intersection shrinks quickly
+        for gram in sorted(self.get_grams(text), key = lambda gram : len(self.grams.get(gram, ()))):
+            ids = self.grams.get(gram)
+            if ids == None:
+                return []
+            
+            candidates = set(ids) if candidates == None else candidates & ids
+            if len(candidates) == 0:
+                return []
+        
+        return self.get_terms(self.keys[id] for id in sorted(candidates) if text in self.keys[id])
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+
+class Object_Query():
+    def __init__(
+        self,
+        object_types : Mapping | Property_Store,
+        ignore_case : bool = False,
+    ) -> None:
+        """Indexes over the `object_types` output, for fast lookups by property, value and file.
+        
+        The indexes are a snapshot. If the data changes (e.g. a live analysis was updated), call `refresh()`.
+        
+        Args:
+            object_types (Mapping | Property_Store): Data in the `object_types` format, e.g. a loaded `wmw_objects.json`, or a store.
+            ignore_case (bool, optional): Make prefix and substring search ignore case. Defaults to False.
+        
+        Example
+        ```python
+        >> query = Object_Query.from_file('wmw_objects.json')
+        >> query.get_property_types('FluidType')
+        ['spout', 'fluidconverter']
+        >> query.search_properties('Connect')
+        ['ConnectedSpout#', 'Connection#']
+        ```
+        """
+        if isinstance(object_types, Property_Store):
+            object_types = object_types.view()
+        
+        self.object_types = object_types
+        self.ignore_case = ignore_case
+        
+        self.refresh()
+    
+    @classmethod
+    def from_file(cls, path : str, ignore_case : bool = False) -> 'Object_Query':
+        with open(path, 'r') as file:
+            return cls(json.load(file), ignore_case = ignore_case)
+    
+    @classmethod
+    def from_analysis(cls, analysis : 'Object_Analysis', ignore_case : bool = False) -> 'Object_Query':
+        """Query the live results of an analysis.
+        """
+        return cls(analysis.store, ignore_case = ignore_case)
+    
+    def refresh(self):
+        """Build the indexes again from the data.
+        """
+        # property -> types
+        self.property_types : dict[str, list[str]] = {}
+        # value -> (type, property) pairs
+        self.value_properties : dict[str, list[tuple[str, str]]] = {}
+        # file -> (type, property) pairs
+        self.file_properties : dict[str, list[tuple[str, str]]] = {}
+        # (type, property) -> property with `values` and `files` as sets
+        self.properties : dict[tuple[str, str], dict[str, str | set[str]]] = {}
+        
+        for type, properties in self.object_types.items():
+            for name, property in properties.items():
+                property = {
+                    'type' : property.get('type', 'any'),
+                    'values' : {str(value) for value in property.get('values', ())},
+                    'files' : set(property.get('files', ())),
+                }
+                self.properties[(type, name)] = property
+                
+                self.property_types.setdefault(name, []).append(type)
+                
+                for value in property['values']:
+                    self.value_properties.setdefault(value, []).append((type, name))
+                
+                for file in property['files']:
+                    self.file_properties.setdefault(file, []).append((type, name))
+        
+        self.property_names = Term_Index(self.property_types, self.ignore_case)
+        self.value_terms = Term_Index(self.value_properties, self.ignore_case)
+    
+    def get_types(self) -> list[str]:
+        return list(self.object_types)
+    
+    def get_property(self, type : str, property : str) -> dict[str, str | set[str]] | None:
+        """Get a property of an object type, with `type`, `values` and `files`.
+        """
+        return self.properties.get((type, property))
+    
+    def get_property_types(self, property : str) -> list[str]:
+        """Get the object types that have a property.
+        """
+        return list(self.property_types.get(property, []))
+    
+    def get_value_properties(self, value : str) -> list[tuple[str, str, set[str]]]:
+        """Get the properties that have a value.
+        
+        Returns:
+            list[tuple[str, str, set[str]]]: `(type, property, files)`, where `files` are all files that use the property.
+        """
+        return [
+            (type, property, self.properties[(type, property)]['files'])
+            for type, property in self.value_properties.get(str(value), [])
+        ]
+    
+    def get_file_properties(self, file : str) -> list[tuple[str, str]]:
+        """Get the `(type, property)` pairs a file uses.
+        """
+        return list(self.file_properties.get(file, []))
+    
+    def search_properties(self, text : str, mode : typing.Literal['prefix', 'substring'] = 'prefix') -> list[str]:
+        """Search property names.
+        
+        Args:
+            text (str): Text to search for.
+            mode (Literal['prefix', 'substring'], optional): Match the start of names, or anywhere in them. Defaults to 'prefix'.
+        
+        Returns:
+            list[str]: Matching property names.
+        """
+        if mode == 'substring':
+            return self.property_names.substring(text)
+        return self.property_names.prefix(text)
+    
+    def search_values(self, text : str, mode : typing.Literal['prefix', 'substring'] = 'prefix') -> list[str]:
+        """Search property values.
+        
+        Args:
+            text (str): Text to search for.
+            mode (Literal['prefix', 'substring'], optional): Match the start of values, or anywhere in them. Defaults to 'prefix'.
+        
+        Returns:
+            list[str]: Matching values.
+        """
+        if mode == 'substring':
+            return self.value_terms.substring(text)
+        return self.value_terms.prefix(text)
+
+class Element_Query():
+    def __init__(self, object_elements : Mapping) -> None:
+        """Indexes over the `object_elements` output.
+        
+        Args:
+            object_elements (Mapping): Data in the `object_elements` format, e.g. a loaded `wmw_elements.json`.
+        """
+        self.object_elements = object_elements
+        
+        self.refresh()
+    
+    @classmethod
+    def from_file(cls, path : str) -> 'Element_Query':
+        with open(path, 'r') as file:
+            return cls(json.load(file))
+    
+    def refresh(self):
+        """Build the indexes again from the data.
+        """
+        # element -> (count, file), sorted by count
+        self.element_files : dict[str, list[tuple[int, str]]] = {}
+        
+        for file, elements in self.object_elements.get('elements', {}).items():
+            for element, count in elements.items():
+                self.element_files.setdefault(element, []).append((count, file))
+        
+        for files in self.element_files.values():
+            files.sort()
+        
+        self.files = Term_Index(self.object_elements.get('elements', {}))
+    
+    def get_elements(self, file : str) -> dict[str, int]:
+        return dict(self.object_elements.get('elements', {}).get(file, {}))
+    
+    def get_files(self, element : str, minimum : int = 1, maximum : int = None) -> list[str]:
+        """Get the files with a number of an element in a range, e.g. objects with at least 10 sprites.
+        
+        Args:
+            element (str): Element, e.g. 'Sprites'.
+            minimum (int, optional): Minimum count. Defaults to 1.
+            maximum (int, optional): Maximum count. Defaults to no maximum.
+        
+        Returns:
+            list[str]: Files, from the lowest count to the highest.
+        """
+        files = self.element_files.get(element, [])
+        
+        start = bisect.bisect_left(files, (minimum, ''))
+        end = len(files) if maximum == None else bisect.bisect_left(files, (maximum + 1, ''))
+        
+        return [file for count, file in files[start:end]]
+    
+    def search_files(self, text : str, mode : typing.Literal['prefix', 'substring'] = 'prefix') -> list[str]:
+        if mode == 'substring':
+            return self.files.substring(text)
+        return self.files.prefix(text)
@@ -9,7 +9,12 @@
 __version__ = '1.0.0'
 __author__ = 'ego-lay-atman-bay'
 
+import os
+import stat
 import json
+import atexit
+import tempfile
+import threading
 from copy import deepcopy
 from collections.abc import MutableMapping
 
@@ -18,18 +23,32 @@ class Settings():
         this,
         filename : str = 'settings.json',
         default_settings : dict[str] = {'version' : 1},
+        write_behind : bool = False,
+        delay : float = 0.5,
     ) -> None:
         """Settings object.
 
         Args:
             filename (str, optional): Path to settings file. Defaults to 'settings.json'.
             default_settings (dict, optional): Default settings. Defaults to {'version' : 1}.
+            write_behind (bool, optional): Don't save on every change. Changes are saved `delay` seconds after the last one, on `flush()`, or at exit. Defaults to False.
+            delay (float, optional): Seconds to wait for more changes before saving in write-behind mode. Defaults to 0.5.
         """
         
         this.filename = filename
         this.default_settings = deepcopy(default_settings)
         this.settings = deepcopy(this.default_settings)
         
+        this.write_behind = write_behind
+        this.delay = delay
+        this.dirty = False
+        
+        this._lock = threading.RLock()
+        this._timer : threading.Timer = None
+        
+        if this.write_behind:
+            atexit.register(this.flush)
+        
         this.load()
     
     def load(this, **kwargs):
@@ -75,10 +94,74 @@ class Settings():
         return this.settings
     
     def save(this):
-        """Save the settings.
+        """Save the settings. The file is written to a temporary file first, then renamed, so it's never half written. The file keeps its permissions.
         """
-        with open(this.filename, 'w') as file:
-            json.dump(this.settings, file, indent=2)
+        with this._lock:
+            this._cancel_timer()
+            
+            file = tempfile.NamedTemporaryFile(
+                'w',
+                dir = os.path.dirname(os.path.abspath(this.filename)),
+                prefix = os.path.basename(this.filename) + '.',
+                suffix = '.tmp',
+                delete = False,
+            )
+            try:
+                with file:
+                    json.dump(this.settings, file, indent=2)
+                # temporary files are only readable by the owner
+                os.chmod(file.name, this._get_mode())
+                os.replace(file.name, this.filename)
+            except:
+                try:
+                    os.remove(file.name)
+                except OSError:
+                    pass
+                raise
+            
+            this.dirty = False
+    
+    def _get_mode(this) -> int:
+        """Get the permissions of the settings file, or the default permissions of a new file.
+        """
+        try:
+            return stat.S_IMODE(os.stat(this.filename).st_mode)
+        except OSError:
+            umask = os.umask(0)
+            os.umask(umask)
+            return 0o666 & ~umask
+    
+    def flush(this):
+        """Save the settings now if there are unsaved changes.
+        """
+        with this._lock:
+            this._cancel_timer()
+            if this.dirty:
+                this.save()
+    
+    def close(this):
+        this.flush()
+        if this.write_behind:
+            atexit.unregister(this.flush)
+    
+    def _changed(this):
+        with this._lock:
+            this.dirty = True
+            
+            if not this.write_behind:
+                this.save()
+                return
+            
+            # debounce, so a burst of changes (e.g. typing) is only saved once
+            this._cancel_timer()
+            this._timer = threading.Timer(this.delay, this.flush)
+            this._timer.daemon = True
+            this._timer.start()
+    
+    def _cancel_timer(this):
+        if this._timer != None:
+            this._timer.cancel()
+            this._timer = None
     
     def set(this, name : str, value):
         """Set a setting.
@@ -88,9 +171,14 @@ class Settings():
             value (Any): The value to save.
         """
         option = this._split_option(name)
-        settings = this._get_settings(option, this.settings)
-        settings[option[-1]] = value
-        this.save()
+        
+        with this._lock:
+            settings = this._get_settings(option, this.settings)
+            if option[-1] in settings and settings[option[-1]] == value:
+                return
+            
+            settings[option[-1]] = value
+            this._changed()
     
     def get(this, name : str):
         """Get a setting.
@@ -112,15 +200,18 @@ class Settings():
             name (str): Name of setting to delete.
         """
         option = this._split_option(name)
-        settings = this._get_settings(option, this.settings)
-        del settings[option[-1]]
-        this.save()
+        
+        with this._lock:
+            settings = this._get_settings(option, this.settings)
+            del settings[option[-1]]
+            this._changed()
     
     def initialize(this):
         """Initialize the settings. This resets the settings, then saves.
         """
-        this.settings = deepcopy(this.default_settings)
-        this.save()
+        with this._lock:
+            this.settings = deepcopy(this.default_settings)
+            this._changed()
     
     def _split_option(this, value : str | list) -> list[str]:
         if isinstance(value, (list, tuple)):
@@ -139,5 +230,11 @@ class Settings():
             
             return this._get_settings(value[1::], items)
     
+    def __enter__(this):
+        return this
+    
+    def __exit__(this, *args):
+        this.close()
+    
     def __str__(self) -> str:
         return json.dumps(self.settings, indent=2)
@@ -0,0 +1,253 @@
+import os
+import json
+import heapq
+import tempfile
+import typing
+
+from json_utils import dump_stream
+from store import Property_Store
+
+# (type, property, values, files), with `property = None` for the type itself
+Merged_Property = tuple[str, str | None, set | None, set | None]
+
+class Shard_Spiller():
+    # runs merged at once, to stay below the open file limit
+    MAX_OPEN_RUNS = 64
+    
+    def __init__(
+        self,
+        directory : str = None,
+        max_open_runs : int = None,
+    ) -> None:
+        """Spills partial results to disk as sorted runs, and merges them back with an external k-way merge, so only one shard and one property of the merge are in memory at a time.
+        
+        Every run is a JSON lines file with a line per type and per property, sorted in the order of the output: `[type]` for a type, and `[type, property, values, files]` for a property.
+        
+        Args:
+            directory (str, optional): Folder for the runs, which makes a temporary folder inside it. Defaults to the system temporary folder.
+            max_open_runs (int, optional): Runs merged at once. More runs are merged in several passes. Defaults to `MAX_OPEN_RUNS`.
+        """
+        # removed when the spiller is garbage collected, e.g. after a cancelled analysis
+        self._temp = tempfile.TemporaryDirectory(prefix = 'wmw_shards_', dir = directory)
+        self.directory = self._temp.name
+        self.max_open_runs = max(2, max_open_runs or self.MAX_OPEN_RUNS)
+        
+        self.runs : list[str] = []
+        self._run_number = 0
+    
+    def new_run_path(self) -> str:
+        path = os.path.join(self.directory, f'run{self._run_number}.jsonl')
+        self._run_number += 1
+        return path
+    
+    def spill(self, store : Property_Store) -> str:
+        """Write a store to a new run.
+        
+        Returns:
+            str: Path to the run.
+        """
+        path = self.new_run_path()
+        
+        with open(path, 'w') as file:
+            for type in sorted(store.entries):
+                file.write(json.dumps([type]))
+                file.write('\n')
+                
+                properties = store.entries[type]
+                for name in sorted(properties):
+                    entry = properties[name]
+                    
+                    file.write(json.dumps([
+                        type,
+                        name,
+                        list(store.get_values(entry)),
+                        None if entry.files == None else list(store.get_files(entry)),
+                    ]))
+                    file.write('\n')
+        
+        self.runs.append(path)
+        return path
+    
+    def get_shared_properties(self, shared_type : str = '') -> set[str]:
+        """Get the names of the properties of `shared_type` in every run. The type sorts first in the runs, so only the start of every run is read.
+        """
+        shared = set()
+        
+        for path in self.runs:
+            for record in read_run(path):
+                if record[0] > shared_type:
+                    break
+                if record[0] == shared_type and len(record) > 2:
+                    shared.add(record[1])
+        
+        return shared
+    
+    def route_shared_properties(self, shared_type : str = ''):
+        """Move the properties of every type that are also in `shared_type` in any run into `shared_type`, like `Object_Analysis.route_shared_properties()` does for a single store. A property can become shared after earlier runs were spilled, so only those runs are rewritten, one at a time.
+        """
+        shared = self.get_shared_properties(shared_type)
+        if len(shared) == 0:
+            return
+        
+        for path in self.runs:
+            if not any(len(record) > 2 and record[0] != shared_type and record[1] in shared for record in read_run(path)):
+                continue
+            
+            records : dict[tuple[str, ...], list] = {}
+            
+            for record in read_run(path):
+                if len(record) > 2 and record[0] != shared_type and record[1] in shared:
+                    # the type itself is kept, like an empty type in a store
+                    records.setdefault((record[0],), [record[0]])
+                    record = [shared_type, *record[1:]]
+                
+                key = _record_key(record)
+                merged = records.get(key)
+                if merged == None:
+                    records[key] = record
+                elif len(record) > 2:
+                    merged[2] = sorted(set(merged[2]) | set(record[2]))
+                    if record[3] != None:
+                        merged[3] = sorted(set(merged[3] or []) | set(record[3]))
+            
+            with open(path, 'w') as file:
+                for key in sorted(records):
+                    file.write(json.dumps(records[key]))
+                    file.write('\n')
+    
+    def merge(self) -> typing.Iterator[Merged_Property]:
+        """Merge every run, in the order of the output. Runs past `max_open_runs` are first merged into bigger runs.
+        
+        Yields:
+            tuple[str, str | None, set | None, set | None]: `(type, None, None, None)` for every type, then `(type, property, values, files)` for every property of the type.
+        """
+        while len(self.runs) > self.max_open_runs:
+            runs = self.runs[:self.max_open_runs]
+            path = self.new_run_path()
+            
+            with open(path, 'w') as file:
+                for type, name, values, files in merge_runs(runs):
+                    if name == None:
+                        file.write(json.dumps([type]))
+                    else:
+                        file.write(json.dumps([type, name, list(values), None if files == None else list(files)]))
+                    file.write('\n')
+            
+            for run in runs:
+                os.remove(run)
+            
+            self.runs = self.runs[self.max_open_runs:] + [path]
+        
+        yield from merge_runs(self.runs)
+    
+    def cleanup(self):
+        self._temp.cleanup()
+        self.runs = []
+    
+    def __len__(self) -> int:
+        return len(self.runs)
+
+def read_run(path : str) -> typing.Iterator[list]:
+    with open(path, 'r') as file:
+        for line in file:
+            yield json.loads(line)
+
+def _record_key(record : list) -> tuple[str, ...]:
+    # a type sorts before its properties
+    return tuple(record[:2])
+
+def _merged_property(key : tuple[str, ...], values : set, files : set | None) -> Merged_Property:
+    if len(key) == 1:
+        return (key[0], None, None, None)
+    return (key[0], key[1], values, files)
+
+def merge_runs(paths : list[str]) -> typing.Iterator[Merged_Property]:
+    """Merge sorted runs with a heap, joining the values and files of the same property in every run.
+    """
+    key = None
+    values : set = None
+    files : set = None
+    
+    for record in heapq.merge(*(read_run(path) for path in paths), key = _record_key):
+        record_key = _record_key(record)
+        
+        if record_key != key:
+            if key != None:
+                yield _merged_property(key, values, files)
+            
+            key = record_key
+            values = set()
+            files = None
+        
+        if len(record) > 2:
+            values.update(record[2])
+            if record[3] != None:
+                if files == None:
+                    files = set()
+                files.update(record[3])
+    
+    if key != None:
+        yield _merged_property(key, values, files)
+
+def dump_merged(
+    properties : typing.Iterable[tuple[str, str | None, dict | None]],
+    file : typing.TextIO,
+    indent : int | None = 2,
+):
+    """Write merged properties as the object types JSON, one property at a time. The output is the same as `dump_stream()` of the whole object types.
+    
+    Args:
+        properties (Iterable[tuple[str, str | None, dict | None]]): `(type, property, data)` sorted by type and property, with `(type, None, None)` for every type.
+        file (TextIO): File to write to.
+        indent (int | None, optional): Indent, or `None` for compact output. Defaults to 2.
+    """
+    write = file.write
+    key_separator = ':' if indent == None else ': '
+    
+    def newline(level : int) -> str:
+        if indent == None:
+            return ''
+        return '\n' + ' ' * (indent * level)
+    
+    current_type = None
+    type_count = 0
+    property_count = 0
+    
+    def close_type():
+        write(newline(1) + '}' if property_count > 0 else '}')
+    
+    write('{')
+    
+    for type, name, data in properties:
+        if type != current_type:
+            if current_type != None:
+                close_type()
+            if type_count > 0:
+                write(',')
+            
+            write(newline(1))
+            write(json.dumps(str(type)))
+            write(key_separator)
+            write('{')
+            
+            current_type = type
+            type_count += 1
+            property_count = 0
+        
+        if name == None:
+            continue
+        
+        if property_count > 0:
+            write(',')
+        write(newline(2))
+        write(json.dumps(str(name)))
+        write(key_separator)
+        dump_stream(data, file, indent, level = 2)
+        
+        property_count += 1
+    
+    if current_type != None:
+        close_type()
+        write(newline(0))
+    
+    write('}')
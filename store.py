@@ -0,0 +1,443 @@
+import sys
+import typing
+from collections.abc import Mapping
+
+from type_inference import Type_Summary
+
+class Interner():
+    # rough bytes of the dict entry, list slot and id of every string
+    ENTRY_SIZE = 120
+    
+    def __init__(self) -> None:
+        """Maps strings (file paths and property values) to integer ids, so every distinct string is only stored once.
+        """
+        self.strings : list[typing.Hashable] = []
+        self.ids : dict[typing.Hashable, int] = {}
+        
+        # estimated memory of the strings, see `Property_Store.get_size()`
+        self.size = 0
+    
+    def intern(self, string : typing.Hashable) -> int:
+        """Get the id of a string, adding it if it's new.
+        """
+        id = self.ids.get(string)
+        
+        if id == None:
+            id = len(self.strings)
+            self.ids[string] = id
+            self.strings.append(string)
+            self.size += sys.getsizeof(string) + self.ENTRY_SIZE
+        
+        return id
+    
+    def get(self, id : int) -> typing.Hashable:
+        return self.strings[id]
+    
+    def lookup(self, string : typing.Hashable) -> int | None:
+        """Get the id of a string without adding it.
+        """
+        return self.ids.get(string)
+    
+    def __len__(self) -> int:
+        return len(self.strings)
+
+def ids_to_bits(ids : typing.Iterable[int]) -> int:
+    """Make a bitset from ids.
+    """
+    ids = list(ids)
+    if len(ids) == 0:
+        return 0
+    
+    buffer = bytearray((max(ids) >> 3) + 1)
+    for id in ids:
+        buffer[id >> 3] |= 1 << (id & 7)
+    
+    return int.from_bytes(buffer, 'little')
+
+# bit positions that are set in every byte value
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+def bits_to_ids(bits : int) -> typing.Iterator[int]:
+    """Get the ids in a bitset, in ascending order.
+    """
+    data = bits.to_bytes((bits.bit_length() + 7) >> 3, 'little')
+    
+    for index, byte in enumerate(data):
+        if byte == 0:
+            continue
+        
+        offset = index << 3
+        for bit in _BYTE_BITS[byte]:
+            yield offset | bit
+
+class Id_Set():
+    __slots__ = ('bits', 'pending')
+    
+    # new ids are buffered and folded into the bitset in batches, since every `|=` copies the whole int
+    BATCH_SIZE = 256
+    
+    def __init__(self, ids : typing.Iterable[int] = ()) -> None:
+        """Set of interned ids, stored as a bitset.
+        """
+        self.bits = ids_to_bits(ids)
+        self.pending : set[int] = set()
+    
+    def add(self, id : int):
+        self.pending.add(id)
+        
+        if len(self.pending) >= self.BATCH_SIZE:
+            self.fold()
+    
+    def fold(self) -> int:
+        """Move buffered ids into the bitset.
+        
+        Returns:
+            int: The bitset.
+        """
+        if len(self.pending) > 0:
+            self.bits |= ids_to_bits(self.pending)
+            self.pending.clear()
+        
+        return self.bits
+    
+    def update(self, other : 'Id_Set'):
+        self.bits |= other.fold()
+    
+    def copy(self) -> 'Id_Set':
+        ids = Id_Set()
+        ids.bits = self.fold()
+        return ids
+    
+    def __iter__(self) -> typing.Iterator[int]:
+        return bits_to_ids(self.fold())
+    
+    def __len__(self) -> int:
+        return self.fold().bit_count()
+    
+    def get_size(self) -> int:
+        """Estimate the memory of the set in bytes, without folding it.
+        """
+        # a set entry and an int per buffered id
+        return (self.bits.bit_length() >> 3) + len(self.pending) * 64
+    
+    def __contains__(self, id : int) -> bool:
+        return id in self.pending or (self.bits >> id) & 1 == 1
+    
+    def __getstate__(self):
+        return self.fold()
+    
+    def __setstate__(self, bits : int):
+        self.bits = bits
+        self.pending = set()
+
+class Property_Entry():
+    __slots__ = ('type', 'values', 'files', 'summary', 'stats')
+    
+    def __init__(self, type : str = 'any') -> None:
+        """Observations of one property of one object type.
+        
+        Attributes:
+            type (str): Type string of the property.
+            values (Id_Set): Ids of the values.
+            files (Id_Set | None): Ids of the object files that use this property. `None` until a file is added.
+            summary (Type_Summary | None): Running type of the values.
+            stats (dict | None): Numeric statistics of the values, from `numeric_stats.get_numeric_stats()`.
+        """
+        self.type = type
+        self.values = Id_Set()
+        self.files : Id_Set = None
+        self.summary : Type_Summary = None
+        self.stats : dict = None
+
+class Property_Store():
+    # rough bytes of a Property_Entry with its sets and dict entry
+    ENTRY_SIZE = 400
+    
+    def __init__(
+        self,
+        values : Interner = None,
+        files : Interner = None,
+    ) -> None:
+        """Compact store of the observed property values and files of every object type. Values and file paths are interned to ids, and every property keeps its values and files as bitsets, so memory and merge cost scale with distinct values instead of repeats.
+        
+        Args:
+            values (Interner, optional): Value interner, which can be shared with other stores. Defaults to a new one.
+            files (Interner, optional): File path interner, which can be shared with other stores. Defaults to a new one.
+        """
+        self.value_ids = values if values != None else Interner()
+        self.file_ids = files if files != None else Interner()
+        
+        self.entries : dict[str, dict[str, Property_Entry]] = {}
+    
+    def add_type(self, type : str) -> dict[str, Property_Entry]:
+        return self.entries.setdefault(type, {})
+    
+    def get(self, type : str, property : str) -> Property_Entry | None:
+        return self.entries.get(type, {}).get(property)
+    
+    def setdefault(self, type : str, property : str, data_type : str = 'any') -> Property_Entry:
+        properties = self.entries.setdefault(type, {})
+        
+        entry = properties.get(property)
+        if entry == None:
+            entry = Property_Entry(data_type)
+            properties[property] = entry
+        
+        return entry
+    
+    def remove(self, type : str, property : str = None):
+        """Remove a property, or a whole type if `property` is `None`.
+        """
+        if property == None:
+            self.entries.pop(type, None)
+            return
+        
+        properties = self.entries.get(type)
+        
+        if properties != None:
+            properties.pop(property, None)
+    
+    def move(self, type : str, property : str, to_type : str):
+        """Move a property to another type, and join it with the property of the same name there.
+        """
+        entry = self.entries.get(type, {}).pop(property, None)
+        if entry == None:
+            return
+        
+        target = self.entries.setdefault(to_type, {}).get(property)
+        if target == None:
+            self.entries[to_type][property] = entry
+            return
+        
+        target.values.update(entry.values)
+        if entry.files != None:
+            if target.files == None:
+                target.files = Id_Set()
+            target.files.update(entry.files)
+        
+        if entry.summary != None and target.summary != None:
+            target.summary.merge(entry.summary)
+        else:
+            target.summary = None
+        target.type = self.get_summary(target).type
+        target.stats = None
+    
+    def add(self, entry : Property_Entry, value : typing.Hashable, file : str = None) -> bool:
+        """Add a value and file to a property entry, and widen its type.
+        
+        Args:
+            entry (Property_Entry): Entry from `setdefault()`.
+            value (Hashable): Property value.
+            file (str, optional): Object file that has this value. Defaults to None.
+        
+        Returns:
+            bool: Whether the type changed.
+        """
+        entry.values.add(self.value_ids.intern(value))
+        
+        if file != None:
+            if entry.files == None:
+                entry.files = Id_Set()
+            entry.files.add(self.file_ids.intern(file))
+        
+        # widening with a value that is already there is a no-op, so this doesn't need a membership test
+        if entry.summary == None:
+            # the first summary also has to include the values that were already there (e.g. from a template)
+            entry.summary = Type_Summary(self.get_values(entry))
+        elif not entry.summary.add(value):
+            return False
+        
+        entry.type = entry.summary.type
+        return True
+    
+    def set_values(self, entry : Property_Entry, values : typing.Iterable, files : typing.Iterable[str] = None):
+        """Replace the values and files of an entry. The type is summarized again, and the numeric statistics are removed.
+        """
+        values = list(values)
+        
+        entry.values = Id_Set(self.value_ids.intern(value) for value in values)
+        entry.files = None if files == None else Id_Set(self.file_ids.intern(file) for file in files)
+        entry.summary = Type_Summary(values)
+        entry.type = entry.summary.type
+        entry.stats = None
+    
+    def get_values(self, entry : Property_Entry) -> set:
+        return {self.value_ids.get(id) for id in entry.values}
+    
+    def get_files(self, entry : Property_Entry) -> set[str] | None:
+        if entry.files == None:
+            return None
+        
+        return {self.file_ids.get(id) for id in entry.files}
+    
+    def get_summary(self, entry : Property_Entry) -> Type_Summary:
+        if entry.summary == None:
+            entry.summary = Type_Summary(self.get_values(entry))
+        
+        return entry.summary
+    
+    def merge(self, other : 'Property_Store'):
+        """Merge another store into this one. Ids are mapped if the stores don't share interners.
+        """
+        same_values = other.value_ids is self.value_ids
+        same_files = other.file_ids is self.file_ids
+        
+        # other id -> id in this store, so every distinct string is only looked up once
+        value_map = None if same_values else [self.value_ids.intern(value) for value in other.value_ids.strings]
+        file_map = None if same_files else [self.file_ids.intern(file) for file in other.file_ids.strings]
+        
+        def map_ids(ids : Id_Set, mapping : list[int]) -> Id_Set:
+            return Id_Set(mapping[id] for id in ids)
+        
+        for type, properties in other.entries.items():
+            current_properties = self.entries.setdefault(type, {})
+            
+            for name, other_entry in properties.items():
+                if same_values:
+                    values = other_entry.values.copy()
+                else:
+                    values = map_ids(other_entry.values, value_map)
+                
+                files = None
+                if other_entry.files != None:
+                    if same_files:
+                        files = other_entry.files.copy()
+                    else:
+                        files = map_ids(other_entry.files, file_map)
+                
+                entry = current_properties.get(name)
+                
+                if entry == None:
+                    entry = Property_Entry(other_entry.type)
+                    entry.values = values
+                    entry.files = files
+                    if other_entry.summary != None:
+                        entry.summary = Type_Summary()
+                        entry.summary.merge(other_entry.summary)
+                    current_properties[name] = entry
+                    continue
+                
+                entry.values.update(values)
+                entry.stats = None
+                if files != None:
+                    if entry.files == None:
+                        entry.files = Id_Set()
+                    entry.files.update(files)
+                
+                if other_entry.summary != None:
+                    summary = self.get_summary(entry)
+                    summary.merge(other_entry.summary)
+                    entry.type = summary.type
+                else:
+                    entry.summary = None
+                    entry.type = self.get_summary(entry).type
+    
+    def get_property(self, entry : Property_Entry) -> dict[str, str | set]:
+        """Get a property entry in the `object_types` format.
+        """
+        property = {
+            'type' : entry.type,
+            'values' : self.get_values(entry),
+        }
+        if entry.files != None:
+            property['files'] = self.get_files(entry)
+        if entry.stats != None:
+            property['stats'] = entry.stats
+        
+        return property
+    
+    def view(self) -> 'Store_View':
+        """Get a read-only view of the store in the `object_types` format, which only builds a property when it's accessed.
+        """
+        return Store_View(self)
+    
+    def to_dict(self) -> dict[str, dict[str, dict[str, str | set]]]:
+        """Get the observations in the `object_types` format, with sets of strings.
+        """
+        data = {}
+        
+        for type, properties in self.entries.items():
+            data[type] = {}
+            
+            for name, entry in properties.items():
+                data[type][name] = self.get_property(entry)
+        
+        return data
+    
+    @classmethod
+    def from_dict(
+        cls,
+        data : dict[str, dict[str, dict[str, str | list | set]]],
+        values : Interner = None,
+        files : Interner = None,
+    ) -> 'Property_Store':
+        """Make a store from data in the `object_types` format.
+        """
+        store = cls(values, files)
+        
+        for type, properties in data.items():
+            store.add_type(type)
+            
+            for name, property in properties.items():
+                entry = store.setdefault(type, name, property.get('type', 'any'))
+                entry.values = Id_Set(store.value_ids.intern(value) for value in property.get('values', []))
+                
+                if 'files' in property:
+                    entry.files = Id_Set(store.file_ids.intern(file) for file in property['files'])
+                if 'stats' in property:
+                    entry.stats = property['stats']
+        
+        return store
+    
+    def get_size(self) -> int:
+        """Estimate the memory used by the observations in bytes, e.g. to spill them to disk past a memory limit. The interners are counted in full, even if they are shared with other stores.
+        """
+        size = self.value_ids.size + self.file_ids.size
+        
+        for properties in self.entries.values():
+            for entry in properties.values():
+                size += self.ENTRY_SIZE + entry.values.get_size()
+                if entry.files != None:
+                    size += entry.files.get_size()
+        
+        return size
+    
+    def __contains__(self, type : str) -> bool:
+        return type in self.entries
+    
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self.entries)
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+
+class Store_View(Mapping):
+    def __init__(self, store : Property_Store) -> None:
+        """Read-only `object_types` view of a `Property_Store`.
+        """
+        self.store = store
+    
+    def __getitem__(self, type : str) -> 'Type_View':
+        return Type_View(self.store, self.store.entries[type])
+    
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self.store.entries)
+    
+    def __len__(self) -> int:
+        return len(self.store.entries)
+
+class Type_View(Mapping):
+    def __init__(self, store : Property_Store, properties : dict[str, Property_Entry]) -> None:
+        """Read-only view of the properties of one object type.
+        """
+        self.store = store
+        self.properties = properties
+    
+    def __getitem__(self, name : str) -> dict[str, str | set]:
+        return self.store.get_property(self.properties[name])
+    
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self.properties)
+    
+    def __len__(self) -> int:
+        return len(self.properties)
@@ -0,0 +1,87 @@
+import os
+import sys
+import json
+from xml.sax.saxutils import quoteattr
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def write_object(path : str, properties : dict[str, str]):
+    """Write an object file with default properties. Objects without a `Type` property are untyped.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok = True)
+    
+    lines = ['<InteractiveObject>', '<Shapes><Shape><Point pos="0 0"/></Shape></Shapes>', '<DefaultProperties>']
+    lines += [f'<Property name={quoteattr(name)} value={quoteattr(value)}/>' for name, value in properties.items()]
+    lines += ['</DefaultProperties>', '</InteractiveObject>']
+    
+    with open(path, 'w') as file:
+        file.write('\n'.join(lines))
+
+def write_level(path : str, objects : list[tuple[str, dict[str, str]]]):
+    """Write a level with `(object file, properties)` objects.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok = True)
+    
+    lines = ['<Objects>']
+    for index, (filename, properties) in enumerate(objects):
+        properties = {'Filename' : filename, **properties}
+        lines.append(
+            f'<Object name="o{index}"><Properties>'
+            + ''.join(f'<Property name={quoteattr(name)} value={quoteattr(value)}/>' for name, value in properties.items())
+            + '</Properties></Object>'
+        )
+    lines.append('</Objects>')
+    
+    with open(path, 'w') as file:
+        file.write('\n'.join(lines))
+
+def write_game(
+    gamepath : str,
+    objects : dict[str, dict[str, str]],
+    levels : list[list[tuple[str, dict[str, str]]]],
+):
+    """Write a game with object files (`{'/Objects/a.hs' : {'Type' : 'a'}}`) and levels, named `level1.xml`, `level2.xml`, ...
+    """
+    assets = os.path.join(gamepath, 'assets')
+    
+    for filename, properties in objects.items():
+        write_object(os.path.join(assets, filename.strip('/')), properties)
+    
+    for number, level in enumerate(levels, 1):
+        write_level(os.path.join(assets, 'Levels', f'level{number}.xml'), level)
+
+def read_output(path : str) -> bytes:
+    with open(path, 'rb') as file:
+        return file.read()
+
+def load_output(path : str) -> dict:
+    with open(path, 'r') as file:
+        return json.load(file)
+
+@pytest.fixture
+def shared_game(tmp_path) -> str:
+    """A game where an untyped object adds 'Mute' to the '' type in the second of 9 levels, after 'spout' already used it in the first.
+    """
+    gamepath = str(tmp_path / 'game')
+    
+    levels = []
+    for number in range(1, 10):
+        level = [('/Objects/spout.hs', {'Mute' : str(number)})]
+        if number == 2:
+            level = [('/Objects/untyped.hs', {'Mute' : '0'})]
+        levels.append(level)
+    
+    write_game(
+        gamepath,
+        {
+            '/Objects/spout.hs' : {'Type' : 'spout', 'Mute' : '1', 'Angle' : '0'},
+            '/Objects/untyped.hs' : {'Mute' : '0'},
+            '/Objects/rock.hs' : {'Type' : 'rock', 'Mute' : '5'},
+        },
+        levels,
+    )
+    
+    return gamepath
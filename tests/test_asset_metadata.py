@@ -0,0 +1,125 @@
+import os
+
+import pytest
+
+from asset_metadata import Metadata_Loader
+from object_elements import Object_Element_Analysis
+from object_types import Object_Analysis
+
+OBJECTS = {
+    'Objects/rock.hs' : """<InteractiveObject>
+<Shapes>
+<Shape><Point pos="0 0"/><Point pos="1 0"/><Point pos="1 1"/></Shape>
+<Shape><Point pos="0 0"/><Point pos="-1 -0.5"/></Shape>
+</Shapes>
+<UVs><UV pos="0 0"/><UV pos="1 1"/><UV pos="0.5 0.25"/></UVs>
+<VertIndices><Vert index="0"/><Vert index="2"/></VertIndices>
+<DefaultProperties>
+<Property name="Type" value="rock"/>
+<Property name="Angle" value="0"/>
+<Property name="Mass" value="1.5"/>
+</DefaultProperties>
+</InteractiveObject>""",
+    'Objects/untyped.hs' : """<InteractiveObject>
+<Shapes><Shape><Point pos="0 0"/></Shape></Shapes>
+<DefaultProperties>
+<Property name="Mute" value="0"/>
+</DefaultProperties>
+</InteractiveObject>""",
+}
+
+LEVEL = """<Objects>
+<Object name="default"><Properties><Property name="Filename" value="/Objects/rock.hs"/></Properties></Object>
+<Object name="override"><Properties><Property name="Filename" value="/Objects/rock.hs"/><Property name="Angle" value="90"/></Properties></Object>
+<Object name="unnormalized"><Properties><Property name="Filename" value="Objects//rock.hs"/><Property name="Mass" value="3"/></Properties></Object>
+<Object name="no_filename"><Properties><Property name="Angle" value="1"/></Properties></Object>
+<Object name="missing"><Properties><Property name="Filename" value="/Objects/missing.hs"/></Properties></Object>
+<Object name="typed"><Properties><Property name="Filename" value="/Objects/untyped.hs"/><Property name="Type" value="spout"/></Properties></Object>
+</Objects>"""
+
+@pytest.fixture
+def game(tmp_path) -> str:
+    gamepath = str(tmp_path / 'game')
+    
+    for path, text in {**OBJECTS, 'Levels/level.xml' : LEVEL}.items():
+        path = os.path.join(gamepath, 'assets', path)
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        with open(path, 'w') as file:
+            file.write(text)
+    
+    return gamepath
+
+def load_records(gamepath : str, loader : str) -> list[list]:
+    analysis = Object_Analysis(gamepath, output = None, loader = loader)
+    
+    records = analysis.load_level('/Levels/level.xml')
+    for path in ['/Objects/rock.hs', '/Objects/untyped.hs']:
+        records += analysis.load_object(path)
+    
+    return records
+
+def test_records_match_wmwpy(game):
+    pytest.importorskip('wmwpy')
+    
+    assert load_records(game, 'metadata') == load_records(game, 'wmwpy')
+
+def test_elements_match_wmwpy(game, tmp_path):
+    pytest.importorskip('wmwpy')
+    
+    elements = {}
+    for loader in ['metadata', 'wmwpy']:
+        analysis = Object_Element_Analysis(game, '/assets', 'WMW', str(tmp_path / f'{loader}.json'), loader = loader)
+        elements[loader] = [analysis.load_object(path) for path in ['/Objects/rock.hs', '/Objects/untyped.hs']]
+    
+    assert elements['metadata'] == elements['wmwpy']
+    assert elements['metadata'][0] == {'Shapes' : 2, 'Sprites' : 0, 'UVs' : 3, 'VertIndices' : 2, 'DefaultProperties' : 3}
+
+def test_level_objects(game):
+    records = load_records(game, 'metadata')
+    
+    # objects without a Filename, or whose file doesn't exist, are skipped
+    assert len(records) == 4 + 2
+    
+    type, filename, properties, overrides = records[0]
+    assert (type, filename) == ('rock', '/Objects/rock.hs')
+    assert properties == {'Type' : 'rock', 'Angle' : '0', 'Mass' : '1.5', 'Filename' : '/Objects/rock.hs'}
+    assert overrides == []
+    
+    # properties the level doesn't set fall back to the default properties
+    type, filename, properties, overrides = records[1]
+    assert properties['Angle'] == '90'
+    assert properties['Mass'] == '1.5'
+    assert overrides == ['Angle']
+    
+    # the Filename is the normalized path of the file
+    type, filename, properties, overrides = records[2]
+    assert filename == '/Objects/rock.hs'
+    assert properties['Filename'] == '/Objects/rock.hs'
+    assert overrides == ['Mass']
+    
+    type, filename, properties, overrides = records[3]
+    assert (type, filename) == ('spout', '/Objects/untyped.hs')
+    assert properties == {'Mute' : '0', 'Type' : 'spout', 'Filename' : '/Objects/untyped.hs'}
+    assert overrides == ['Type']
+    
+    # object files on their own use their default properties
+    assert records[4] == records[0]
+    assert records[5] == ['', '/Objects/untyped.hs', {'Mute' : '0', 'Filename' : '/Objects/untyped.hs'}, []]
+
+def test_object_shapes(game):
+    loader = Metadata_Loader(game)
+    object = loader.load_object('Objects//rock.hs')
+    
+    assert object.filename == '/Objects/rock.hs'
+    assert object.type == 'rock'
+    assert len(object.shapes) == 2
+    assert [len(shape) for shape in object.shapes] == [3, 2]
+    assert object.shapes[1][1] == (-1.0, -0.5)
+    assert object.UVs == [(0.0, 0.0), (1.0, 1.0), (0.5, 0.25)]
+    assert object.VertIndices == [0, 2]
+    assert object.sprites == []
+    
+    assert loader.load_object('/Objects/untyped.hs').type == ''
+    
+    with pytest.raises(FileNotFoundError):
+        loader.load_object('/Objects/missing.hs')
@@ -0,0 +1,106 @@
+import os
+
+from batch import Batch_Analysis, compare_stores
+from conftest import write_game, load_output
+from store import Property_Store
+
+GAMES = {
+    'old' : (
+        {
+            '/Objects/rock.hs' : {'Type' : 'rock', 'Mass' : '2', 'Angle' : '0'},
+            '/Objects/spout.hs' : {'Type' : 'spout', 'Mute' : '1'},
+        },
+        [[('/Objects/rock.hs', {'Mass' : '3'}), ('/Objects/spout.hs', {})]],
+    ),
+    'new' : (
+        {
+            '/Objects/rock.hs' : {'Type' : 'rock', 'Mass' : '2.5', 'Angle' : '0', 'Color' : 'red'},
+            '/Objects/pipe.hs' : {'Type' : 'pipe', 'Mute' : '0'},
+        },
+        [[('/Objects/rock.hs', {'Mass' : '3'}), ('/Objects/pipe.hs', {})]],
+    ),
+}
+
+EXPECTED = {
+    'games' : ['old', 'new'],
+    'types' : {
+        'rock' : {
+            'games' : ['old', 'new'],
+            'properties' : {
+                'Mass' : {
+                    'games' : ['old', 'new'],
+                    'types' : {'old' : 'int', 'new' : 'float'},
+                    'values' : {'old' : {'2'}, 'new' : {'2.5'}},
+                },
+                'Color' : {
+                    'games' : ['new'],
+                },
+            },
+        },
+        'spout' : {
+            'games' : ['old'],
+            'properties' : {},
+        },
+        'pipe' : {
+            'games' : ['new'],
+            'properties' : {},
+        },
+    },
+}
+
+def test_batch_shares_interners(tmp_path):
+    games = []
+    for name, (objects, levels) in GAMES.items():
+        gamepath = str(tmp_path / name)
+        write_game(gamepath, objects, levels)
+        games.append({'name' : name, 'gamepath' : gamepath})
+    
+    output_dir = str(tmp_path / 'output')
+    batch = Batch_Analysis(games, output_dir = output_dir)
+    batch.start()
+    
+    for store in batch.stores.values():
+        assert store.value_ids is batch.value_ids
+        assert store.file_ids is batch.file_ids
+    
+    assert batch.diff == EXPECTED
+    
+    diff = load_output(os.path.join(output_dir, 'diff.json'))
+    assert sorted(diff['types']['rock']['properties']['Mass']['values']['new']) == ['2.5']
+    
+    for name in GAMES:
+        output = load_output(os.path.join(output_dir, f'{name}.json'))
+        assert compare_stores({
+            name : batch.stores[name],
+            'output' : Property_Store.from_dict(output),
+        })['types'] == {}
+
+def test_compare_separate_interners():
+    old = Property_Store.from_dict({
+        'rock' : {
+            'Mass' : {'type' : 'int', 'values' : ['2', '3']},
+            'Angle' : {'type' : 'bit', 'values' : ['0']},
+        },
+        'spout' : {'Mute' : {'type' : 'bit', 'values' : ['1']}},
+    })
+    new = Property_Store.from_dict({
+        # interned in a different order, so the ids don't match
+        'pipe' : {'Mute' : {'type' : 'bit', 'values' : ['0']}},
+        'rock' : {
+            'Color' : {'type' : 'string', 'values' : ['red']},
+            'Angle' : {'type' : 'bit', 'values' : ['0']},
+            'Mass' : {'type' : 'float', 'values' : ['3', '2.5']},
+        },
+    })
+    assert old.value_ids is not new.value_ids
+    assert old.value_ids.lookup('0') != new.value_ids.lookup('0')
+    
+    diff = compare_stores({'old' : old, 'new' : new})
+    assert diff == EXPECTED
+    
+    # the stores themselves aren't changed
+    assert new.get_values(new.get('rock', 'Mass')) == {'3', '2.5'}
+    assert compare_stores({'new' : new, 'old' : old})['types']['rock']['properties']['Mass']['values'] == {'old' : {'2'}, 'new' : {'2.5'}}
+
+def test_compare_no_stores():
+    assert compare_stores({}) == {'games' : [], 'types' : {}}
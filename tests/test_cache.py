@@ -0,0 +1,52 @@
+import os
+
+from cache import Analysis_Cache
+from conftest import read_output
+from object_types import Object_Analysis
+
+def test_invalidate_folder_is_exact_prefix(tmp_path):
+    cache = Analysis_Cache(str(tmp_path / 'cache'))
+    
+    paths = {}
+    for folder in ['level_1', 'levelX1', 'LEVEL_1', 'level_10', 'level%']:
+        path = tmp_path / folder / 'a.xml'
+        path.parent.mkdir()
+        path.write_text(folder)
+        paths[folder] = str(path)
+        cache.put('level', paths[folder], folder)
+    
+    assert cache.invalidate(str(tmp_path / 'level_1')) == 1
+    assert cache.get('level', paths['level_1']) == None
+    
+    assert cache.invalidate(os.path.join(str(tmp_path), 'level%')) == 1
+    
+    for folder in ['levelX1', 'LEVEL_1', 'level_10']:
+        assert cache.get('level', paths[folder]) == folder
+
+def test_writes_do_not_lock_other_instances(tmp_path):
+    path = tmp_path / 'a.xml'
+    path.write_text('a')
+    
+    first = Analysis_Cache(str(tmp_path / 'cache'))
+    second = Analysis_Cache(str(tmp_path / 'cache'))
+    second.connection.execute('PRAGMA busy_timeout = 0')
+    
+    first.put('level', str(path), 1)
+    second.put('level', str(path), 2)
+    
+    assert first.get('level', str(path)) == 2
+    first.commit()
+    second.commit()
+
+def test_parallel_cold_cache(shared_game, tmp_path):
+    cache = str(tmp_path / 'cache')
+    expected = str(tmp_path / 'expected.json')
+    Object_Analysis(shared_game, output = expected).start()
+    
+    for hits in [0, 9]:
+        output = str(tmp_path / 'output.json')
+        analysis = Object_Analysis(shared_game, output = output, workers = 4, cache = cache)
+        analysis.start()
+        
+        assert analysis.metrics.counters.get('level_cache_hits', 0) == hits
+        assert read_output(output) == read_output(expected)
@@ -0,0 +1,102 @@
+import pytest
+
+from diff import compare_types, diff_property, diff_outputs, get_digests, get_property_digest, summarize
+
+@pytest.mark.parametrize('old, new, expected', [
+    ('int', 'float', 'widened'),
+    ('bit', 'int', 'widened'),
+    ('float', 'int', 'narrowed'),
+    ('string', 'bit', 'narrowed'),
+    ('any', 'int', 'widened'),
+    ('int', 'any', 'narrowed'),
+    ('int', 'string', 'widened'),
+    ('int', 'int,...', 'widened'),
+    ('int,...', 'int', 'narrowed'),
+    ('int', 'int int', 'widened'),
+    ('float bit', 'bit float', 'changed'),
+    ('any', 'unknown', 'changed'),
+    ('int', 'unknown', 'changed'),
+])
+def test_compare_types(old, new, expected):
+    assert compare_types(old, new) == expected
+
+def test_property_digest_ignores_order():
+    assert get_property_digest({'type' : 'int', 'values' : ['1', '2']}) == get_property_digest({'values' : ['2', '1'], 'type' : 'int'})
+    assert get_property_digest({'type' : 'int', 'values' : ['1', '2']}) != get_property_digest({'type' : 'int', 'values' : ['1', '3']})
+
+def test_diff_property():
+    assert diff_property(
+        {'type' : 'int', 'values' : ['1', '2'], 'files' : ['/a.hs']},
+        {'type' : 'float', 'values' : ['1', '2.5'], 'files' : ['/a.hs']},
+    ) == {
+        'type' : ['int', 'float'],
+        'change' : 'widened',
+        'added_values' : {'2.5'},
+        'removed_values' : {'2'},
+    }
+    assert diff_property({'values' : ['1']}, {'type' : 'bit', 'values' : ['1'], 'files' : ['/a.hs']}) == {
+        'type' : ['any', 'bit'],
+        'change' : 'widened',
+        'added_files' : {'/a.hs'},
+    }
+
+OLD = {
+    '' : {'Mute' : {'type' : 'bit', 'values' : ['0', '1']}},
+    'rock' : {
+        'Mass' : {'type' : 'int', 'values' : ['1', '2']},
+        'Angle' : {'type' : 'int', 'values' : ['0', '90']},
+        'Old' : {'type' : 'string', 'values' : ['a']},
+    },
+    'removed' : {'X' : {'type' : 'bit', 'values' : ['0']}},
+}
+
+NEW = {
+    '' : {'Mute' : {'type' : 'bit', 'values' : ['1', '0']}},
+    'rock' : {
+        'Mass' : {'type' : 'float', 'values' : ['1', '2.5']},
+        'Angle' : {'type' : 'int', 'values' : ['90', '0']},
+        'New' : {'type' : 'int', 'values' : ['3']},
+    },
+    'added' : {'Y' : {'type' : 'any', 'values' : []}},
+}
+
+def test_diff_outputs():
+    diff = diff_outputs(OLD, NEW)
+    
+    assert diff == {
+        'added_types' : ['added'],
+        'removed_types' : ['removed'],
+        'types' : {
+            'rock' : {
+                'added_properties' : {'New' : 'int'},
+                'removed_properties' : {'Old' : 'string'},
+                'properties' : {
+                    'Mass' : {
+                        'type' : ['int', 'float'],
+                        'change' : 'widened',
+                        'added_values' : {'2.5'},
+                        'removed_values' : {'2'},
+                    },
+                },
+            },
+        },
+    }
+    
+    assert diff_outputs(OLD, OLD) == {'added_types' : [], 'removed_types' : [], 'types' : {}}
+    assert diff_outputs(OLD, NEW, get_digests(OLD), get_digests(NEW)) == diff
+    
+    assert summarize(diff).splitlines() == [
+        '+ added',
+        '- removed',
+        '+ rock.New (int)',
+        '- rock.Old (string)',
+        '~ rock.Mass: int -> float (widened), +1 values, -1 values',
+    ]
+
+def test_unchanged_types_are_skipped_by_digest():
+    old_digests = get_digests(OLD)
+    new_digests = get_digests(NEW)
+    
+    assert old_digests[''][0] == new_digests[''][0]
+    assert old_digests['rock'][1]['Angle'] == new_digests['rock'][1]['Angle']
+    assert old_digests['rock'][0] != new_digests['rock'][0]
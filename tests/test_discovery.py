@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+from discovery import Asset_Manifest, LEVEL_PATTERN, OBJECT_PATTERN
+
+FILES = [
+    'Levels/level1.xml',
+    'Levels/level2.xml',
+    'Levels/level10.xml',
+    'Levels/level1.png',
+    'Levels/Sub/level3.xml',
+    'Levels/Sub/level03.xml',
+    'Objects/rock.hs',
+    'Objects/rock2.hs',
+    'Objects/rock10.hs',
+    'Objects/Nested/Deep/spout.hs',
+    'Objects/Nested/readme.txt',
+    'Objects/upper.HS',
+    'Data/Levels/extra.xml',
+    'level0.xml',
+    'top.hs',
+]
+
+@pytest.fixture
+def assets(tmp_path) -> str:
+    assets = tmp_path / 'game' / 'assets'
+    
+    for path in FILES:
+        path = assets / path
+        path.parent.mkdir(parents = True, exist_ok = True)
+        path.write_text(path.name)
+    
+    return str(assets)
+
+def test_match_natural_order(assets):
+    manifest = Asset_Manifest.scan(assets)
+    
+    assert len(manifest) == len(FILES)
+    assert manifest.match(LEVEL_PATTERN) == [
+        '/Data/Levels/extra.xml',
+        '/Levels/Sub/level3.xml',
+        '/Levels/Sub/level03.xml',
+        '/Levels/level1.xml',
+        '/Levels/level2.xml',
+        '/Levels/level10.xml',
+    ]
+    assert manifest.match(OBJECT_PATTERN) == [
+        '/Objects/Nested/Deep/spout.hs',
+        # natsort puts numbers before the extension
+        '/Objects/rock2.hs',
+        '/Objects/rock10.hs',
+        '/Objects/rock.hs',
+        '/top.hs',
+    ]
+    assert manifest.classify({'levels' : LEVEL_PATTERN})['levels'] == manifest.match(LEVEL_PATTERN)
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_match_wmwpy_listdir(assets, workers):
+    wmwpy = pytest.importorskip('wmwpy')
+    
+    game = wmwpy.load(gamepath = os.path.dirname(assets), assets = '/assets', game = 'WMW')
+    manifest = Asset_Manifest.scan(assets, workers = workers)
+    
+    for pattern in [LEVEL_PATTERN, OBJECT_PATTERN]:
+        assert manifest.match(pattern) == game.filesystem.listdir(recursive = True, search = pattern)
+
+def test_changes(assets, tmp_path):
+    previous = Asset_Manifest.scan(assets)
+    
+    path = tmp_path / 'manifest.json'
+    previous.save(str(path))
+    assert Asset_Manifest.load(str(path)).files == previous.files
+    
+    assert Asset_Manifest.scan(assets).get_changes(previous) == set()
+    
+    os.remove(os.path.join(assets, 'Objects', 'rock.hs'))
+    with open(os.path.join(assets, 'Objects', 'new.hs'), 'w') as file:
+        file.write('new')
+    with open(os.path.join(assets, 'Levels', 'level2.xml'), 'a') as file:
+        file.write('changed')
+    
+    current = Asset_Manifest.scan(assets)
+    
+    assert current.get_changes(previous) == {'/Objects/rock.hs', '/Objects/new.hs', '/Levels/level2.xml'}
+    assert '/Objects/new.hs' in current.match(OBJECT_PATTERN)
+    assert '/Objects/rock.hs' not in current.match(OBJECT_PATTERN)
+
+def test_scan_missing_folder(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        Asset_Manifest.scan(str(tmp_path / 'missing'))
+
+def test_unsupported_manifest_version():
+    with pytest.raises(ValueError):
+        Asset_Manifest.from_dict({'version' : 0, 'files' : {}})
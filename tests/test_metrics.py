@@ -0,0 +1,109 @@
+import math
+import pickle
+
+from metrics import Analysis_Metrics, Phase_Timings, percentile
+from object_types import Object_Analysis, METRICS_SAMPLES
+
+def add_calls(metrics : Analysis_Metrics, calls : list[tuple[float, str]], name : str = 'level_analyze'):
+    for seconds, file in calls:
+        metrics.add(name, seconds, file)
+
+# every time is different, and the files are in a shuffled order of their times
+CALLS = [((index * 7919) % 5000 / 1000, f'/Levels/level{index}.xml') for index in range(5000)]
+
+def test_report_keeps_every_call():
+    metrics = Analysis_Metrics(slowest = 3)
+    add_calls(metrics, CALLS)
+    metrics.add('level_analyze', 10.0)
+    
+    times = sorted([seconds for seconds, file in CALLS] + [10.0])
+    
+    assert len(metrics.phases['level_analyze'].calls) == len(CALLS) + 1
+    assert metrics.get_phase_report('level_analyze') == {
+        'count' : len(CALLS) + 1,
+        'total' : math.fsum(times),
+        'p50' : percentile(times, 50),
+        'p95' : percentile(times, 95),
+        'max' : 10.0,
+        # calls without a file aren't in the slowest files
+        'slowest' : [[file, seconds] for seconds, file in sorted(CALLS, reverse = True)[:3]],
+    }
+    assert metrics.get_phase_report('missing') == {'count' : 0, 'total' : 0.0, 'p50' : 0.0, 'p95' : 0.0, 'max' : 0.0}
+
+def test_samples_are_bounded():
+    metrics = Analysis_Metrics(slowest = 3, samples = 100)
+    add_calls(metrics, CALLS)
+    
+    phase = metrics.phases['level_analyze']
+    assert phase.calls == []
+    assert len(phase.times) == 100
+    assert len(phase.slowest_calls) == 3
+    
+    report = metrics.get_phase_report('level_analyze')
+    expected = Analysis_Metrics(slowest = 3)
+    add_calls(expected, CALLS)
+    expected = expected.get_phase_report('level_analyze')
+    
+    # the count, max and slowest files are exact, and the percentiles are from the sample
+    assert report['count'] == expected['count']
+    assert math.isclose(report['total'], expected['total'])
+    assert report['max'] == expected['max']
+    assert report['slowest'] == expected['slowest']
+    assert abs(report['p50'] - expected['p50']) < 0.5
+    assert abs(report['p95'] - expected['p95']) < 0.5
+    assert report['p50'] in phase.times
+
+def test_merge_worker_metrics():
+    # workers keep every call of their slice, and the main metrics only keep a sample
+    metrics = Analysis_Metrics(slowest = 3, samples = 100)
+    full = Analysis_Metrics(slowest = 3)
+    
+    for start in range(0, len(CALLS), 16):
+        worker = pickle.loads(pickle.dumps(Analysis_Metrics(slowest = 3)))
+        add_calls(worker, CALLS[start:start + 16])
+        worker.count('level_objects', 2)
+        
+        metrics.merge(worker)
+        full.merge(worker)
+    
+    assert len(metrics.phases['level_analyze'].times) == 100
+    assert metrics.counters == full.counters == {'level_objects' : 2 * math.ceil(len(CALLS) / 16)}
+    
+    report = metrics.get_phase_report('level_analyze')
+    expected = full.get_phase_report('level_analyze')
+    assert report['count'] == expected['count'] == len(CALLS)
+    assert report['slowest'] == expected['slowest']
+    assert report['max'] == expected['max']
+
+def test_merge_samples():
+    first = Phase_Timings(slowest = 2, samples = 10)
+    second = Phase_Timings(slowest = 2, samples = 10)
+    for seconds, file in CALLS[:1000]:
+        first.add(seconds, file)
+    for seconds, file in CALLS[1000:1100]:
+        second.add(seconds, file)
+    
+    first.merge(second)
+    
+    assert first.count == 1100
+    assert len(first.times) == 10
+    assert set(first.times) <= {seconds for seconds, file in CALLS[:1100]}
+    assert sorted(first.slowest_calls, reverse = True) == sorted(CALLS[:1100], reverse = True)[:2]
+    
+    # every call of a phase that kept them is sampled
+    unlimited = Phase_Timings(slowest = 2)
+    unlimited.add(100.0, '/Levels/slow.xml')
+    unlimited.merge(first)
+    
+    assert unlimited.samples == 10
+    assert unlimited.count == 1101
+    assert unlimited.report()['slowest'][0] == ['/Levels/slow.xml', 100.0]
+
+def test_memory_limit_samples_metrics(shared_game, tmp_path):
+    analysis = Object_Analysis(shared_game, output = str(tmp_path / 'objects.json'), memory_limit = 0, shard_dir = str(tmp_path))
+    assert analysis.metrics.samples == METRICS_SAMPLES
+    
+    analysis.start()
+    assert analysis.metrics.get_phase_report('level_analyze')['count'] == 9
+    
+    assert Object_Analysis(shared_game, output = None).metrics.samples == None
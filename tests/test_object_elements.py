@@ -0,0 +1,93 @@
+import sys
+import random
+
+import pytest
+
+from object_elements import Object_Element_Analysis, ELEMENTS, get_histogram_bucket
+
+@pytest.fixture
+def analysis(tmp_path) -> Object_Element_Analysis:
+    (tmp_path / 'game' / 'assets').mkdir(parents = True)
+    return Object_Element_Analysis(str(tmp_path / 'game'), output = str(tmp_path / 'elements.json'), top = 3)
+
+def set_counts(analysis : Object_Element_Analysis, counts : list[int], element : str = 'Sprites'):
+    analysis.object_elements['elements'] = {
+        f'/Objects/o{index}.hs' : {name : count if name == element else 0 for name in ELEMENTS}
+        for index, count in enumerate(counts)
+    }
+
+def without_numpy(monkeypatch):
+    # importing a module that is None in sys.modules raises ImportError
+    monkeypatch.setitem(sys.modules, 'numpy', None)
+
+@pytest.mark.parametrize('bucket, expected', [
+    (0, [0, 0, 7]),
+    (1, [1, 1, 7]),
+    (2, [2, 3, 7]),
+    (3, [4, 7, 7]),
+    (11, [1024, 2047, 7]),
+])
+def test_histogram_bucket(bucket, expected):
+    assert get_histogram_bucket(bucket, 7) == expected
+
+@pytest.mark.parametrize('numpy', [True, False])
+def test_summary(analysis, monkeypatch, numpy):
+    if numpy:
+        pytest.importorskip('numpy')
+    else:
+        without_numpy(monkeypatch)
+    
+    set_counts(analysis, [0, 1, 2, 3, 4, 7, 8, 0, 5, 1000])
+    summary = analysis.get_summary()
+    
+    assert summary['Sprites'] == {
+        'count' : 10,
+        'nonzero' : 8,
+        'total' : 1030,
+        'min' : 0,
+        'max' : 1000,
+        'mean' : 103.0,
+        # nearest rank, so every percentile is one of the counts
+        'p50' : 3,
+        'p90' : 8,
+        'p95' : 1000,
+        'p99' : 1000,
+        'histogram' : [
+            [0, 0, 2],
+            [1, 1, 1],
+            [2, 3, 2],
+            [4, 7, 3],
+            [8, 15, 1],
+            [512, 1023, 1],
+        ],
+        'top' : [['/Objects/o9.hs', 1000], ['/Objects/o6.hs', 8], ['/Objects/o5.hs', 7]],
+    }
+    assert summary['Shapes']['histogram'] == [[0, 0, 10]]
+    assert summary['Shapes']['top'] == []
+    assert summary['Shapes']['p99'] == 0
+
+@pytest.mark.parametrize('numpy', [True, False])
+def test_summary_ties_and_empty(analysis, monkeypatch, numpy):
+    if numpy:
+        pytest.importorskip('numpy')
+    else:
+        without_numpy(monkeypatch)
+    
+    # objects with the same count stay in file order
+    set_counts(analysis, [2, 5, 5, 1, 5])
+    assert analysis.get_summary()['Sprites']['top'] == [['/Objects/o1.hs', 5], ['/Objects/o2.hs', 5], ['/Objects/o4.hs', 5]]
+    
+    set_counts(analysis, [])
+    assert analysis.get_summary() == {element : {'count' : 0} for element in ELEMENTS}
+
+def test_python_summary_matches_numpy(analysis):
+    pytest.importorskip('numpy')
+    
+    generator = random.Random(0)
+    for size in [1, 2, 3, 7, 10, 20, 33, 100, 101]:
+        analysis.object_elements['elements'] = {
+            f'/Objects/o{index}.hs' : {element : int(generator.expovariate(0.05)) for element in ELEMENTS}
+            for index in range(size)
+        }
+        
+        assert analysis.get_python_summary() == analysis.get_summary()
@@ -0,0 +1,130 @@
+import os
+import multiprocessing
+
+import pytest
+
+import utils
+import object_types
+from conftest import read_output, load_output, write_level, write_game
+from object_types import Object_Analysis
+
+def run(gamepath : str, output : str, **kwargs) -> Object_Analysis:
+    analysis = Object_Analysis(gamepath, output = output, **kwargs)
+    analysis.start()
+    return analysis
+
+def test_shared_properties_do_not_depend_on_order(shared_game, tmp_path):
+    output = str(tmp_path / 'sequential.json')
+    run(shared_game, output)
+    
+    result = load_output(output)
+    
+    assert sorted(result['']['Mute']['values']) == [str(number) for number in range(10) if number != 2]
+    assert 'Mute' not in result['spout']
+    assert 'Mute' not in result['rock']
+    assert 'Angle' in result['spout']
+
+def test_parallel_equals_sequential(shared_game, tmp_path):
+    sequential = str(tmp_path / 'sequential.json')
+    parallel = str(tmp_path / 'parallel.json')
+    
+    run(shared_game, sequential)
+    run(shared_game, parallel, workers = 4)
+    
+    assert read_output(parallel) == read_output(sequential)
+
+def test_update_equals_full_run(shared_game, tmp_path):
+    level = os.path.join(shared_game, 'assets', 'Levels', 'level2.xml')
+    output = str(tmp_path / 'updated.json')
+    
+    write_level(level, [('/Objects/spout.hs', {'Mute' : '2'})])
+    run(shared_game, output, write_index = True)
+    
+    # the untyped object makes 'Mute' shared, then stops using it
+    for objects in [
+        [('/Objects/untyped.hs', {'Mute' : '0'})],
+        [('/Objects/spout.hs', {'Mute' : '20'})],
+    ]:
+        write_level(level, objects)
+        
+        Object_Analysis(shared_game, output = output).update(changed_files = [level])
+        
+        full = str(tmp_path / 'full.json')
+        run(shared_game, full)
+        
+        assert read_output(output) == read_output(full)
+
+def test_covered_objects_do_not_change_output(tmp_path, monkeypatch):
+    gamepath = str(tmp_path / 'game')
+    write_game(
+        gamepath,
+        {
+            '/Objects/sp.hs' : {'Type' : 'spout', 'Mute' : '1'},
+            '/Objects/untyped.hs' : {'Mute' : '0'},
+        },
+        [
+            [('/Objects/sp.hs', {})],
+            [('/Objects/untyped.hs', {'Mute' : '2'})],
+        ],
+    )
+    
+    skipped = str(tmp_path / 'skipped.json')
+    analysis = run(gamepath, skipped)
+    assert analysis.skipped_objects == 1
+    
+    monkeypatch.setattr(Object_Analysis, 'get_covered_objects', lambda self : set())
+    
+    analyzed = str(tmp_path / 'analyzed.json')
+    run(gamepath, analyzed)
+    
+    assert read_output(skipped) == read_output(analyzed)
+
+def test_outputs_are_byte_identical(shared_game, tmp_path):
+    sequential = str(tmp_path / 'sequential.json')
+    run(shared_game, sequential)
+    expected = read_output(sequential)
+    
+    parallel = str(tmp_path / 'parallel.json')
+    run(shared_game, parallel, workers = 4, write_index = True)
+    assert read_output(parallel) == expected
+    
+    # an update from an index made by a parallel run, after the untyped object stopped and started sharing 'Mute' again
+    level = os.path.join(shared_game, 'assets', 'Levels', 'level2.xml')
+    write_level(level, [('/Objects/spout.hs', {'Mute' : '2'})])
+    Object_Analysis(shared_game, output = parallel).update(changed_files = [level])
+    assert read_output(parallel) != expected
+    
+    write_level(level, [('/Objects/untyped.hs', {'Mute' : '0'})])
+    Object_Analysis(shared_game, output = parallel).update(changed_files = [level])
+    assert read_output(parallel) == expected
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_sharded_equals_in_memory(shared_game, tmp_path, workers):
+    expected = str(tmp_path / 'expected.json')
+    run(shared_game, expected)
+    
+    # every file is spilled to its own shard, so 'Mute' becomes shared after it was spilled in 'spout'
+    sharded = str(tmp_path / 'sharded.json')
+    analysis = run(shared_game, sharded, workers = workers, memory_limit = 0, shard_dir = str(tmp_path))
+    
+    assert analysis.metrics.counters['shards'] > 1
+    assert read_output(sharded) == read_output(expected)
+
+def test_worker_stops_when_cancelled(shared_game):
+    cancel_event = multiprocessing.Event()
+    object_types._init_level_worker(shared_game, '/assets', 'WMW', {}, cancel_event = cancel_event)
+    
+    cancel_event.set()
+    with pytest.raises(utils.Analysis_Cancelled):
+        object_types._analyze_level_slice(['/Levels/level1.xml', '/Levels/level2.xml'])
+
+def test_cancel_parallel(shared_game, tmp_path):
+    output = str(tmp_path / 'cancelled.json')
+    
+    analysis = Object_Analysis(shared_game, output = output, workers = 4)
+    analysis.anaysis_callback = lambda progress, path, length : analysis.cancel()
+    
+    with pytest.raises(utils.Analysis_Cancelled):
+        analysis.start()
+    
+    assert not os.path.exists(output)
@@ -0,0 +1,62 @@
+import sqlite3
+
+import pytest
+
+from conftest import load_output
+from object_types import Object_Analysis
+from objects_database import Objects_Database, export_database
+from store import Property_Store
+
+def test_database_matches_json_output(shared_game, tmp_path):
+    output = str(tmp_path / 'objects.json')
+    database_path = str(tmp_path / 'objects.sqlite')
+    
+    Object_Analysis(shared_game, output = output, database = database_path).start()
+    object_types = load_output(output)
+    
+    file_properties : dict[str, set[tuple[str, str]]] = {}
+    
+    with Objects_Database(database_path) as database:
+        assert database.get_meta()['game'] == 'WMW'
+        assert sorted(database.get_types()) == sorted(object_types)
+        
+        for type, properties in object_types.items():
+            assert database.get_properties(type) == {name : property['type'] for name, property in properties.items()}
+            
+            for name, property in properties.items():
+                assert database.get_data_type(type, name) == property['type']
+                assert database.get_values(type, name) == set(property['values'])
+                assert database.get_files(type, name) == set(property.get('files', []))
+                
+                for file in property.get('files', []):
+                    file_properties.setdefault(file, set()).add((type, name))
+        
+        assert len(file_properties) > 0
+        for file, expected in file_properties.items():
+            assert set(database.get_file_properties(file)) == expected
+        
+        assert database.get_property_types('Angle') == ['spout']
+        assert database.get_data_type('spout', 'Missing') == None
+        assert database.get_values('spout', 'Missing') == set()
+        assert database.get_file_properties('/Objects/missing.hs') == []
+
+def test_export_replaces_database(tmp_path):
+    path = str(tmp_path / 'objects.sqlite')
+    
+    export_database(Property_Store.from_dict({'rock' : {'Mass' : {'type' : 'int', 'values' : ['1']}}}), path)
+    export_database(Property_Store.from_dict({'rock' : {'Mass' : {'type' : 'int', 'values' : ['2']}}}), path)
+    
+    with Objects_Database(path) as database:
+        assert database.get_values('rock', 'Mass') == {'2'}
+        assert database.get_files('rock', 'Mass') == set()
+
+def test_unsupported_version(tmp_path):
+    path = str(tmp_path / 'objects.sqlite')
+    export_database(Property_Store(), path)
+    
+    with sqlite3.connect(path) as connection:
+        connection.execute("UPDATE meta SET value = '0' WHERE key = 'version'")
+    connection.close()
+    
+    with pytest.raises(ValueError):
+        Objects_Database(path)
@@ -0,0 +1,131 @@
+import pytest
+
+from query import Term_Index, Object_Query, Element_Query
+from store import Property_Store
+
+TERMS = ['Angle', 'Connection#', 'ConnectedSpout#', 'FluidType', 'Mute', 'PinOffset', 'Type', 'angle']
+
+@pytest.mark.parametrize('prefix, expected', [
+    # before every term
+    ('A', ['Angle']),
+    ('0', []),
+    ('', sorted(TERMS)),
+    # the first and last terms
+    ('Angle', ['Angle']),
+    ('angle', ['angle']),
+    ('anglez', []),
+    # after every term
+    ('b', []),
+    ('~', []),
+    ('Connect', ['ConnectedSpout#', 'Connection#']),
+    ('Connection#', ['Connection#']),
+    ('Connection##', []),
+    ('Type', ['Type']),
+    ('T', ['Type']),
+])
+def test_prefix(prefix, expected):
+    assert Term_Index(TERMS).prefix(prefix) == expected
+
+def test_prefix_ignore_case():
+    index = Term_Index(TERMS, ignore_case = True)
+    
+    assert index.prefix('ANG') == ['Angle', 'angle']
+    assert index.prefix('connecti') == ['Connection#']
+    assert len(index) == len(TERMS) - 1
+
+@pytest.mark.parametrize('text, expected', [
+    # shorter than the n-grams, so every term is checked
+    ('', sorted(TERMS)),
+    ('e', ['Angle', 'ConnectedSpout#', 'Connection#', 'FluidType', 'Mute', 'PinOffset', 'Type', 'angle']),
+    ('#', ['ConnectedSpout#', 'Connection#']),
+    ('yp', ['FluidType', 'Type']),
+    ('ng', ['Angle', 'angle']),
+    ('zz', []),
+    # n-grams
+    ('ype', ['FluidType', 'Type']),
+    ('Type', ['FluidType', 'Type']),
+    ('nnect', ['ConnectedSpout#', 'Connection#']),
+    ('tion#', ['Connection#']),
+    ('xyz', []),
+    # every n-gram is there, but not together
+    ('ConnectType', []),
+])
+def test_substring(text, expected):
+    assert Term_Index(TERMS).substring(text) == expected
+
+def test_substring_ignore_case():
+    index = Term_Index(TERMS, ignore_case = True)
+    
+    assert index.substring('NG') == ['Angle', 'angle']
+    assert index.substring('TYPE') == ['FluidType', 'Type']
+
+OBJECT_TYPES = {
+    '' : {
+        'Mute' : {'type' : 'bit', 'values' : ['0', '1'], 'files' : ['/Objects/a.hs', '/Objects/b.hs']},
+    },
+    'spout' : {
+        'FluidType' : {'type' : 'string', 'values' : ['water', 'mud'], 'files' : ['/Objects/spout.hs', '/Objects/mud_spout.hs']},
+        'Angle' : {'type' : 'int', 'values' : ['0', '90']},
+    },
+    'fluidconverter' : {
+        'FluidType' : {'type' : 'string', 'values' : ['water'], 'files' : ['/Objects/converter.hs']},
+    },
+}
+
+def test_object_query():
+    query = Object_Query(OBJECT_TYPES)
+    
+    assert query.get_types() == ['', 'spout', 'fluidconverter']
+    assert query.get_property_types('FluidType') == ['spout', 'fluidconverter']
+    assert query.get_property_types('Missing') == []
+    assert query.get_property('spout', 'Angle') == {'type' : 'int', 'values' : {'0', '90'}, 'files' : set()}
+    assert query.get_file_properties('/Objects/spout.hs') == [('spout', 'FluidType')]
+    assert query.search_properties('Fl') == ['FluidType']
+    assert query.search_properties('ut', mode = 'substring') == ['Mute']
+    assert query.search_values('wat') == ['water']
+    assert query.search_values('u', mode = 'substring') == ['mud']
+
+def test_value_properties_have_every_file_of_the_property():
+    query = Object_Query(OBJECT_TYPES)
+    
+    assert query.get_value_properties('0') == [
+        ('', 'Mute', {'/Objects/a.hs', '/Objects/b.hs'}),
+        ('spout', 'Angle', set()),
+    ]
+    # 'mud' is only in mud_spout.hs, but the files aren't per value
+    assert query.get_value_properties('mud') == [
+        ('spout', 'FluidType', {'/Objects/spout.hs', '/Objects/mud_spout.hs'}),
+    ]
+    assert query.get_value_properties(90) == [('spout', 'Angle', set())]
+    assert query.get_value_properties('missing') == []
+
+def test_object_query_from_store():
+    store = Property_Store.from_dict(OBJECT_TYPES)
+    query = Object_Query(store)
+    
+    assert query.get_value_properties('water') == Object_Query(OBJECT_TYPES).get_value_properties('water')
+    
+    store.add(store.get('spout', 'Angle'), '180')
+    assert query.search_values('18') == []
+    query.refresh()
+    assert query.search_values('18') == ['180']
+
+def test_element_query():
+    query = Element_Query({
+        'elements' : {
+            '/Objects/a.hs' : {'Sprites' : 1, 'Shapes' : 2},
+            '/Objects/b.hs' : {'Sprites' : 10},
+            '/Objects/c.hs' : {'Sprites' : 10},
+            '/Objects/d.hs' : {'Sprites' : 30},
+        },
+    })
+    
+    assert query.get_files('Sprites') == ['/Objects/a.hs', '/Objects/b.hs', '/Objects/c.hs', '/Objects/d.hs']
+    assert query.get_files('Sprites', minimum = 10) == ['/Objects/b.hs', '/Objects/c.hs', '/Objects/d.hs']
+    assert query.get_files('Sprites', minimum = 10, maximum = 10) == ['/Objects/b.hs', '/Objects/c.hs']
+    assert query.get_files('Sprites', minimum = 11, maximum = 29) == []
+    assert query.get_files('Sprites', maximum = 0) == []
+    assert query.get_files('Missing') == []
+    assert query.get_elements('/Objects/a.hs') == {'Sprites' : 1, 'Shapes' : 2}
+    assert query.search_files('/Objects/c') == ['/Objects/c.hs']
+    assert query.search_files('.hs', mode = 'substring') == ['/Objects/a.hs', '/Objects/b.hs', '/Objects/c.hs', '/Objects/d.hs']
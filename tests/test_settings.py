@@ -0,0 +1,32 @@
+import os
+import stat
+
+import pytest
+
+from settings import Settings
+
+@pytest.mark.skipif(os.name == 'nt', reason = 'only the read-only flag can be set on Windows')
+def test_save_keeps_permissions(tmp_path):
+    filename = str(tmp_path / 'settings.json')
+    
+    with open(filename, 'w') as file:
+        file.write('{"version" : 1}')
+    os.chmod(filename, 0o644)
+    
+    settings = Settings(filename)
+    settings.set('theme', 'dark')
+    
+    assert stat.S_IMODE(os.stat(filename).st_mode) == 0o644
+    assert Settings(filename).get('theme') == 'dark'
+
+@pytest.mark.skipif(os.name == 'nt', reason = 'only the read-only flag can be set on Windows')
+def test_new_file_uses_umask(tmp_path):
+    filename = str(tmp_path / 'settings.json')
+    
+    umask = os.umask(0o022)
+    try:
+        Settings(filename).set('theme', 'dark')
+    finally:
+        os.umask(umask)
+    
+    assert stat.S_IMODE(os.stat(filename).st_mode) == 0o644
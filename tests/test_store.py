@@ -0,0 +1,135 @@
+import pickle
+
+import pytest
+
+from store import Interner, Id_Set, Property_Store, ids_to_bits, bits_to_ids
+
+def make_store(data : dict, values : Interner = None, files : Interner = None) -> Property_Store:
+    store = Property_Store(values, files)
+    
+    for type, properties in data.items():
+        store.add_type(type)
+        for name, observations in properties.items():
+            entry = store.setdefault(type, name)
+            for value, file in observations:
+                store.add(entry, value, file)
+    
+    return store
+
+@pytest.mark.parametrize('ids', [[], [0], [7, 8], [0, 255, 256, 1000], list(range(0, 300, 3))])
+def test_bits_round_trip(ids):
+    assert list(bits_to_ids(ids_to_bits(ids))) == sorted(ids)
+
+@pytest.mark.parametrize('count', [1, 255, 256, 257, 513])
+def test_id_set_pending_batches(count):
+    ids = Id_Set()
+    
+    # in reverse, so the batches aren't just the next bits
+    for id in reversed(range(count)):
+        ids.add(id * 3)
+        assert id * 3 in ids
+    
+    assert len(ids.pending) < Id_Set.BATCH_SIZE
+    assert id * 3 in ids
+    assert 1 not in ids
+    assert len(ids) == count
+    assert list(ids) == [id * 3 for id in range(count)]
+    assert len(ids.pending) == 0
+
+def test_id_set_copy_and_pickle():
+    ids = Id_Set([1, 2])
+    for id in range(300, 600):
+        ids.add(id)
+    ids.add(5)
+    
+    copy = ids.copy()
+    copy.add(1000)
+    
+    assert 1000 not in ids
+    assert list(pickle.loads(pickle.dumps(ids))) == list(ids)
+    assert list(copy) == [1, 2, 5, *range(300, 600), 1000]
+
+def test_merge_different_interners():
+    store = make_store({
+        'rock' : {'Mass' : [('1', '/Objects/rock.hs')]},
+    })
+    other = make_store({
+        'rock' : {
+            'Mass' : [('2.5', '/Objects/big_rock.hs'), ('1', '/Objects/rock.hs')],
+            'Angle' : [('0', None)],
+        },
+        'spout' : {'Mute' : [('0', '/Objects/spout.hs')]},
+    })
+    # the same strings have other ids in the other store
+    other.value_ids.intern('unused')
+    
+    assert other.value_ids is not store.value_ids
+    store.merge(other)
+    
+    assert store.to_dict() == {
+        'rock' : {
+            'Mass' : {'type' : 'float', 'values' : {'1', '2.5'}, 'files' : {'/Objects/rock.hs', '/Objects/big_rock.hs'}},
+            'Angle' : {'type' : 'bit', 'values' : {'0'}},
+        },
+        'spout' : {'Mute' : {'type' : 'bit', 'values' : {'0'}, 'files' : {'/Objects/spout.hs'}}},
+    }
+    
+    # the other store is left as it was
+    assert other.get_values(other.get('rock', 'Mass')) == {'1', '2.5'}
+
+def test_merge_shared_interners():
+    values = Interner()
+    files = Interner()
+    
+    store = make_store({'rock' : {'Mass' : [(str(number), None) for number in range(300)]}}, values, files)
+    other = make_store({'rock' : {'Mass' : [('0.5', '/Objects/rock.hs')]}}, values, files)
+    
+    store.merge(other)
+    
+    entry = store.get('rock', 'Mass')
+    assert store.get_values(entry) == {str(number) for number in range(300)} | {'0.5'}
+    assert store.get_files(entry) == {'/Objects/rock.hs'}
+    assert entry.type == 'float'
+    
+    # merging copies the sets
+    other.add(other.get('rock', 'Mass'), 'new')
+    assert 'new' not in store.get_values(entry)
+
+def test_move_into_existing_entry():
+    store = make_store({
+        '' : {'Mute' : [('0', '/Objects/a.hs')]},
+        'spout' : {'Mute' : [('2', '/Objects/spout.hs'), ('0', '/Objects/spout.hs')], 'Angle' : [('0', None)]},
+    })
+    
+    store.move('spout', 'Mute', '')
+    
+    assert store.get('spout', 'Mute') == None
+    assert store.get_values(store.get('spout', 'Angle')) == {'0'}
+    
+    entry = store.get('', 'Mute')
+    assert store.get_values(entry) == {'0', '2'}
+    assert store.get_files(entry) == {'/Objects/a.hs', '/Objects/spout.hs'}
+    assert entry.type == 'int'
+    
+    # a property moved to a type that doesn't have it is kept as it is
+    store.move('spout', 'Angle', 'rock')
+    assert store.get_files(store.get('rock', 'Angle')) == None
+    
+    store.move('spout', 'Missing', '')
+    assert 'Missing' not in store.entries['']
+
+def test_dict_round_trip():
+    data = {
+        '' : {},
+        'rock' : {
+            'Mass' : {'type' : 'float', 'values' : {'1', '2.5'}, 'files' : {'/Objects/rock.hs'}},
+            'Angle' : {'type' : 'bit', 'values' : {'0'}, 'files' : set()},
+            'Pos' : {'type' : 'float float', 'values' : {'0 -9.8'}, 'stats' : {'count' : 1, 'min' : [0, -9.8]}},
+        },
+        'empty' : {'Unused' : {'type' : 'any', 'values' : set()}},
+    }
+    
+    assert Property_Store.from_dict(data).to_dict() == data
+    
+    store = make_store({'rock' : {'Mass' : [(str(number), f'/Objects/{number}.hs') for number in range(400)]}})
+    assert Property_Store.from_dict(store.to_dict()).to_dict() == store.to_dict()
@@ -0,0 +1,176 @@
+import pytest
+
+import utils
+import type_inference
+from object_types import Object_Analysis
+
+# the type checks before type_inference, without their debug prints, to compare against
+
+def baseline_check_type(value : str):
+    def check_int(val : str):
+        try:
+            int(val)
+            return True
+        except:
+            return False
+    
+    def check_float(val : str):
+        try:
+            float(val)
+            return True
+        except:
+            return False
+    
+    types = {
+        'string' : lambda val : not check_float(val),
+        'float' : check_float,
+        'int' : check_int,
+        'bit' : lambda val : val in ['0','1', 0,1],
+    }
+    
+    arrays = {
+        'comma' : lambda string : string.split(','),
+        'spaced' : lambda string : string.split(),
+    }
+    
+    type = []
+    is_comma_array = False
+    
+    for key in arrays:
+        array = arrays[key]
+        values = array(value)
+        if len(values) > 1:
+            if key == 'comma':
+                type.append(baseline_check_type(values[0]))
+                is_comma_array = True
+            elif key == 'spaced':
+                type = [baseline_check_type(val) for val in values]
+            
+            break
+    
+    master_type = ''
+    
+    if len(type) == 0:
+        for key in types:
+            if types[key](value):
+                master_type = key
+    
+    if len(type) == 0:
+        if master_type == '':
+            master_type = 'string'
+        
+        type.append(master_type)
+    
+    type = ' '.join(type)
+    if is_comma_array:
+        type += ',...'
+    
+    return type
+
+def baseline_check_data_type(values : list | set):
+    hierarchy = ['bit', 'int', 'float', 'string']
+    
+    types = [baseline_check_type(val) for val in values]
+    
+    is_comma_list = False
+    
+    splits : list[list[str]] = []
+    
+    for type in types:
+        split = type.split()
+        splits.append(split)
+        
+        if split[-1] == '...':
+            is_comma_list = True
+    
+    final_type = []
+    
+    length = max(len(l) for l in splits)
+    
+    length -= is_comma_list
+    
+    for index in range(length):
+        type = 'bit'
+        
+        for val in splits:
+            if len(val) <= index:
+                continue
+            if val[index] == '...':
+                continue
+            
+            if hierarchy.index(val[index]) > hierarchy.index(type):
+                type = val[index]
+        
+        final_type.append(type)
+    
+    if is_comma_list:
+        final_type.append('...')
+    
+    return ' '.join(final_type)
+
+VALUES = [
+    '0', '1', '2', '-1', '+7', ' 5 ', '1_000', '01', '10',
+    '1.0', '-0.5', '.5', '5.', '1e5', '-2.5E-3', '1_0.5', 'inf', '-Infinity', 'nan',
+    '', ' ', 'abc', 'true', '1e', '--1', '1__0', '0x10', '_1',
+    '0 1', '1 2 3', '0 -9.8', '1.5 abc', '0 0 0 0',
+]
+
+COMMA_VALUES = ['1,2', '0.5,abc', 'a,b', '1 2,3', ',1']
+
+@pytest.mark.parametrize('value', VALUES + COMMA_VALUES)
+def test_check_type_matches_baseline(value):
+    assert type_inference.infer_type(value) == baseline_check_type(value)
+    assert utils.check_type(value) == baseline_check_type(value)
+
+@pytest.mark.parametrize('values, expected', [
+    (['0', '1'], 'bit'),
+    (['0', '1', '5'], 'int'),
+    (['1', '-3', '2.5'], 'float'),
+    (['1', '-2.5e10', 'abc'], 'string'),
+    (['-1.5', '1e-3'], 'float'),
+    (['0 1', '1 2.5'], 'bit float'),
+    (['0 1', '2 2 3'], 'int int int'),
+    (['0 0', 'abc'], 'string bit'),
+    (['1.5', '0 0 1'], 'float bit bit'),
+])
+def test_data_type_matches_baseline(values, expected):
+    assert baseline_check_data_type(values) == expected
+    assert type_inference.infer_data_type(values) == expected
+    assert Object_Analysis.check_data_type(None, values) == expected
+
+@pytest.mark.parametrize('values', [VALUES[:index] for index in range(1, len(VALUES) + 1)])
+def test_data_type_of_mixes_matches_baseline(values):
+    assert type_inference.infer_data_type(values) == baseline_check_data_type(values)
+    assert type_inference.infer_data_type(reversed(values)) == baseline_check_data_type(values)
+
+def test_no_values_is_any():
+    with pytest.raises(ValueError):
+        baseline_check_data_type([])
+    
+    assert type_inference.infer_data_type([]) == 'any'
+    assert type_inference.Type_Summary().type == 'any'
+
+@pytest.mark.parametrize('values, expected', [
+    (['1,2'], 'bit,...'),
+    (['5,2', '3'], 'int,...'),
+    (['1,2', '0.5,abc'], 'float,...'),
+    (['a,b', '1'], 'string,...'),
+])
+def test_comma_values(values, expected):
+    # the baseline couldn't rank the 'int,...' of a single comma value, and raised
+    with pytest.raises(ValueError):
+        baseline_check_data_type(values)
+    
+    assert type_inference.infer_data_type(values) == expected
+
+def test_summary_widens_like_data_type():
+    summary = type_inference.Type_Summary(['0'])
+    
+    assert summary.add('1') == False
+    assert summary.add('2') == True
+    assert summary.type == 'int'
+    
+    other = type_inference.Type_Summary(['0.5 0'])
+    assert summary.merge(other) == True
+    assert summary.type == 'float bit'
+    assert summary.type == type_inference.infer_data_type(['0', '1', '2', '0.5 0'])
@@ -0,0 +1,180 @@
+import re
+import functools
+import typing
+
+HIERARCHY = ('bit', 'int', 'float', 'string')
+RANK = {type : index for index, type in enumerate(HIERARCHY)}
+
+_DIGITS = r'\d+(?:_\d+)*'
+
+# the same syntax that `int()` and `float()` accept, so no exceptions are needed to check
+INT_PATTERN = re.compile(rf'\s*[+-]?{_DIGITS}\s*')
+FLOAT_PATTERN = re.compile(
+    rf'\s*[+-]?(?:(?:{_DIGITS}(?:\.(?:{_DIGITS})?)?|\.{_DIGITS})(?:e[+-]?{_DIGITS})?|inf(?:inity)?|nan)\s*',
+    re.IGNORECASE,
+)
+
+Classification = tuple[tuple[str, ...], bool]
+
+def classify_scalar(value : str) -> typing.Literal['bit', 'int', 'float', 'string']:
+    """Get the type of a single value.
+    
+    Args:
+        value (str): Value.
+    
+    Returns:
+        Literal['bit', 'int', 'float', 'string']: The narrowest type the value fits in.
+    """
+    if value == '0' or value == '1':
+        return 'bit'
+    if INT_PATTERN.fullmatch(value):
+        return 'int'
+    if FLOAT_PATTERN.fullmatch(value):
+        return 'float'
+    return 'string'
+
+@functools.lru_cache(maxsize = 65536)
+def classify(value : str) -> Classification:
+    """Get the type of a property value. Comma separated lists are typed by their first item, and space separated arrays are typed per item.
+    
+    Args:
+        value (str): Property value.
+    
+    Returns:
+        tuple[tuple[str, ...], bool]: The type of every array item, and whether the value is a comma separated list.
+    """
+    if ',' in value:
+        types, is_comma_list = classify(value.split(',', 1)[0])
+        return types, True
+    
+    items = value.split()
+    if len(items) > 1:
+        return tuple(classify_scalar(item) for item in items), False
+    
+    return (classify_scalar(value),), False
+
+def type_string(classification : Classification) -> str:
+    """Format a classification like 'float float' or 'int,...'.
+    """
+    types, is_comma_list = classification
+    
+    type = ' '.join(types)
+    if is_comma_list:
+        type += ',...'
+    
+    return type
+
+def parse_type(type : str) -> Classification | None:
+    """Parse a type string like 'float float' or 'int,...' back into a classification.
+    
+    Returns:
+        tuple[tuple[str, ...], bool] | None: The classification, or None for 'any' and types that aren't in `HIERARCHY`.
+    """
+    is_comma_list = type.endswith(',...')
+    if is_comma_list:
+        type = type[:-len(',...')]
+    
+    types = tuple(type.split())
+    if len(types) == 0 or any(item not in RANK for item in types):
+        return None
+    
+    return types, is_comma_list
+
+def infer_type(value : str) -> str:
+    """Get the type string of a single property value, e.g. 'bit', 'float float', or 'int,...'.
+    """
+    if not isinstance(value, str):
+        value = str(value)
+    
+    return type_string(classify(value))
+
+def widen(types : typing.Sequence[str], other : typing.Sequence[str]) -> tuple[str, ...]:
+    """Widen array item types with the item types of another value. Item positions that only one of them has keep that type.
+    """
+    if types == other:
+        return tuple(types)
+    
+    if len(types) < len(other):
+        types, other = other, types
+    
+    return tuple(
+        type if index >= len(other) or RANK[type] >= RANK[other[index]] else other[index]
+        for index, type in enumerate(types)
+    )
+
+class Type_Summary():
+    __slots__ = ('types', 'is_comma_list')
+    
+    def __init__(self, values : typing.Iterable[str] = ()) -> None:
+        """Running type of a property, which is widened as values are added, so the type is always known without going over all values again.
+        
+        Args:
+            values (Iterable[str], optional): Initial values. Defaults to ().
+        """
+        self.types : tuple[str, ...] = None
+        self.is_comma_list = False
+        
+        for value in values:
+            self.add(value)
+    
+    @property
+    def type(self) -> str:
+        """Type string, or 'any' if there are no values.
+        """
+        if self.types == None:
+            return 'any'
+        
+        return type_string((self.types, self.is_comma_list))
+    
+    def add(self, value : str) -> bool:
+        """Widen the type with a value.
+        
+        Args:
+            value (str): Property value.
+        
+        Returns:
+            bool: Whether the type changed.
+        """
+        if not isinstance(value, str):
+            value = str(value)
+        
+        return self.add_classification(classify(value))
+    
+    def add_classification(self, classification : Classification) -> bool:
+        types, is_comma_list = classification
+        
+        if types == self.types and (self.is_comma_list or not is_comma_list):
+            return False
+        
+        if self.types != None:
+            types = widen(self.types, types)
+        is_comma_list = self.is_comma_list or is_comma_list
+        
+        if types == self.types and is_comma_list == self.is_comma_list:
+            return False
+        
+        self.types = types
+        self.is_comma_list = is_comma_list
+        return True
+    
+    def merge(self, other : 'Type_Summary') -> bool:
+        """Widen the type with the type of another summary.
+        
+        Returns:
+            bool: Whether the type changed.
+        """
+        if other.types == None:
+            return False
+        
+        return self.add_classification((other.types, other.is_comma_list))
+
+def infer_data_type(values : typing.Iterable[str]) -> str:
+    """Get the widest type of all values of a property.
+    
+    Args:
+        values (Iterable[str]): Property values.
+    
+    Returns:
+        str: Type string, or 'any' if there are no values.
+    """
+    return Type_Summary(values).type
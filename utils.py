@@ -1,4 +1,48 @@
 import typing
+import os
+import logging
+from datetime import datetime
+
+import type_inference
+
+def createLogger(
+    type : typing.Literal['file', 'stream'] = 'file',
+    filename : str = None,
+    level : int = logging.DEBUG,
+):
+    """Set up the root logger. This is only called by entry points, so importing the analysis modules doesn't touch logging or create files.
+
+    Args:
+        type (Literal['file', 'stream'], optional): 'file' logs to `filename` and the console, 'stream' only logs to the console. Defaults to 'file'.
+        filename (str, optional): Log file. Defaults to a timestamped file in 'logs/'.
+        level (int, optional): Logging level. Defaults to `logging.DEBUG`.
+    """
+    if filename in ['', None]:
+        filename = f'logs/{datetime.now().strftime("%m-%d-%y_%H-%M-%S")}.log'
+    
+    for handler in logging.root.handlers[:]:
+        logging.root.removeHandler(handler)
+    format = '[%(levelname)s] %(message)s'
+    datefmt = '%I:%M:%S %p'
+    
+    handlers = []
+
+    if type == 'file':
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok = True)
+        
+        handlers.append(logging.FileHandler(filename))
+        format = '[%(asctime)s] [%(levelname)s] %(message)s'
+    
+    handlers.append(logging.StreamHandler())
+    logging.basicConfig(format=format, datefmt=datefmt, level=level, handlers=handlers)
+    
+    if type == 'file':
+        logging.getLogger(__name__).info(filename)
+
+class Analysis_Cancelled(Exception):
+    """Raised inside an analysis after it was cancelled.
+    """
+    pass
 
 def split_num(string) -> tuple[str,str]:
     if not isinstance(string, str):
@@ -9,72 +53,22 @@ def split_num(string) -> tuple[str,str]:
     return head, tail
 
 def check_type(value : str):
-    def check_int(val : str):
-        try:
-            int(val)
-            return True
-        except:
-            return False
-    
-    def check_float(val : str):
-        try:
-            float(val)
-            return True
-        except:
-            return False
-    
-    types = {
-        'string' : lambda val : not check_float(val),
-        'float' : check_float,
-        'int' : check_int,
-        'bit' : lambda val : val in ['0','1', 0,1],
-    }
-    
-    arrays = {
-        'comma' : lambda string : string.split(','),
-        'spaced' : lambda string : string.split(),
-    }
-    
-    type = []
-    is_comma_array = False
-    
-    for key in arrays:
-        array = arrays[key]
-        values = array(value)
-        if len(values) > 1:
-            if key == 'comma':
-                type.append(check_type(values[0]))
-            
-                is_comma_array = True
-            
-            elif key == 'spaced':
-                type = [check_type(val) for val in values]
-            
-            break
-    
-    master_type = ''
-    
-    if len(type) == 0:
-        for key in types:
-            check = types[key]
-            
-            is_type = check(value)
-            
-            print(f'{is_type = }')
-            print(f'type = {key}')
-            
-            if is_type:
-                master_type = key
-    
-    if len(type) == 0:
-        if master_type == '':
-            print(type)
-            master_type = 'string'
-        
-        type.append(master_type)
-    
-    type = ' '.join(type)
-    if is_comma_array:
-        type += ',...'
-    
-    return type
+    return type_inference.infer_type(value)
+
+
+def asset_path(gamepath : str, assets : str, path : str) -> str:
+    """Get the path on disk of a file inside the game assets folder.
+
+    Args:
+        gamepath (str): Path to game directory.
+        assets (str): Path to assets folder relative to gamepath, e.g. '/assets'.
+        path (str): Path inside the assets folder, e.g. '/Objects/rock.hs'.
+
+    Returns:
+        str: Absolute path on disk.
+    """
+    return os.path.abspath(os.path.join(
+        gamepath,
+        assets.strip('/\\'),
+        path.strip('/\\'),
+    ))